@@ -9,7 +9,7 @@ from backend.config import (
     DEFAULT_ASSISTANT_MODEL, ASSISTANT_AGENT_NAME,
     GPT4_MODEL, CLAUDE_OPUS_MODEL
 )
-from backend.tools.sheet_tools import get_sheet_data, verify_sheet_totals, verify_balance_equation
+from backend.tools.sheet_tools import get_sheet_data, get_uploaded_table_data, verify_sheet_totals, verify_balance_equation
 from backend.tools.tracing_tools import log_agent_action, get_action_history
 import json
 from datetime import datetime
@@ -50,7 +50,8 @@ def create_assistant_agent(use_anthropic: bool = False, use_openai: bool = False
         model=model,
         tools=[
             FunctionTool(escalate_to_senior),
-            FunctionTool(save_audit_event)
+            FunctionTool(save_audit_event),
+            FunctionTool(get_uploaded_table_data)
         ]
     )
     
@@ -5,8 +5,16 @@ from backend.config import (
     DEFAULT_SENIOR_MODEL, SENIOR_AGENT_NAME,
     GPT4_MODEL, CLAUDE_OPUS_MODEL
 )
-from backend.tools.sheet_tools import get_sheet_data, verify_sheet_totals, verify_balance_equation, write_audit_comments
+from backend.tools.sheet_tools import (
+    get_sheet_data, get_uploaded_table_data, verify_sheet_totals, verify_balance_equation, write_audit_comments
+)
 from backend.tools.tracing_tools import log_agent_action, get_action_history, get_task_timeline
+from backend.tools.ledger_tools import (
+    run_benford_test, find_near_duplicate_transactions, verify_ledger_delta, run_audit_rules,
+    reconcile_bank_statement, draw_audit_sample, run_flux_analysis,
+    rollup_chart_of_accounts, score_amount_outliers, consolidate_group,
+    check_document_numbering
+)
 import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -45,7 +53,19 @@ def create_senior_agent(use_anthropic: bool = False, use_openai: bool = False) -
         model=model,
         tools=[
             FunctionTool(escalate_to_supervisor),
-            FunctionTool(save_audit_finding)
+            FunctionTool(save_audit_finding),
+            FunctionTool(get_uploaded_table_data),
+            FunctionTool(run_benford_test),
+            FunctionTool(find_near_duplicate_transactions),
+            FunctionTool(verify_ledger_delta),
+            FunctionTool(run_audit_rules),
+            FunctionTool(reconcile_bank_statement),
+            FunctionTool(draw_audit_sample),
+            FunctionTool(run_flux_analysis),
+            FunctionTool(rollup_chart_of_accounts),
+            FunctionTool(score_amount_outliers),
+            FunctionTool(consolidate_group),
+            FunctionTool(check_document_numbering)
         ]
     )
     
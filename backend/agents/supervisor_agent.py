@@ -5,7 +5,7 @@ from backend.config import (
     DEFAULT_SUPERVISOR_MODEL, SUPERVISOR_AGENT_NAME,
     GPT4_MODEL, CLAUDE_OPUS_MODEL
 )
-from backend.tools.sheet_tools import get_sheet_data, verify_balance_equation, write_audit_comments
+from backend.tools.sheet_tools import get_sheet_data, get_uploaded_table_data, verify_balance_equation, write_audit_comments
 from backend.tools.tracing_tools import log_agent_action, get_action_history, get_task_timeline, summarize_agent_activities
 
 def create_supervisor_agent(model_name: str = None, use_anthropic: bool = False, use_openai: bool = False):
@@ -42,6 +42,7 @@ def create_supervisor_agent(model_name: str = None, use_anthropic: bool = False,
         description="Supervisor IA que coordina a los Senior IA, evalúa la calidad global de las auditorías y asegura el cumplimiento metodológico.",
         tools=[
             get_sheet_data,
+            get_uploaded_table_data,
             verify_balance_equation,
             write_audit_comments,
             log_agent_action,
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los motores de ejecución de las herramientas de auditoría.
+
+Genera libros mayores sintéticos de distintos tamaños, los guarda como una
+carga normal (CSV + copia columnar ``.arrow``) y mide, para cada motor
+instalado (pandas, polars, duckdb), el tiempo de:
+
+* ``TransactionVerifier.verify``   – duplicados y asientos desbalanceados
+* ``BalanceSheetAuditor.audit_batch`` – totales por entidad/periodo
+* ``RulesEngine.evaluate``         – reglas de ``rules.yaml.example``
+
+Al final indica, por control, el menor tamaño a partir del cual un motor
+perezoso supera a pandas (el *crossover*), útil para ajustar
+``engines.LAZY_ENGINE_MIN_ROWS``.
+
+Uso
+---
+    python backend/bench_engines.py --rows 10000 100000 1000000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from backend.tools.audit_tools import BalanceSheetAuditor, TransactionVerifier
+from backend.tools.engines import available_engines
+from backend.tools.rules_engine import RulesEngine
+from backend.tools.tabular_tools import columnar_path
+
+RULES_FILE = Path(__file__).with_name("rules.yaml.example")
+
+_ACCOUNTS = [
+    "1105 - Caja", "1110 - Bancos", "1305 - Clientes", "1435 - Inventarios",
+    "1520 - Maquinaria", "2205 - Proveedores", "2335 - Costos y gastos por pagar",
+    "2505 - Salarios por pagar", "3105 - Capital suscrito", "3605 - Utilidad del ejercicio",
+]
+
+
+def synthetic_ledger(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Libro mayor aleatorio con duplicados y asientos desbalanceados."""
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, 365 * 86400, rows)
+    side = rng.integers(0, 2, rows)
+    df = pd.DataFrame({
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(seconds, unit="s"),
+        "account": rng.choice(_ACCOUNTS, rows),
+        "type": rng.choice(["asset", "liability", "equity"], rows),
+        "entity": rng.choice(["matriz", "filial"], rows),
+        "period": rng.choice([f"2024-{m:02d}" for m in range(1, 13)], rows),
+        "debit": side,
+        "credit": 1 - side,
+        "amount": (10 ** rng.uniform(1, 5.5, rows)).round(2),
+        "description": rng.choice(["pago proveedor", "venta contado", "ajuste manual", "nómina"], rows),
+    })
+    # ~0,5 % de líneas repetidas y ~0,1 % con ambos indicadores
+    dup = rng.choice(rows, rows // 200, replace=False)
+    df.loc[dup, ["account", "amount"]] = df.loc[(dup + 1) % rows, ["account", "amount"]].to_numpy()
+    df.loc[rng.choice(rows, rows // 1000, replace=False), "credit"] = df["debit"]
+    return df
+
+
+def write_upload(df: pd.DataFrame, directory: Path) -> Path:
+    """Guarda *df* como una carga (CSV) con su copia columnar ya creada."""
+    import pyarrow as pa
+    from pyarrow import feather
+
+    path = directory / f"ledger_{len(df)}.csv"
+    df.head(1000).to_csv(path, index=False)  # el CSV solo identifica la carga
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, columnar_path(path), compression="uncompressed")
+    return path
+
+
+def time_call(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat: int) -> pd.DataFrame:
+    engines = available_engines()
+    print(f"Motores disponibles: {', '.join(engines)}")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = write_upload(synthetic_ledger(rows), Path(tmp))
+            for engine in engines:
+                checks = {
+                    "verify": lambda: TransactionVerifier(engine=engine).verify(path),
+                    "audit_batch": lambda: BalanceSheetAuditor(engine=engine).audit_batch(path),
+                    "rules": lambda: RulesEngine.from_file(RULES_FILE, engine=engine).evaluate(path),
+                }
+                for check, func in checks.items():
+                    seconds = time_call(func, repeat)
+                    results.append({"rows": rows, "check": check, "engine": engine, "seconds": seconds})
+                    print(f"{rows:>12,} {check:<12} {engine:<8} {seconds:8.3f}s")
+    return pd.DataFrame(results)
+
+
+def crossover(results: pd.DataFrame) -> dict:
+    """Menor tamaño desde el cual algún motor perezoso gana a pandas en todos los mayores, por control."""
+    table = results.pivot_table(index=["check", "rows"], columns="engine", values="seconds")
+    lazy = [c for c in table.columns if c != "pandas"]
+    out = {}
+    for check, block in table.groupby(level="check"):
+        rows = block.index.get_level_values("rows")
+        wins = (block[lazy].min(axis=1) < block["pandas"]).to_numpy() if lazy else np.zeros(len(block), dtype=bool)
+        # recorrido desde el tamaño mayor: la racha final de victorias
+        start = None
+        for pos in range(len(wins) - 1, -1, -1):
+            if not wins[pos]:
+                break
+            start = int(rows[pos])
+        out[check] = start
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores pandas / polars / duckdb")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por medición (se toma la mejor)")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    print()
+    print(results.pivot_table(index=["check", "rows"], columns="engine", values="seconds").round(3).to_string())
+    print()
+    for check, rows in crossover(results).items():
+        print(f"{check}: " + (f"motor perezoso más rápido desde {rows:,} filas" if rows else "pandas más rápido en todos los tamaños"))
+
+
+if __name__ == "__main__":
+    main()
@@ -55,6 +55,12 @@ DEFAULT_SUPERVISOR_MODEL = LiteLlm(model=GEMINI_PRO_MODEL, stream=True)
 DEFAULT_SENIOR_MODEL = LiteLlm(model=GEMINI_FLASH_MODEL, stream=True)
 DEFAULT_ASSISTANT_MODEL = LiteLlm(model=GEMINI_FLASH_MODEL, stream=True)
 
+# Estado persistente de la auditoría continua (un archivo por cliente)
+AUDIT_STATE_DIR = os.getenv("AUDIT_STATE_DIR", "audit_state")
+
+# Reglas declarativas de auditoría (ver rules.yaml.example)
+AUDIT_RULES_FILE = os.getenv("AUDIT_RULES_FILE", "rules.yaml")
+
 # Configuración de trazabilidad
 ENABLE_TRACING = True
 TRACE_LOG_FILE = "audit_trace.log"
\ No newline at end of file
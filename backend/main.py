@@ -69,7 +69,9 @@ from backend.agents import (
     create_assistant_only
 )
 
-from backend.utils import SupabaseSessionService, setup_logger
+from backend.utils import SupabaseSessionService, StorageUploader, setup_logger
+from backend.tools.tabular_tools import is_tabular, convert_to_columnar, describe_table_upload
+from backend.tools.ledger_tools import run_ledger_preflight, format_preflight
 log = setup_logger(__name__)
 # Subclase de InMemorySessionService que acepta llamadas posicionales a get_session
 class PatchedInMemorySessionService(InMemorySessionService):
@@ -119,12 +121,15 @@ async def upload_file(
             text_content = "\n".join(pages)
     except Exception:
         pass
-    if text_content is None:
-        # Try CSV/Excel
+    if text_content is None and is_tabular(file_path):
+        # CSV/Excel: parse once into the columnar sidecar and read it back
+        def describe_tabular() -> str:
+            convert_to_columnar(file_path)
+            return describe_table_upload(file_path) + "\n" + format_preflight(run_ledger_preflight(file_path))
+
         try:
-            import pandas as pd
-            df = pd.read_excel(file_path) if file.filename.lower().endswith(('.xls', '.xlsx')) else pd.read_csv(file_path)
-            text_content = df.to_csv(index=False)
+            # Conversion and preflight are CPU-bound; keep them off the event loop
+            text_content = await asyncio.to_thread(describe_tabular)
         except Exception:
             pass
     if text_content is None:
@@ -1176,7 +1181,6 @@ def run_api_mode(args):
     
     # UPDATED: Added import for parsing files like Excel, CSV, and PDFs
     try:
-        import pandas as pd
         import PyPDF2
         import io
     except ImportError:
@@ -1264,6 +1268,7 @@ def run_api_mode(args):
         else:
             log.warning("GEMINI_API_KEY no definido → Gemini no podrá responder")
         yield  # Application lifespan continues here
+        storage_uploader.stop()
     
     
 
@@ -1295,6 +1300,9 @@ def run_api_mode(args):
     
     MAX_AUDIT_LOG_ENTRIES = 200 # Define a cap for audit log entries
 
+    # Réplica asíncrona de cargas en Supabase Storage (cliente compartido)
+    storage_uploader = StorageUploader(bucket="chat-files")
+
     # Estado de la aplicación
     app_state = {
         "session_service": initialize_session_service(use_supabase=False),
@@ -1435,18 +1443,16 @@ def run_api_mode(args):
         """Extrae el contenido textual de diferentes tipos de archivos."""
         try:
             if file_type in ['.xlsx', '.xls']:
-                # Extraer datos de archivos Excel
+                # Perfil compacto de la planilla (no se envían las filas crudas)
                 if 'pandas' in sys.modules:
-                    df = pd.read_excel(file_path)
-                    return df.to_string()
+                    return describe_table_upload(file_path)
                 else:
                     return "El sistema no puede procesar archivos Excel. Instale pandas para esta funcionalidad."
             
             elif file_type == '.csv':
-                # Extraer datos de archivos CSV
+                # Perfil compacto del CSV (resumen por bloques si es masivo)
                 if 'pandas' in sys.modules:
-                    df = pd.read_csv(file_path)
-                    return df.to_string()
+                    return describe_table_upload(file_path)
                 else:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         return f.read()
@@ -1475,6 +1481,16 @@ def run_api_mode(args):
             print(f"Error al extraer contenido del archivo: {str(e)}")
             return f"Error al procesar el archivo: {str(e)}"
             
+    # Controles automáticos (preflight) sobre planillas; texto vacío si no aplica
+    def preflight_summary(file_path: Path) -> str:
+        if not is_tabular(file_path):
+            return ""
+        try:
+            return format_preflight(run_ledger_preflight(str(file_path)))
+        except Exception as e:
+            log.warning(f"Preflight omitido para {file_path}: {e}")
+            return ""
+
     # Función para validar el ID del cliente
     def validate_client_id(client_id: str) -> bool:
         if not client_id or len(client_id) < 4:
@@ -1482,14 +1498,17 @@ def run_api_mode(args):
         # Validación adicional si es necesario
         return True
     
+    # Extensiones aceptadas en las cargas (los ZIP solo en la carga masiva)
+    ALLOWED_EXTENSIONS = ['.csv', '.xlsx', '.xls', '.pdf', '.txt', '.md', '.json', '.docx', '.doc']
+    
     # Función para validar archivos antes de procesarlos
-    def validate_file(file: UploadFile) -> (bool, str): # type: ignore
+    def validate_file(file: UploadFile, extra_extensions: tuple = ()) -> (bool, str): # type: ignore
         # Comprobar el tamaño del archivo (máximo ~20MB)
         if file.size and file.size > 20 * 1024 * 1024:
             return False, "El archivo es demasiado grande. Límite: 20MB."
         
         # Comprobar la extensión del archivo
-        allowed_extensions = ['.csv', '.xlsx', '.xls', '.pdf', '.txt', '.md', '.json', '.docx', '.doc']
+        allowed_extensions = ALLOWED_EXTENSIONS + list(extra_extensions)
         file_ext = os.path.splitext(file.filename)[1].lower()
         
         if file_ext not in allowed_extensions:
@@ -1497,6 +1516,62 @@ def run_api_mode(args):
         
         return True, ""
 
+    # Registra un archivo guardado en app_state y encola su réplica en Storage
+    def register_upload(client_id: str, file_id: str, original_name: str, file_path: Path,
+                        columnar_file: Optional[Path] = None) -> Dict[str, Any]:
+        storage_path = f"{client_id}/{file_path.name}"
+        record = {
+            'original_name': original_name,
+            'saved_name': file_path.name,
+            'path': str(file_path),
+            'type': file_path.suffix.lower(),
+            'size': os.path.getsize(file_path),
+            'upload_time': datetime.now().isoformat(),
+            'storage_path': storage_path,
+            'file_url': None,
+            'columnar_path': str(columnar_file) if columnar_file else None
+        }
+        app_state.setdefault('uploaded_files', {})
+        app_state['uploaded_files'].setdefault(client_id, {})
+        app_state['uploaded_files'][client_id][file_id] = record
+
+        # La réplica termina en un hilo del uploader: el evento con la URL
+        # definitiva se agenda en el event loop de la petición.
+        loop = asyncio.get_running_loop()
+
+        def on_stored(stored: Dict[str, Any]) -> None:
+            event = {
+                'id': f"event_{uuid.uuid4().hex[:8]}",
+                'team_id': f"team_{client_id[:8]}",
+                'agent_name': 'storage_uploader',
+                'event_type': 'file_stored',
+                'details': {
+                    'client_id': client_id,
+                    'file_id': file_id,
+                    'file_name': original_name,
+                    'storage_path': storage_path,
+                    'storage_status': stored.get('storage_status'),
+                    'storage_error': stored.get('storage_error'),
+                    'file_url': stored.get('file_url')
+                },
+                'timestamp': datetime.now().isoformat(),
+                'importance': 'low' if stored.get('storage_status') == 'uploaded' else 'high'
+            }
+            asyncio.run_coroutine_threadsafe(emit_audit_event(event), loop)
+
+        storage_uploader.submit(file_path, storage_path, record, on_complete=on_stored)
+        return record
+    
+    # Selecciona la función de agente según agent_type
+    def select_agent_func(agent_type: Optional[str]):
+        return {
+            "assistant": run_assistant_agent,
+            "senior": run_senior_agent,
+            "supervisor": run_supervisor_agent,
+            "manager": run_manager_agent,
+            "team": run_team_agent,
+        }.get(agent_type, run_assistant_agent)
+
     # Endpoint para cargar archivos
     @app.post("/api/upload", response_model=AgentResponse)
     async def upload_file(
@@ -1539,39 +1614,17 @@ def run_api_mode(args):
             with file_path.open("wb") as buffer:
                 shutil.copyfileobj(file.file, buffer)
             
-            # Almacenar en Supabase Storage
-            # Intentar subir a Supabase Storage
-            try:
-                from supabase import create_client
-                from backend.config import SUPABASE_URL, SUPABASE_SERVICE_KEY, SUPABASE_SCHEMA
-                supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY, schema=SUPABASE_SCHEMA)
-                bucket = supabase.storage.from_('chat-files')
-                storage_path = f"{client_id}/{safe_filename}"
-                with file_path.open('rb') as fobj:
-                    file_bytes = fobj.read()
-                upload_resp = bucket.upload(storage_path, file_bytes, {'upsert': True})
-                if upload_resp.error:
-                    log.error(f"Error uploading file to Supabase: {upload_resp.error.message}")
-                    file_url = None
-                else:
-                    public = bucket.get_public_url(storage_path)
-                    file_url = public.get('publicUrl')
-            except ImportError:
-                # Supabase client no disponible, caer en fallback local
-                file_url = None
-            # Almacenar información sobre el archivo en memoria
-            app_state.setdefault('uploaded_files', {})
-            app_state['uploaded_files'].setdefault(client_id, {})
-            app_state['uploaded_files'][client_id][file_id] = {
-                'original_name': file.filename,
-                'saved_name': safe_filename,
-                'path': str(file_path),
-                'type': file_ext,
-                'size': os.path.getsize(file_path),
-                'upload_time': datetime.now().isoformat(),
-                'storage_path': storage_path,
-                'file_url': file_url
-            }
+            # Convertir planillas a formato columnar (una sola vez por carga)
+            columnar_file = None
+            if is_tabular(file_path):
+                try:
+                    columnar_file = await asyncio.to_thread(convert_to_columnar, file_path)
+                except Exception as e:
+                    log.warning(f"No se pudo convertir {file.filename} a formato columnar: {e}")
+            
+            # Registrar el archivo y replicarlo en Supabase en segundo plano
+            file_record = register_upload(client_id, file_id, file.filename, file_path, columnar_file)
+            file_url = file_record['file_url']  # None hasta el evento 'file_stored'
             
             print(f"Archivo cargado: {file.filename} -> {file_path}")
             
@@ -1603,28 +1656,19 @@ def run_api_mode(args):
                 'importance': 'high'
             })
             
-            # Extraer contenido para análisis
-            file_content = extract_file_content(file_path, file_ext)
+            # Extraer contenido para análisis (lectura completa en CSV grandes: fuera del event loop)
+            file_content = await asyncio.to_thread(extract_file_content, file_path, file_ext)
+            preflight_text = await asyncio.to_thread(preflight_summary, file_path)
             
             # Preparar mensaje para el agente explicando el archivo
-            file_info = f"El cliente ha cargado un archivo: {file.filename} (tipo: {file_ext}, tamaño: {os.path.getsize(file_path) / 1024:.1f} KB)"
+            file_info = f"El cliente ha cargado un archivo: {file.filename} (tipo: {file_ext}, tamaño: {os.path.getsize(file_path) / 1024:.1f} KB, ruta: {file_path})"
             analysis_request = f"Por favor, analiza este archivo y proporciona información relevante. Contenido del archivo:\n{file_content[:5000]}..."
+            if preflight_text:
+                analysis_request += f"\n\n{preflight_text}"
             full_message = f"{file_info}\n\n{analysis_request}"
             
             # Seleccionar la función de agente apropiada
-            agent_func = None
-            if agent_type == "assistant":
-                agent_func = run_assistant_agent
-            elif agent_type == "senior":
-                agent_func = run_senior_agent
-            elif agent_type == "supervisor":
-                agent_func = run_supervisor_agent
-            elif agent_type == "manager":
-                agent_func = run_manager_agent
-            elif agent_type == "team":
-                agent_func = run_team_agent
-            else:
-                agent_func = run_assistant_agent
+            agent_func = select_agent_func(agent_type)
             
             # Procesar el archivo y generar respuesta
             response_message = await asyncio.to_thread(
@@ -1670,6 +1714,218 @@ def run_api_mode(args):
                 "session_id": session_id
             }
     
+    # Límites de la carga masiva (paquetes de cierre de mes)
+    BULK_MAX_FILES = 100
+    BULK_MAX_TOTAL_BYTES = 200 * 1024 * 1024
+    BULK_CONTENT_BUDGET = 40000  # caracteres de contexto enviados al agente
+
+    # Copia un archivo contando los bytes realmente escritos contra el límite total
+    def copy_limited(src, target: Path, budget: Dict[str, int]) -> None:
+        with target.open("wb") as dst:
+            while True:
+                chunk = src.read(1024 * 1024)
+                if not chunk:
+                    break
+                budget["bytes"] += len(chunk)
+                if budget["bytes"] > BULK_MAX_TOTAL_BYTES:
+                    raise ValueError(
+                        f"La carga masiva excede el límite de {BULK_MAX_TOTAL_BYTES // (1024 * 1024)}MB."
+                    )
+                dst.write(chunk)
+
+    # Extrae los archivos soportados de un ZIP con nombres seguros (sin rutas).
+    # Cada destino se anota en *written* antes de escribirse, para poder borrarlo si algo falla.
+    def extract_zip_members(zip_path: Path, client_dir: Path, budget: Dict[str, int],
+                            written: List[Path]) -> List[Dict[str, Any]]:
+        import zipfile
+        members = []
+        with zipfile.ZipFile(zip_path) as archive:
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                file_ext = os.path.splitext(name)[1].lower()
+                if info.is_dir() or not name or name.startswith('.') or file_ext not in ALLOWED_EXTENSIONS:
+                    continue
+                if len(members) >= BULK_MAX_FILES:
+                    raise ValueError(f"El ZIP excede el límite de {BULK_MAX_FILES} archivos por carga.")
+                file_id = uuid.uuid4().hex[:8]
+                target = client_dir / f"{file_id}{file_ext}"
+                written.append(target)
+                # El tamaño declarado en el ZIP no es confiable: se cuentan los bytes copiados
+                with archive.open(info) as src:
+                    copy_limited(src, target, budget)
+                members.append({"file_id": file_id, "original_name": name, "path": target})
+        return members
+
+    # Convierte (si es tabular) y perfila un archivo; se ejecuta en un hilo
+    def prepare_upload(item: Dict[str, Any]) -> Dict[str, Any]:
+        file_path = item["path"]
+        columnar_file = None
+        if is_tabular(file_path):
+            try:
+                columnar_file = convert_to_columnar(file_path)
+            except Exception as e:
+                log.warning(f"No se pudo convertir {item['original_name']} a formato columnar: {e}")
+        item["columnar_file"] = columnar_file
+        item["content"] = extract_file_content(file_path, file_path.suffix.lower())
+        preflight_text = preflight_summary(file_path)
+        if preflight_text:
+            item["content"] += f"\n{preflight_text}"
+        return item
+
+    # Endpoint para cargas masivas: varios archivos y/o ZIP, una sola llamada al modelo
+    @app.post("/api/upload/bulk", response_model=AgentResponse)
+    async def upload_files_bulk(
+        files: List[UploadFile] = File(...),
+        client_id: str = Form(...),
+        session_id: str = Form(...),
+        model_type: Optional[str] = Query(None, description="Tipo de modelo a utilizar (gemini, claude, gpt4)"),
+        agent_type: Optional[str] = Query("assistant", description="Tipo de agente (assistant, senior, supervisor, manager, team)")
+    ):
+        """Carga un paquete de archivos (o ZIP), los perfila en paralelo y pide un único análisis consolidado."""
+        try:
+            if not validate_client_id(client_id):
+                return {
+                    "message": "ID de cliente inválido.",
+                    "client_id": client_id,
+                    "session_id": session_id
+                }
+            
+            client_dir = UPLOAD_DIR / client_id
+            client_dir.mkdir(exist_ok=True)
+            
+            # Guardar los archivos (los ZIP se expanden a sus miembros). El límite de tamaño
+            # cuenta los bytes escritos de archivos sueltos y miembros de ZIP; si algo falla se
+            # borra todo lo escrito por esta carga.
+            items: List[Dict[str, Any]] = []
+            rejected: List[str] = []
+            written: List[Path] = []
+            budget = {"bytes": 0}
+            try:
+                for file in files:
+                    is_valid, error_message = validate_file(file, extra_extensions=('.zip',))
+                    if not is_valid:
+                        rejected.append(f"{file.filename}: {error_message}")
+                        continue
+                    file_id = uuid.uuid4().hex[:8]
+                    file_ext = os.path.splitext(file.filename)[1].lower()
+                    file_path = client_dir / f"{file_id}{file_ext}"
+                    written.append(file_path)
+                    if file_ext == '.zip':
+                        try:
+                            # El ZIP en sí tiene su propio tope; solo su contenido cuenta para la carga
+                            await asyncio.to_thread(copy_limited, file.file, file_path, {"bytes": 0})
+                            members = await asyncio.to_thread(extract_zip_members, file_path, client_dir, budget, written)
+                        finally:
+                            file_path.unlink(missing_ok=True)
+                        items.extend(members)
+                    else:
+                        await asyncio.to_thread(copy_limited, file.file, file_path, budget)
+                        items.append({"file_id": file_id, "original_name": file.filename, "path": file_path})
+                    if len(items) > BULK_MAX_FILES:
+                        raise ValueError(f"Se admiten como máximo {BULK_MAX_FILES} archivos por carga.")
+            except Exception:
+                for path in written:
+                    path.unlink(missing_ok=True)
+                raise
+            
+            if not items:
+                return {
+                    "message": "No se recibieron archivos válidos. " + " ".join(rejected),
+                    "client_id": client_id,
+                    "session_id": session_id
+                }
+            
+            # Conversión y perfilado en paralelo
+            items = await asyncio.gather(*(asyncio.to_thread(prepare_upload, item) for item in items))
+            
+            for item in items:
+                register_upload(client_id, item["file_id"], item["original_name"], item["path"], item["columnar_file"])
+            
+            if not model_type:
+                model_type = app_state.get("default_model", "gpt4")
+            use_anthropic = model_type == "claude" or app_state.get("use_anthropic", False)
+            use_openai = model_type == "gpt4" or app_state.get("use_openai", False)
+            
+            await emit_audit_event({
+                'id': f"event_{uuid.uuid4().hex[:8]}",
+                'team_id': f"team_{client_id[:8]}",
+                'agent_name': f"{agent_type}_agent",
+                'event_type': 'bulk_file_upload',
+                'details': {
+                    'client_id': client_id,
+                    'session_id': session_id,
+                    'files': [
+                        {'file_id': item["file_id"], 'file_name': item["original_name"]} for item in items
+                    ],
+                    'rejected': rejected,
+                    'model_used': model_type
+                },
+                'timestamp': datetime.now().isoformat(),
+                'importance': 'high'
+            })
+            
+            # Un único mensaje consolidado con el perfil de cada archivo
+            per_file_budget = max(BULK_CONTENT_BUDGET // len(items), 500)
+            sections = [
+                f"El cliente ha cargado un paquete de {len(items)} archivos para análisis conjunto."
+            ]
+            if rejected:
+                sections.append("Archivos rechazados: " + "; ".join(rejected))
+            for idx, item in enumerate(items, start=1):
+                content = item["content"]
+                if len(content) > per_file_budget:
+                    content = content[:per_file_budget] + "..."
+                sections.append(
+                    f"### Archivo {idx}: {item['original_name']} (ruta: {item['path']})\n{content}"
+                )
+            sections.append(
+                "Por favor, analiza el paquete en conjunto: resume cada archivo, señala inconsistencias "
+                "entre ellos y proporciona información relevante para la auditoría."
+            )
+            full_message = "\n\n".join(sections)
+            
+            agent_func = select_agent_func(agent_type)
+            response_message = await asyncio.to_thread(
+                agent_func,
+                client_id,
+                session_id,
+                full_message,
+                args.supabase,
+                use_anthropic,
+                use_openai
+            )
+            
+            return {
+                "message": response_message,
+                "client_id": client_id,
+                "session_id": session_id
+            }
+            
+        except Exception as e:
+            error_msg = f"Error al procesar la carga masiva: {str(e)}"
+            print(error_msg)
+            import traceback
+            traceback.print_exc()
+            
+            await emit_audit_event({
+                "id": f"event_{uuid.uuid4().hex[:8]}",
+                "team_id": f"team_{client_id[:8]}",
+                "agent_name": f"{agent_type}_agent",
+                "event_type": "file_error",
+                "details": {
+                    "client_id": client_id,
+                    "error": str(e)
+                },
+                "timestamp": datetime.now().isoformat(),
+                "importance": "high"
+            })
+            
+            return {
+                "message": f"Lo siento, hubo un error al procesar los archivos. {str(e)}",
+                "client_id": client_id,
+                "session_id": session_id
+            }
+    
     # NEW CHAT ENDPOINT TO MATCH FRONTEND
 @app.post("/api/chat", response_model=AgentResponse)
 async def handle_chat_request(request: ChatRequest):
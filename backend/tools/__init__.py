@@ -8,21 +8,69 @@ try:
     from backend.tools.audit_tools import (
         BalanceSheetAuditor,
         TransactionVerifier,
+        StreamingTransactionVerifier,
+        ContinuousTransactionVerifier,
         ComplianceChecker,
-        ReportGenerator
+        ReportGenerator,
+        BenfordAnalyzer,
+        BankReconciler,
+        MonetaryUnitSampler,
+        FluxAnalyzer,
+        AccountHierarchy,
+        OutlierScorer,
+        GroupConsolidator,
+        SequenceGapAnalyzer
     )
+    from backend.tools.ledger_frame import LedgerFrame, normalize_audit_frame, memory_report
+    from backend.tools.rules_engine import RulesEngine
+    from backend.tools.engines import get_engine, available_engines
+    from backend.tools.shared_frames import SharedFrameRegistry, SharedFrameHandle, attach_table, read_frame
 except ImportError:
     # Importaciones relativas
     from .audit_tools import (
         BalanceSheetAuditor,
         TransactionVerifier,
+        StreamingTransactionVerifier,
+        ContinuousTransactionVerifier,
         ComplianceChecker,
-        ReportGenerator
+        ReportGenerator,
+        BenfordAnalyzer,
+        BankReconciler,
+        MonetaryUnitSampler,
+        FluxAnalyzer,
+        AccountHierarchy,
+        OutlierScorer,
+        GroupConsolidator,
+        SequenceGapAnalyzer
     )
+    from .ledger_frame import LedgerFrame, normalize_audit_frame, memory_report
+    from .rules_engine import RulesEngine
+    from .engines import get_engine, available_engines
+    from .shared_frames import SharedFrameRegistry, SharedFrameHandle, attach_table, read_frame
 
 __all__ = [
     'BalanceSheetAuditor',
     'TransactionVerifier',
+    'StreamingTransactionVerifier',
+    'ContinuousTransactionVerifier',
     'ComplianceChecker',
-    'ReportGenerator'
+    'ReportGenerator',
+    'BenfordAnalyzer',
+    'BankReconciler',
+    'MonetaryUnitSampler',
+    'FluxAnalyzer',
+    'AccountHierarchy',
+    'OutlierScorer',
+    'GroupConsolidator',
+    'SequenceGapAnalyzer',
+    'LedgerFrame',
+    'normalize_audit_frame',
+    'memory_report',
+    'RulesEngine',
+    'get_engine',
+    'available_engines',
+    'SharedFrameRegistry',
+    'SharedFrameHandle',
+    'attach_table',
+    'read_frame'
 ] 
\ No newline at end of file
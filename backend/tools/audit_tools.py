@@ -36,15 +36,53 @@ print(reporter.generate(bs_result, trx_issues, compl_issues))
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
-
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+from backend.tools.engines import AuditEngine, get_engine
+from backend.tools.ledger_frame import LedgerFrame, memory_report, normalize_audit_frame
+from backend.tools.tabular_tools import iter_csv_chunks, read_columnar
+from backend.tools.shared_frames import SharedFrameHandle, SharedFrameRegistry, attach_table, read_frame
+
 __all__ = [
     "BalanceSheetAuditor",
     "TransactionVerifier",
+    "StreamingTransactionVerifier",
+    "ContinuousTransactionVerifier",
     "ComplianceChecker",
     "ReportGenerator",
+    "BenfordAnalyzer",
+    "BankReconciler",
+    "MonetaryUnitSampler",
+    "FluxAnalyzer",
+    "AccountHierarchy",
+    "OutlierScorer",
+    "GroupConsolidator",
+    "SequenceGapAnalyzer",
+    "normalize_audit_frame",
+    "memory_report",
+    "ensure_columns",
+    "load_frame",
+    "prepare_frame",
 ]
 
 
@@ -53,12 +91,216 @@ __all__ = [
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def _ensure_columns(df: pd.DataFrame, required: set[str]):
+TableSource = Union[pd.DataFrame, LedgerFrame, SharedFrameHandle, str, Path]
+EngineSpec = Union[None, str, AuditEngine]
+
+
+def ensure_columns(df: pd.DataFrame, required: set[str]):
+    """Raise ``ValueError`` naming the *required* columns *df* lacks."""
+
     missing = required - set(df.columns)
     if missing:
         raise ValueError(f"DataFrame is missing required columns: {', '.join(sorted(missing))}")
 
 
+def load_frame(source: TableSource, columns: Iterable[str]) -> pd.DataFrame:
+    """Return *source* as a DataFrame, reading only *columns* from uploads."""
+
+    if isinstance(source, LedgerFrame):
+        return source.df
+    if isinstance(source, pd.DataFrame):
+        return source
+    if isinstance(source, SharedFrameHandle):
+        return read_frame(source, columns=columns)
+    return read_columnar(source, columns=sorted(columns))
+
+
+def prepare_frame(source: TableSource, columns: Iterable[str]) -> pd.DataFrame:
+    """Like :func:`load_frame` but normalised – a no‑op for a :class:`LedgerFrame`."""
+
+    if isinstance(source, LedgerFrame):
+        return source.df
+    return normalize_audit_frame(load_frame(source, columns))
+
+
+def _normalize_labels(values: pd.Series, categories: List[str]) -> pd.Categorical:
+    """Strip/lower‑case *values* once per distinct label → categorical.
+
+    Labels outside *categories* become missing.  The string work runs on the
+    unique labels only, then is broadcast back through the factorised codes.
+    """
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    lowered = pd.Index(uniques.astype(str)).str.strip().str.lower()
+    unique_codes = pd.Categorical(lowered, categories=categories).codes
+    row_codes = np.where(codes >= 0, unique_codes[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(row_codes, categories=categories), index=values.index)
+
+
+def _match_labels(values: pd.Series, keyword: str) -> np.ndarray:
+    """Case‑insensitive substring test evaluated once per distinct label."""
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    hits = np.asarray(pd.Index(uniques.astype(str)).str.contains(keyword, case=False, regex=False), dtype=bool)
+    return np.where(codes >= 0, hits[codes], False)
+
+
+def _duplicate_mask(df: pd.DataFrame, window: str | pd.Timedelta) -> np.ndarray:
+    """Flag rows sharing ``account`` and ``amount`` with another row less than
+    *window* apart (true sliding window, no calendar buckets).
+
+    Rows are sorted once by (account, amount, date); within a key the nearest
+    neighbour in time is always adjacent, so comparing consecutive rows with
+    vectorised diffs finds every pair.  Rows with a missing date, account or
+    amount are never flagged.
+    """
+
+    if len(df) < 2:
+        return np.zeros(len(df), dtype=bool)
+    return _adjacent_duplicates(*_duplicate_key(df), pd.Timedelta(window).value)
+
+
+def _duplicate_key(df: pd.DataFrame) -> tuple:
+    """``(key, ticks, valid)`` arrays for :func:`_adjacent_duplicates`.
+
+    One int64 key per (account, amount), date ticks in nanoseconds and a
+    mask of rows with all three present.
+    """
+
+    acc_codes = pd.factorize(df["account"], use_na_sentinel=True)[0]
+    amt_codes = pd.factorize(df["amount"], use_na_sentinel=True)[0]
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    valid = (acc_codes >= 0) & (amt_codes >= 0) & dates.notna().to_numpy()
+    ticks = dates.to_numpy(dtype="datetime64[ns]").view("i8")
+    key = acc_codes.astype(np.int64) * (int(amt_codes.max(initial=0)) + 2) + amt_codes
+    return key, ticks, valid
+
+
+def _adjacent_duplicates(key: np.ndarray, ticks: np.ndarray, valid: np.ndarray, window_ns: int) -> np.ndarray:
+    """Core of :func:`_duplicate_mask` on plain integer arrays."""
+
+    n = len(key)
+    if n < 2:
+        return np.zeros(n, dtype=bool)
+
+    # Two stable argsorts (time, then key) beat a multi‑key lexsort
+    by_time = np.argsort(ticks, kind="stable")
+    order = by_time[np.argsort(key[by_time], kind="stable")]
+    key_s, ticks_s, valid_s = key[order], ticks[order], valid[order]
+
+    pair = (
+        (key_s[1:] == key_s[:-1])
+        & valid_s[1:]
+        & valid_s[:-1]
+        & ((ticks_s[1:] - ticks_s[:-1]) < window_ns)
+    )
+    flagged_sorted = np.zeros(n, dtype=bool)
+    flagged_sorted[1:] |= pair
+    flagged_sorted[:-1] |= pair
+
+    mask = np.empty(n, dtype=bool)
+    mask[order] = flagged_sorted
+    return mask
+
+
+def _digit_signature(cents: np.ndarray) -> np.ndarray:
+    """Order‑independent signature of each amount's digits (in cents).
+
+    Counts of each digit 0–9 packed 4 bits apiece into an int64, so amounts
+    that are permutations of one another – e.g. a transposition typo such as
+    1 254,00 vs 1 524,00 – share a signature.
+    """
+
+    remaining = np.abs(cents)
+    signature = np.zeros(len(cents), dtype=np.int64)
+    while True:
+        live = remaining > 0
+        if not live.any():
+            return signature
+        digit = remaining % 10
+        signature[live] += np.left_shift(np.int64(1), 4 * digit[live])
+        remaining //= 10
+
+
+def _is_digit_swap(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """True where *a* and *b* (same digit signature) differ in exactly two digit positions."""
+
+    a, b = np.abs(a), np.abs(b)
+    differing = np.zeros(len(a), dtype=np.int64)
+    while (a > 0).any() or (b > 0).any():
+        differing += (a % 10) != (b % 10)
+        a, b = a // 10, b // 10
+    return differing == 2
+
+
+def _neighbour_pairs(order: np.ndarray, neighbourhood: int) -> Iterator[tuple]:
+    """Yield ``(i, j)`` position arrays for rows up to *neighbourhood* apart in *order*."""
+
+    for k in range(1, min(neighbourhood, len(order) - 1) + 1):
+        yield order[:-k], order[k:]
+
+
+def _description_similarity(values: pd.Series, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """``difflib`` ratio between the descriptions of each candidate pair.
+
+    Descriptions are factorised first so each distinct pair of texts is
+    compared once; missing text gives NaN.
+    """
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    texts = [str(u).strip().lower() for u in uniques]
+    cache: Dict[tuple, float] = {}
+    out = np.full(len(first), np.nan)
+    for n, (a, b) in enumerate(zip(codes[first], codes[second])):
+        if a < 0 or b < 0:
+            continue
+        pair = (a, b) if a <= b else (b, a)
+        if pair not in cache:
+            cache[pair] = 1.0 if a == b else SequenceMatcher(None, texts[a], texts[b]).ratio()
+        out[n] = cache[pair]
+    return out
+
+
+def _side_amounts(df: pd.DataFrame) -> tuple:
+    """Return ``(debit_amount, credit_amount)`` float arrays for each line.
+
+    When both ``debit`` and ``credit`` only hold 0/1 they are flags and the
+    line's ``amount`` goes to the flagged side; otherwise they already are
+    monetary columns.  Missing values count as zero.
+    """
+
+    debit = pd.to_numeric(df["debit"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+    credit = pd.to_numeric(df["credit"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+    if np.isin(debit, (0, 1)).all() and np.isin(credit, (0, 1)).all():
+        amount = pd.to_numeric(df["amount"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+        return amount * (debit == 1), amount * (credit == 1)
+    return debit, credit
+
+
+def _verify_partition(job) -> tuple:
+    """Worker: duplicate + balance checks for one account partition.
+
+    The arrays arrive as a :class:`SharedFrameHandle`; every column is a
+    zero‑copy view of the shared Arrow file.
+    """
+
+    handle, lo, hi, window_ns = job
+    table = attach_table(handle)
+    arrays = {name: table.column(name).to_numpy() for name in table.column_names}
+    arrays["valid"] = arrays["valid"].view(np.bool_)
+    return _check_partition(arrays, lo, hi, window_ns)
+
+
+def _check_partition(a: Dict[str, np.ndarray], lo: int, hi: int, window_ns: int) -> tuple:
+    """Row positions flagged as duplicate / unbalanced in ``perm[lo:hi]``."""
+
+    rows = a["perm"][lo:hi].copy()
+    dup = _adjacent_duplicates(a["key"][rows], a["ticks"][rows], a["valid"][rows], window_ns)
+    debit, credit = a["debit"][rows], a["credit"][rows]
+    unbalanced = ((debit == 1) & (credit == 1)) | ((debit == 0) & (credit == 0))
+    return rows[dup], rows[unbalanced]
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Tool #1 – Balance‑sheet sanity checks & ratio analysis
 # ─────────────────────────────────────────────────────────────────────────────
@@ -76,11 +318,26 @@ class BalanceSheetAuditor:
     | amount   | float  | monetary value (same currency everywhere)    |
 
     Anything beyond that is ignored but preserved.
+
+    When account labels carry a chart‑of‑accounts code (``"1105 - Caja"``)
+    the :class:`AccountHierarchy` code ranges decide current vs non‑current
+    and fill in the type, so ``type`` may then be omitted; uncoded accounts
+    fall back to the ``type`` column and the *current* keyword.
+
+    With a lazy *engine* (see :mod:`backend.tools.engines`) the rows are
+    first summed per (keys, account, type) inside the engine; only those
+    group totals reach pandas.
     """
 
     _REQ_COLS = {"account", "type", "amount"}
 
-    def __init__(self, *, materiality_threshold: float = 0.01):
+    def __init__(
+        self,
+        *,
+        materiality_threshold: float = 0.01,
+        hierarchy: Optional["AccountHierarchy"] = None,
+        engine: EngineSpec = None,
+    ):
         """Create an auditor.
 
         Parameters
@@ -88,27 +345,34 @@ class BalanceSheetAuditor:
         materiality_threshold:
             Differences (e.g. Assets − (Liabilities + Equity)) larger than this
             fraction of total assets are flagged.
+        hierarchy:
+            Code ranges used to classify coded accounts (default
+            :class:`AccountHierarchy` ranges).
+        engine:
+            ``"pandas"`` (default), ``"polars"``, ``"duckdb"``, ``"auto"`` or
+            an :class:`~backend.tools.engines.AuditEngine`.
         """
 
         self.materiality_threshold = materiality_threshold
+        self.hierarchy = hierarchy or AccountHierarchy()
+        self.engine = engine
         self.findings: List[str] = []
 
     # ---------------------------------------------------------------------
     # Public API
     # ---------------------------------------------------------------------
 
-    def audit(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def audit(self, df: TableSource) -> Dict[str, Any]:
         """Return key ratios and any findings as a dict."""
 
-        _ensure_columns(df, self._REQ_COLS)
+        df = self._frame(df, [])
+        ensure_columns(df, self._required(df))
 
-        # Totals
-        total_assets = df.loc[df["type"].str.lower() == "asset", "amount"].sum()
-        total_liab   = df.loc[df["type"].str.lower() == "liability", "amount"].sum()
-        total_equity = df.loc[df["type"].str.lower() == "equity", "amount"].sum()
+        row = self._totals_frame(df, []).iloc[0]
+        total_assets, total_liab, total_equity = row["assets"], row["liabilities"], row["equity"]
 
         self.findings.clear()
-        if abs(total_assets - (total_liab + total_equity)) > self.materiality_threshold * max(total_assets, 1):
+        if row["mismatch"]:
             self.findings.append(
                 (
                     "Accounting equation mismatch: Assets "
@@ -116,16 +380,7 @@ class BalanceSheetAuditor:
                 )
             )
 
-        # Liquidity – using a naive *current* keyword search (customise if needed)
-        current_assets = df.loc[
-            (df["type"].str.lower() == "asset") & df["account"].str.contains("current", case=False),
-            "amount",
-        ].sum()
-        current_liab = df.loc[
-            (df["type"].str.lower() == "liability") & df["account"].str.contains("current", case=False),
-            "amount",
-        ].sum()
-        current_ratio = current_assets / current_liab if current_liab else None
+        current_ratio = None if pd.isna(row["current_ratio"]) else float(row["current_ratio"])
 
         return {
             "totals": {
@@ -137,6 +392,104 @@ class BalanceSheetAuditor:
             "findings": list(self.findings),
         }
 
+    def audit_batch(self, df: TableSource, *, keys: Iterable[str] = ("entity", "period")) -> pd.DataFrame:
+        """Audit many balance sheets stacked in one long‑format frame.
+
+        *df* holds the usual columns plus the *keys* identifying each balance
+        sheet (by default ``entity`` and ``period``).  All sheets are totalled
+        in a single grouped aggregation; the result has one row per sheet
+        with ``assets``, ``liabilities``, ``equity``, ``current_assets``,
+        ``current_liabilities``, ``current_ratio``, ``difference`` and the
+        boolean ``mismatch`` flag.
+        """
+
+        keys = list(keys)
+        df = self._frame(df, keys)
+        ensure_columns(df, self._required(df) | set(keys))
+        return self._totals_frame(df, keys).sort_index()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    _KINDS = ["asset", "liability", "equity"]
+
+    def _frame(self, source: TableSource, keys: List[str]) -> pd.DataFrame:
+        """Normalised rows – or, with a lazy engine, per‑group amount totals.
+
+        Summing per (keys, account, type) first leaves every total of
+        :meth:`_totals_frame` unchanged, since those are sums over the same
+        groups.
+        """
+
+        engine = get_engine(self.engine, source=source)
+        if not engine.lazy:
+            return prepare_frame(source, self._REQ_COLS | set(keys))
+        available = set(engine.columns(source))
+        by = [c for c in [*keys, "account", "type"] if c in available]
+        return normalize_audit_frame(engine.group_sum(source, by, "amount"))
+
+    def _required(self, df: pd.DataFrame) -> set[str]:
+        """``type`` may be left out when every account label carries a code."""
+
+        if "type" in df.columns or "account" not in df.columns:
+            return self._REQ_COLS
+        row_codes, accounts = self.hierarchy.parse(df["account"])
+        if (row_codes >= 0).all() and accounts["kind"].notna().all():
+            return self._REQ_COLS - {"type"}
+        return self._REQ_COLS
+
+    def _totals_frame(self, df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """Totals and equation check for every group of *keys* in one pass."""
+
+        # Chart‑of‑accounts codes, parsed once per distinct account; the
+        # appended sentinel serves rows with a missing label (code −1)
+        row_codes, accounts = self.hierarchy.parse(df["account"])
+        code_kind = np.append(pd.Categorical(accounts["kind"], categories=self._KINDS).codes, -1)
+        coded = np.append(accounts["code"].to_numpy() != "", False)[row_codes]
+        code_current = np.append(accounts["current"].to_numpy(dtype=bool), False)[row_codes]
+
+        kind_codes = code_kind[row_codes]
+        if "type" in df.columns:
+            typed = _normalize_labels(df["type"], self._KINDS).cat.codes.to_numpy()
+            kind_codes = np.where(typed >= 0, typed, kind_codes)
+        kind = pd.Series(pd.Categorical.from_codes(kind_codes, categories=self._KINDS), index=df.index, name="_kind")
+
+        # Liquidity – code ranges for coded accounts, *current* keyword otherwise
+        is_current = pd.Series(
+            np.where(coded, code_current, _match_labels(df["account"], "current")), index=df.index, name="_current"
+        )
+        by = [df[k] for k in keys] or [pd.Series(0, index=df.index, name="_sheet")]
+
+        grouped = (
+            df["amount"]
+            .groupby([*by, kind, is_current], observed=True, sort=False)
+            .sum()
+            .unstack(["_kind", "_current"], fill_value=0.0)
+        )
+        if not keys:
+            # A single sheet always yields one row, even with no typed lines
+            grouped = grouped.reindex(pd.Index([0], name="_sheet"), fill_value=0.0)
+
+        def total(kind_name: str, current_only: bool = False) -> pd.Series:
+            cols = [c for c in grouped.columns if c[0] == kind_name and (c[1] or not current_only)]
+            return grouped[cols].sum(axis=1) if cols else pd.Series(0.0, index=grouped.index)
+
+        out = pd.DataFrame(
+            {
+                "assets": total("asset"),
+                "liabilities": total("liability"),
+                "equity": total("equity"),
+                "current_assets": total("asset", current_only=True),
+                "current_liabilities": total("liability", current_only=True),
+            },
+            index=grouped.index,
+        )
+        out["current_ratio"] = out["current_assets"] / out["current_liabilities"].where(out["current_liabilities"] != 0)
+        out["difference"] = out["assets"] - (out["liabilities"] + out["equity"])
+        out["mismatch"] = out["difference"].abs() > self.materiality_threshold * out["assets"].clip(lower=1)
+        return out
+
     # ------------------------------------------------------------------
     # Pretty helpers
     # ------------------------------------------------------------------
@@ -159,49 +512,583 @@ class TransactionVerifier:
         * ``debit``  – numeric (0/1 flags are allowed)
         * ``credit`` – numeric (0/1 flags are allowed)
         * ``amount`` – numeric
+
+    :meth:`verify` can run on a lazy *engine* (see
+    :mod:`backend.tools.engines`); only the flagged rows are materialised.
     """
 
     _REQ_COLS = {"date", "account", "debit", "credit", "amount"}
 
-    def __init__(self):
+    def __init__(self, *, engine: EngineSpec = None):
+        self.engine = engine
         self.anomalies: Optional[pd.DataFrame] = None
 
-    def verify(self, df: pd.DataFrame, *, duplicate_window: str | pd.Timedelta = "1D") -> pd.DataFrame:
+    def verify(self, df: TableSource, *, duplicate_window: str | pd.Timedelta = "1D") -> pd.DataFrame:
         """Return a DataFrame with all detected anomalies (may be empty)."""
 
-        _ensure_columns(df, self._REQ_COLS)
-        out_frames: List[pd.DataFrame] = []
+        engine = get_engine(self.engine, source=df)
+        if engine.lazy:
+            frame = df.df if isinstance(df, LedgerFrame) else df
+            columns = list(frame.columns) if isinstance(frame, pd.DataFrame) else []
+            columns += sorted(self._REQ_COLS - set(columns))
+            flagged = engine.transaction_flags(df, columns, pd.Timedelta(duplicate_window).value)
+            dup, unbalanced = flagged.pop("_dup").to_numpy(dtype=bool), flagged.pop("_unbalanced").to_numpy(dtype=bool)
+            return self._anomalies(normalize_audit_frame(flagged), dup, unbalanced)
+
+        ledger = df if isinstance(df, LedgerFrame) else None
+        df = prepare_frame(df, self._REQ_COLS)
+        ensure_columns(df, self._REQ_COLS)
+
+        # Duplicates – same account+amount less than *duplicate_window* apart
+        if ledger is not None and len(df) >= 2:
+            dup = _adjacent_duplicates(*ledger.cached("duplicate_key", _duplicate_key), pd.Timedelta(duplicate_window).value)
+        else:
+            dup = _duplicate_mask(df, duplicate_window)
 
-        # Normalise date column
-        df = df.copy()
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        # Unbalanced entries – both debit & credit flags set or both unset
+        unbalanced = (((df["debit"] == 1) & (df["credit"] == 1)) | ((df["debit"] == 0) & (df["credit"] == 0))).to_numpy()
+        return self._anomalies(df, dup, unbalanced)
 
-        # Duplicates – same account+amount within *duplicate_window*
-        dupes = (
-            df.sort_values("date")
-            .set_index("date")
-            .groupby([pd.Grouper(freq=duplicate_window), "account", "amount"])
-            .filter(lambda g: len(g) > 1)
-        )
+    def _anomalies(self, df: pd.DataFrame, dup: np.ndarray, unbalanced: np.ndarray) -> pd.DataFrame:
+        """Assemble (and keep) the anomalies frame from the two row masks."""
+
+        out_frames: List[pd.DataFrame] = []
+        dupes = df[dup].sort_values("date", kind="stable")
         if not dupes.empty:
-            dupes["issue"] = "potential duplicate"
-            out_frames.append(dupes)
+            out_frames.append(dupes.assign(issue="potential duplicate"))
 
-        # Unbalanced entries – both debit & credit flags set or both unset
-        unbalanced = df[((df["debit"] == 1) & (df["credit"] == 1)) | ((df["debit"] == 0) & (df["credit"] == 0))]
+        unbalanced = df[unbalanced]
         if not unbalanced.empty:
-            unbalanced["issue"] = "unbalanced entry"
-            out_frames.append(unbalanced)
+            out_frames.append(unbalanced.assign(issue="unbalanced entry"))
 
         self.anomalies = pd.concat(out_frames).drop_duplicates() if out_frames else pd.DataFrame(columns=df.columns.tolist() + ["issue"])
         return self.anomalies
 
+    def verify_entries(
+        self,
+        df: TableSource,
+        *,
+        entry_col: str = "entry_id",
+        tolerance: float = 0.01,
+    ) -> pd.DataFrame:
+        """Return the journal entries whose debits and credits don't net to zero.
+
+        Lines are grouped by *entry_col* and the summed debit and credit
+        amounts compared within *tolerance*.  ``debit``/``credit`` may be 0/1
+        flags (the line's ``amount`` goes to the flagged side) or monetary
+        columns.  Aggregation is a factorise + ``bincount`` pass, so tens of
+        millions of lines take seconds.
+
+        Columns: *entry_col*, ``lines``, ``debit_total``, ``credit_total``,
+        ``difference`` – sorted by absolute difference, largest first.
+        """
+
+        required = {entry_col, "debit", "credit", "amount"}
+        df = load_frame(df, required)
+        ensure_columns(df, required)
+
+        codes, entries = pd.factorize(df[entry_col], use_na_sentinel=True)
+        debit_amt, credit_amt = _side_amounts(df)
+        keep = codes >= 0
+        codes = codes[keep]
+        size = len(entries)
+
+        lines = np.bincount(codes, minlength=size)
+        debit_total = np.bincount(codes, weights=debit_amt[keep], minlength=size)
+        credit_total = np.bincount(codes, weights=credit_amt[keep], minlength=size)
+        difference = debit_total - credit_total
+
+        out_of_balance = np.abs(difference) > tolerance
+        order = np.argsort(-np.abs(difference[out_of_balance]), kind="stable")
+        return pd.DataFrame(
+            {
+                entry_col: np.asarray(entries)[out_of_balance][order],
+                "lines": lines[out_of_balance][order],
+                "debit_total": debit_total[out_of_balance][order],
+                "credit_total": credit_total[out_of_balance][order],
+                "difference": difference[out_of_balance][order],
+            }
+        )
+
+    def find_near_duplicates(
+        self,
+        df: TableSource,
+        *,
+        amount_tolerance: float = 1.0,
+        date_window: str | pd.Timedelta = "3D",
+        min_description_similarity: Optional[float] = 0.6,
+        description_col: str = "description",
+        neighbourhood: int = 5,
+        transpositions: bool = True,
+    ) -> pd.DataFrame:
+        """Return pairs of lines in the same account that look like the same transaction.
+
+        A pair is a candidate when its amounts differ by at most
+        *amount_tolerance* – or, with *transpositions*, one is the other with
+        two digits swapped – and its dates are at most *date_window* apart.
+        When *description_col* exists, pairs whose descriptions are less
+        than *min_description_similarity* alike (``difflib`` ratio) are
+        dropped; pass ``None`` to keep them all.
+
+        Candidates come from blocking on ``account`` and a sorted
+        neighbourhood: rows are sorted by (account, amount, date) – and once
+        more by (account, digit signature, date) for transpositions – and
+        each row is compared only with the next *neighbourhood* rows, so the
+        work grows as ``n · neighbourhood`` rather than ``n²``.  Description
+        similarity is computed only for the pairs that survive.
+
+        Columns: ``first``/``second`` (index labels, earlier date first), ``account``,
+        ``date_first``/``date_second``, ``amount_first``/``amount_second``,
+        ``amount_difference``, ``days_apart``, ``match`` (``"same amount"``,
+        ``"near amount"`` or ``"transposed digits"``) and
+        ``description_similarity``.
+        """
+
+        required = {"date", "account", "amount"}
+        df = load_frame(df, required | {description_col})
+        ensure_columns(df, required)
+
+        acc_codes = pd.factorize(df["account"], use_na_sentinel=True)[0].astype(np.int64)
+        amounts = pd.to_numeric(df["amount"], errors="coerce").to_numpy(dtype="float64")
+        dates = pd.to_datetime(df["date"], errors="coerce")
+        ticks = dates.to_numpy(dtype="datetime64[ns]").view("i8")
+        valid = (acc_codes >= 0) & ~np.isnan(amounts) & dates.notna().to_numpy()
+        cents = np.round(np.nan_to_num(amounts) * 100).astype(np.int64)
+        window_ns = pd.Timedelta(date_window).value
+        tolerance_cents = int(round(amount_tolerance * 100))
+
+        by_time = np.argsort(ticks, kind="stable")
+
+        def block_order(sort_key: np.ndarray) -> np.ndarray:
+            order = by_time[np.argsort(sort_key[by_time], kind="stable")]
+            return order[np.argsort(acc_codes[order], kind="stable")]
+
+        def close(i: np.ndarray, j: np.ndarray) -> np.ndarray:
+            return (
+                (acc_codes[i] == acc_codes[j])
+                & valid[i]
+                & valid[j]
+                & (np.abs(ticks[i] - ticks[j]) <= window_ns)
+            )
+
+        firsts: List[np.ndarray] = []
+        seconds: List[np.ndarray] = []
+        for i, j in _neighbour_pairs(block_order(cents), neighbourhood):
+            hit = close(i, j) & (np.abs(cents[i] - cents[j]) <= tolerance_cents)
+            firsts.append(i[hit])
+            seconds.append(j[hit])
+
+        if transpositions:
+            signature = _digit_signature(cents)
+            for i, j in _neighbour_pairs(block_order(signature), neighbourhood):
+                hit = close(i, j) & (signature[i] == signature[j]) & (cents[i] != cents[j])
+                hit[hit] = _is_digit_swap(cents[i[hit]], cents[j[hit]])
+                firsts.append(i[hit])
+                seconds.append(j[hit])
+
+        first = np.concatenate(firsts) if firsts else np.empty(0, dtype=np.int64)
+        second = np.concatenate(seconds) if seconds else np.empty(0, dtype=np.int64)
+        first, second = np.minimum(first, second), np.maximum(first, second)
+        _, unique_at = np.unique(first * len(df) + second, return_index=True)
+        first, second = first[unique_at], second[unique_at]
+        later = ticks[first] > ticks[second]
+        first, second = np.where(later, second, first), np.where(later, first, second)
+
+        difference = (cents[second] - cents[first]) / 100
+        match = np.where(
+            difference == 0,
+            "same amount",
+            np.where(np.abs(cents[second] - cents[first]) <= tolerance_cents, "near amount", "transposed digits"),
+        )
+
+        similarity = np.full(len(first), np.nan)
+        if description_col in df.columns:
+            similarity = _description_similarity(df[description_col], first, second)
+            if min_description_similarity is not None:
+                keep = ~(similarity < min_description_similarity)
+                first, second, difference, match, similarity = (
+                    first[keep], second[keep], difference[keep], match[keep], similarity[keep]
+                )
+
+        pairs = pd.DataFrame(
+            {
+                "first": df.index[first],
+                "second": df.index[second],
+                "account": df["account"].to_numpy()[first],
+                "date_first": dates.to_numpy()[first],
+                "date_second": dates.to_numpy()[second],
+                "amount_first": amounts[first],
+                "amount_second": amounts[second],
+                "amount_difference": difference,
+                "days_apart": np.abs(ticks[second] - ticks[first]) / pd.Timedelta("1D").value,
+                "match": match,
+                "description_similarity": similarity,
+            }
+        )
+        return pairs.sort_values(["account", "date_first", "first"], kind="stable").reset_index(drop=True)
+
+    def verify_parallel(
+        self,
+        df: TableSource,
+        *,
+        duplicate_window: str | pd.Timedelta = "1D",
+        workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Same result as :meth:`verify`, computed across a process pool.
+
+        Duplicate and balance checks are independent per account, so the
+        ledger is hash‑partitioned by ``account``.  Only integer encodings
+        (account/amount codes, date ticks, debit/credit flags) and a
+        partition permutation are placed – once – in a
+        :class:`~backend.tools.shared_frames.SharedFrameRegistry`; workers
+        receive its handle, map the arrays without copying, return the row
+        positions they flag, and the parent merges them in row order so
+        output is deterministic.
+        """
+
+        df = prepare_frame(df, self._REQ_COLS)
+        ensure_columns(df, self._REQ_COLS)
+        workers = workers or os.cpu_count() or 1
+
+        acc_codes = pd.factorize(df["account"], use_na_sentinel=True)[0].astype(np.int64)
+        amt_codes = pd.factorize(df["amount"], use_na_sentinel=True)[0].astype(np.int64)
+        ticks = df["date"].to_numpy(dtype="datetime64[ns]").view("i8")
+        valid = (acc_codes >= 0) & (amt_codes >= 0) & df["date"].notna().to_numpy()
+        key = acc_codes * (int(amt_codes.max(initial=0)) + 2) + amt_codes
+        debit = pd.to_numeric(df["debit"], errors="coerce").to_numpy(dtype="float64")
+        credit = pd.to_numeric(df["credit"], errors="coerce").to_numpy(dtype="float64")
+
+        part = (pd.util.hash_array(acc_codes) % np.uint64(workers)).astype(np.int64)
+        perm = np.argsort(part, kind="stable")
+        bounds = np.searchsorted(part[perm], np.arange(workers + 1))
+
+        arrays = {
+            "key": key,
+            "ticks": ticks,
+            "valid": valid,
+            "debit": debit,
+            "credit": credit,
+            "perm": perm,
+        }
+        window_ns = pd.Timedelta(duplicate_window).value
+
+        spans = [(int(bounds[i]), int(bounds[i + 1])) for i in range(workers) if bounds[i + 1] > bounds[i]]
+        if len(spans) <= 1:
+            results = [_check_partition(arrays, lo, hi, window_ns) for lo, hi in spans]
+        else:
+            # bool is bit‑packed in Arrow; ship it as uint8 so workers can view it
+            columns = pd.DataFrame({**arrays, "valid": valid.view(np.uint8)}, copy=False)
+            with SharedFrameRegistry() as registry, ProcessPoolExecutor(max_workers=len(spans)) as pool:
+                handle = registry.put(columns)
+                results = list(pool.map(_verify_partition, [(handle, lo, hi, window_ns) for lo, hi in spans]))
+
+        dup_pos = np.sort(np.concatenate([r[0] for r in results])) if results else np.empty(0, dtype=np.int64)
+        unb_pos = np.sort(np.concatenate([r[1] for r in results])) if results else np.empty(0, dtype=np.int64)
+
+        out_frames: List[pd.DataFrame] = []
+        if len(dup_pos):
+            out_frames.append(
+                df.iloc[dup_pos].sort_values("date", kind="stable").assign(issue="potential duplicate")
+            )
+        if len(unb_pos):
+            out_frames.append(df.iloc[unb_pos].assign(issue="unbalanced entry"))
+
+        self.anomalies = pd.concat(out_frames).drop_duplicates() if out_frames else pd.DataFrame(columns=df.columns.tolist() + ["issue"])
+        return self.anomalies
+
+    def verify_stream(
+        self,
+        chunks: Iterable[pd.DataFrame] | str | Path,
+        *,
+        duplicate_window: str | pd.Timedelta = "1D",
+    ) -> Iterator[pd.DataFrame]:
+        """Verify a date‑sorted ledger chunk by chunk, yielding anomalies as found.
+
+        *chunks* is any iterable of DataFrames (or the path of a CSV, read
+        with :func:`~backend.tools.tabular_tools.iter_csv_chunks`).  Only the
+        rows still inside the duplicate window are carried between chunks, so
+        memory stays bounded however long the ledger is.  Yielded frames are
+        indexed by the row's position in the whole ledger.
+        """
+
+        if isinstance(chunks, (str, Path)):
+            chunks = iter_csv_chunks(chunks, columns=self._REQ_COLS)
+
+        stream = StreamingTransactionVerifier(duplicate_window=duplicate_window)
+        for chunk in chunks:
+            found = stream.feed(chunk)
+            if not found.empty:
+                yield found
+        self.anomalies = None  # streamed results are not kept in memory
+
     def __repr__(self) -> str:  # pragma: no cover
         if self.anomalies is None:
             return "<TransactionVerifier (not run yet)>"
         return f"<TransactionVerifier anomalies={len(self.anomalies)}>"
 
 
+class StreamingTransactionVerifier:
+    """Incremental form of :class:`TransactionVerifier` for date‑sorted chunks.
+
+    Each :meth:`feed` call checks the new rows against themselves and against
+    the *carry‑over* – the earlier rows dated within ``duplicate_window`` of
+    the latest date seen.  Older rows can no longer pair with anything that
+    follows and are dropped.  A row already reported as a duplicate is not
+    reported again; a carried row is reported late when a later chunk
+    supplies its pair.
+    """
+
+    _REQ_COLS = TransactionVerifier._REQ_COLS
+
+    def __init__(self, *, duplicate_window: str | pd.Timedelta = "1D"):
+        self.duplicate_window = pd.Timedelta(duplicate_window)
+        self.rows_seen = 0
+        self.anomalies_found = 0
+        self.max_date: Optional[pd.Timestamp] = None
+        self.carry: Optional[pd.DataFrame] = None
+        # Free‑form JSON‑serialisable data persisted with the state
+        self.meta: Dict[str, Any] = {}
+
+    def feed(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Consume the next chunk and return the anomalies it reveals."""
+
+        ensure_columns(chunk, self._REQ_COLS)
+        chunk = chunk.assign(date=pd.to_datetime(chunk["date"], errors="coerce"))
+        chunk.index = pd.RangeIndex(self.rows_seen, self.rows_seen + len(chunk))
+        self.rows_seen += len(chunk)
+
+        combined = chunk.assign(_reported=False)
+        if self.carry is not None and not self.carry.empty:
+            combined = pd.concat([self.carry, combined])
+
+        dup = _duplicate_mask(combined, self.duplicate_window)
+        reported = combined["_reported"].to_numpy(dtype=bool)
+        out_frames: List[pd.DataFrame] = []
+
+        new_dupes = combined[dup & ~reported].drop(columns="_reported")
+        if not new_dupes.empty:
+            out_frames.append(new_dupes.sort_values("date", kind="stable").assign(issue="potential duplicate"))
+
+        unbalanced = chunk[((chunk["debit"] == 1) & (chunk["credit"] == 1)) | ((chunk["debit"] == 0) & (chunk["credit"] == 0))]
+        if not unbalanced.empty:
+            out_frames.append(unbalanced.assign(issue="unbalanced entry"))
+
+        # Keep only the rows a future (later‑dated) row could still pair with
+        chunk_max = chunk["date"].max()
+        if pd.notna(chunk_max):
+            self.max_date = chunk_max if self.max_date is None else max(self.max_date, chunk_max)
+        if self.max_date is not None:
+            combined["_reported"] = reported | dup
+            self.carry = combined[combined["date"] > self.max_date - self.duplicate_window]
+
+        found = pd.concat(out_frames) if out_frames else pd.DataFrame(columns=chunk.columns.tolist() + ["issue"])
+        self.anomalies_found += len(found)
+        return found
+
+    def save(self, path: str | Path) -> None:
+        """Persist the verifier to *path* (JSON) plus an Arrow IPC carry file.
+
+        Counters and :attr:`meta` go to the JSON file; the carried rows (with
+        their ledger positions as index) go to a new ``<path>.<token>.arrow``
+        file that the JSON names.  The JSON is renamed into place last, so a
+        crash leaves either the old or the new state, never a mix.
+        """
+
+        if pa is None:
+            raise ImportError("Saving verifier state requires pyarrow (pip install pyarrow)")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        previous = self._carry_file(path)
+
+        carry_name = None
+        if self.carry is not None:
+            carry = self.carry.copy()
+            for col in carry.columns[carry.dtypes == object]:
+                carry[col] = carry[col].astype("string")
+            carry_name = f"{path.name}.{uuid.uuid4().hex[:12]}.arrow"
+            with pa.OSFile(str(path.with_name(carry_name)), "wb") as sink:
+                table = pa.Table.from_pandas(carry, preserve_index=True)
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+        state = {
+            "duplicate_window": self.duplicate_window.isoformat(),
+            "rows_seen": self.rows_seen,
+            "anomalies_found": self.anomalies_found,
+            "max_date": None if self.max_date is None else self.max_date.isoformat(),
+            "carry_file": carry_name,
+            "meta": self.meta,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, path)
+        if previous is not None and previous.name != carry_name:
+            previous.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "StreamingTransactionVerifier":
+        """Rebuild a verifier saved with :meth:`save`."""
+
+        path = Path(path)
+        state = json.loads(path.read_text(encoding="utf-8"))
+        stream = cls(duplicate_window=pd.Timedelta(state["duplicate_window"]))
+        stream.rows_seen = int(state["rows_seen"])
+        stream.anomalies_found = int(state["anomalies_found"])
+        stream.max_date = None if state["max_date"] is None else pd.Timestamp(state["max_date"])
+        stream.meta = state.get("meta") or {}
+        carry_file = cls._carry_file(path)
+        if carry_file is not None:
+            if pa is None:
+                raise ImportError("Loading verifier state requires pyarrow (pip install pyarrow)")
+            with pa.memory_map(str(carry_file), "r") as source:
+                stream.carry = pa.ipc.open_file(source).read_all().to_pandas()
+        return stream
+
+    @classmethod
+    def delete(cls, path: str | Path) -> None:
+        """Remove a state saved with :meth:`save` (JSON and carry file)."""
+
+        path = Path(path)
+        carry_file = cls._carry_file(path)
+        path.unlink(missing_ok=True)
+        if carry_file is not None:
+            carry_file.unlink(missing_ok=True)
+
+    @staticmethod
+    def _carry_file(path: Path) -> Optional[Path]:
+        """Carry file named by the JSON state at *path*, if any."""
+
+        if not path.exists():
+            return None
+        name = json.loads(path.read_text(encoding="utf-8")).get("carry_file")
+        # Only a bare file name next to the state is accepted
+        if not name or Path(name).name != name:
+            return None
+        return path.with_name(name)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        carried = 0 if self.carry is None else len(self.carry)
+        return f"<StreamingTransactionVerifier rows={self.rows_seen} carried={carried} anomalies={self.anomalies_found}>"
+
+
+class ContinuousTransactionVerifier:
+    """Continuous‑audit mode: verify each client's ledger one delta at a time.
+
+    The state of a :class:`StreamingTransactionVerifier` – counters (JSON)
+    plus the rows still inside the duplicate window (Arrow IPC) – is kept
+    per client under *state_dir*.  :meth:`verify_delta` loads it, checks only the newly
+    appended transactions (against each other and the carried window), and
+    saves it back, so a daily run costs time proportional to the delta
+    rather than to the whole history.
+
+    A delta row dated at or before *latest date seen − duplicate_window*
+    could only pair with history that is no longer held; it is still
+    checked against the carried rows and is also reported as
+    ``"back-dated entry"`` so late postings don't slip through silently.
+
+    Deltas are idempotent: a content fingerprint of each applied delta is
+    saved with the state (the last :attr:`MAX_FINGERPRINTS`), and a delta
+    seen before – e.g. a retried daily job – is skipped instead of being
+    fed again.
+    """
+
+    MAX_FINGERPRINTS = 1000
+
+    _REQ_COLS = TransactionVerifier._REQ_COLS
+
+    def __init__(self, state_dir: str | Path, *, duplicate_window: str | pd.Timedelta = "1D"):
+        self.state_dir = Path(state_dir)
+        self.duplicate_window = pd.Timedelta(duplicate_window)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def state_path(self, client_id: str) -> Path:
+        """File holding *client_id*'s verifier state."""
+
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", str(client_id))
+        return self.state_dir / f"{safe_id}.json"
+
+    def load(self, client_id: str) -> StreamingTransactionVerifier:
+        """Return *client_id*'s saved verifier, or a fresh one on first use."""
+
+        path = self.state_path(client_id)
+        if not path.exists():
+            return StreamingTransactionVerifier(duplicate_window=self.duplicate_window)
+        stream = StreamingTransactionVerifier.load(path)
+        if stream.duplicate_window != self.duplicate_window:
+            raise ValueError(
+                f"State for client {client_id!r} was built with duplicate_window="
+                f"{stream.duplicate_window}, not {self.duplicate_window}; reset it first"
+            )
+        return stream
+
+    def verify_delta(self, client_id: str, delta: TableSource) -> pd.DataFrame:
+        """Verify newly appended transactions and return the anomalies involving them.
+
+        Returned rows are indexed by their position in the client's whole
+        ledger (earlier deltas included).  Carried rows are returned when a
+        new row completes a duplicate pair with them.  The ledger size after
+        this delta is in ``result.attrs["rows_seen"]``; a delta applied before
+        returns no rows and ``result.attrs["already_applied"]`` is ``True``.
+        """
+
+        delta = load_frame(delta, self._REQ_COLS)
+        ensure_columns(delta, self._REQ_COLS)
+        fingerprint = self.fingerprint(delta)
+
+        with self._lock(client_id):
+            stream = self.load(client_id)
+            applied = stream.meta.setdefault("applied_deltas", [])
+            if fingerprint in applied:
+                result = pd.DataFrame(columns=delta.columns.tolist() + ["issue"])
+                result.attrs.update(rows_seen=stream.rows_seen, already_applied=True)
+                return result
+            start = stream.rows_seen
+            horizon = None if stream.max_date is None else stream.max_date - self.duplicate_window
+
+            found = stream.feed(delta)
+
+            out_frames: List[pd.DataFrame] = [found] if not found.empty else []
+            if horizon is not None:
+                dates = pd.to_datetime(delta["date"], errors="coerce")
+                late = (dates <= horizon).to_numpy()
+                if late.any():
+                    late_rows = delta[late].assign(date=dates[late])
+                    late_rows.index = pd.RangeIndex(start, start + len(delta))[late]
+                    out_frames.append(late_rows.assign(issue="back-dated entry"))
+                    stream.anomalies_found += int(late.sum())
+
+            applied.append(fingerprint)
+            del applied[: -self.MAX_FINGERPRINTS]
+            stream.save(self.state_path(client_id))
+            rows_seen = stream.rows_seen
+
+        result = pd.concat(out_frames) if out_frames else pd.DataFrame(columns=delta.columns.tolist() + ["issue"])
+        result.attrs.update(rows_seen=rows_seen, already_applied=False)
+        return result
+
+    @classmethod
+    def fingerprint(cls, delta: pd.DataFrame) -> str:
+        """Content hash of *delta*'s checked columns (row order included)."""
+
+        cols = delta[sorted(cls._REQ_COLS)].assign(date=pd.to_datetime(delta["date"], errors="coerce"))
+        hashes = pd.util.hash_pandas_object(cols, index=False).to_numpy()
+        return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+    def reset(self, client_id: str) -> None:
+        """Forget *client_id*'s state (the next delta starts a new ledger)."""
+
+        with self._lock(client_id):
+            StreamingTransactionVerifier.delete(self.state_path(client_id))
+
+    def _lock(self, client_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(str(client_id), threading.Lock())
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<ContinuousTransactionVerifier state_dir={self.state_dir} window={self.duplicate_window}>"
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Tool #3 – Basic regulatory compliance checklist
 # ─────────────────────────────────────────────────────────────────────────────
@@ -298,3 +1185,1636 @@ class ReportGenerator:
     # ------------------------------------------------------------------
     def __repr__(self):  # pragma: no cover
         return "<ReportGenerator>"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tool #5 – Benford's‑law digit analytics
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class BenfordAnalyzer:
+    """First‑digit and first‑two‑digits tests over the ``amount`` column.
+
+    Leading digits are extracted arithmetically with NumPy (no string
+    formatting) and counted with ``bincount``; per‑account distributions
+    come from a single 2‑D ``bincount`` over (account, digit) codes.  Each
+    distribution is scored with the chi‑square statistic and Nigrini's mean
+    absolute deviation (MAD), which is what the conformity label is based on.
+    Amounts below ``min_amount`` (default 10) are excluded, as is customary.
+    """
+
+    _REQ_COLS = {"amount"}
+
+    # Nigrini's MAD cut‑offs: close / acceptable / marginal conformity
+    _MAD_THRESHOLDS = {1: (0.006, 0.012, 0.015), 2: (0.0012, 0.0018, 0.0022)}
+    # Chi‑square critical values at 5 % for 8 and 89 degrees of freedom
+    _CHI2_CRITICAL = {1: 15.507, 2: 112.022}
+
+    def __init__(self, *, digits: int = 1, min_amount: float = 10.0, min_count: int = 50):
+        if digits not in (1, 2):
+            raise ValueError("digits must be 1 (first digit) or 2 (first two digits)")
+        self.digits = digits
+        self.min_amount = min_amount
+        self.min_count = min_count
+        self.result: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------
+    @property
+    def _first(self) -> int:
+        return 10 ** (self.digits - 1)
+
+    def expected(self) -> np.ndarray:
+        """Benford proportions for every possible leading digit (group)."""
+
+        d = np.arange(self._first, 10 ** self.digits, dtype="float64")
+        return np.log10(1 + 1 / d)
+
+    def leading_digits(self, amounts: np.ndarray) -> np.ndarray:
+        """Leading ``digits`` of each amount (``-1`` where excluded)."""
+
+        x = np.abs(np.asarray(amounts, dtype="float64"))
+        ok = np.isfinite(x) & (x >= max(self.min_amount, self._first))
+        lead = np.full(len(x), -1, dtype=np.int64)
+        xs = x[ok]
+        scale = np.power(10.0, np.floor(np.log10(xs)) - (self.digits - 1))
+        lead[ok] = np.clip(np.floor(xs / scale + 1e-9), self._first, 10 ** self.digits - 1).astype(np.int64)
+        return lead
+
+    # ------------------------------------------------------------------
+    def analyze(self, df: TableSource, *, by: Optional[str] = "account") -> Dict[str, Any]:
+        """Run the test overall and, if *by* is a column, per group.
+
+        Returns ``{"overall": {...}, "by_group": DataFrame | None}``.  The
+        per‑group frame has ``count``, ``chi2``, ``mad``, ``conformity`` and
+        the most over‑represented ``top_digit``; groups with fewer than
+        ``min_count`` usable amounts get ``conformity = "insufficient data"``.
+        """
+
+        columns = self._REQ_COLS | ({by} if by else set())
+        df = load_frame(df, columns)
+        ensure_columns(df, self._REQ_COLS)
+
+        lead = self.leading_digits(pd.to_numeric(df["amount"], errors="coerce").to_numpy())
+        ok = lead >= 0
+        k = 10 ** self.digits - self._first
+        digit_idx = lead[ok] - self._first
+
+        counts = np.bincount(digit_idx, minlength=k)[None, :]
+        overall = self._score(counts).iloc[0].to_dict()
+        overall["observed"] = {str(d + self._first): int(c) for d, c in enumerate(counts[0]) if c}
+
+        by_group = None
+        if by and by in df.columns:
+            codes, groups = pd.factorize(df[by], use_na_sentinel=True)
+            codes = codes[ok]
+            keep = codes >= 0
+            grid = np.bincount(codes[keep] * k + digit_idx[keep], minlength=len(groups) * k).reshape(len(groups), k)
+            by_group = self._score(grid)
+            by_group.index = pd.Index(groups, name=by)
+            by_group = by_group.sort_values("mad", ascending=False)
+
+        self.result = {"overall": overall, "by_group": by_group}
+        return self.result
+
+    def _score(self, counts: np.ndarray) -> pd.DataFrame:
+        """Chi‑square, MAD and conformity label for each row of *counts*."""
+
+        n = counts.sum(axis=1)
+        p = self.expected()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            observed = counts / n[:, None]
+            chi2 = ((counts - n[:, None] * p) ** 2 / (n[:, None] * p)).sum(axis=1)
+        mad = np.abs(observed - p).mean(axis=1)
+
+        close, acceptable, marginal = self._MAD_THRESHOLDS[self.digits]
+        conformity = np.select(
+            [n < self.min_count, mad <= close, mad <= acceptable, mad <= marginal],
+            ["insufficient data", "close", "acceptable", "marginal"],
+            default="nonconformity",
+        )
+        top_digit = np.argmax(np.nan_to_num(observed - p, nan=-np.inf), axis=1) + self._first
+        return pd.DataFrame(
+            {
+                "count": n,
+                "chi2": chi2,
+                "chi2_exceeds_critical": chi2 > self._CHI2_CRITICAL[self.digits],
+                "mad": mad,
+                "conformity": conformity,
+                "top_digit": top_digit,
+            }
+        )
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<BenfordAnalyzer digits={self.digits} min_amount={self.min_amount}>"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tool #6 – Bank‑to‑ledger reconciliation
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class BankReconciler:
+    """Match bank‑statement lines to cash‑ledger entries by amount and date.
+
+    Both tables need ``date`` and ``amount`` with the same sign convention
+    (receipts positive, payments negative).  If the ledger also has
+    ``debit``/``credit`` columns its signed amount is *debit − credit*
+    (0/1 flags or monetary columns, as in :meth:`TransactionVerifier.verify_entries`).
+
+    Matching runs in sorted, vectorised passes – no row loops:
+
+    1. **exact** – same amount (in cents), same day; repeated identical
+       lines pair up in order through an occurrence rank;
+    2. **as‑of** – same amount, nearest date within ``date_tolerance``
+       (``pandas.merge_asof``); when several statement lines pick the same
+       ledger entry the closest wins and the rest retry, up to
+       ``max_rounds`` times;
+    3. **one‑to‑many** (optional) – a remaining line equal to the sum of
+       several remaining lines of the other side dated the same day, e.g. a
+       deposit slip covering many receipts, again within ``date_tolerance``.
+       First against each day's whole total; then, for lines still open,
+       against *subsets* of one day's lines (same sign, smaller amount), so
+       an unrelated entry on a busy day does not block the match.  The
+       subset search is bounded: 2 … ``max_group_size`` lines out of at most
+       ``max_group_candidates`` candidates per day (busier days are only
+       matched through their whole total); the smallest subset wins.
+       Raising either limit finds larger groups but also more coincidental
+       sums, and the search time grows combinatorially.
+    """
+
+    _REQ_COLS = {"date", "amount"}
+
+    def __init__(
+        self,
+        *,
+        date_tolerance: str | pd.Timedelta = "3D",
+        max_rounds: int = 5,
+        one_to_many: bool = True,
+        max_group_size: int = 4,
+        max_group_candidates: int = 20,
+    ):
+        self.date_tolerance = pd.Timedelta(date_tolerance)
+        self.max_rounds = max_rounds
+        self.one_to_many = one_to_many
+        self.max_group_size = max_group_size
+        self.max_group_candidates = max_group_candidates
+        self.summary: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------
+    def reconcile(self, statement: TableSource, ledger: TableSource) -> Dict[str, Any]:
+        """Reconcile *statement* against *ledger*.
+
+        Returns a dict with
+
+        * ``matches`` – one row per matched (statement line, ledger entry):
+          ``statement_row``, ``ledger_row`` (index labels), ``match_type``
+          (``exact``, ``as-of``, ``many-ledger`` or ``many-statement``),
+          ``group`` (shared by the lines of one one‑to‑many match),
+          ``amount`` and ``days_apart``;
+        * ``unmatched_statement`` / ``unmatched_ledger`` – the leftover rows;
+        * ``summary`` – counts and unmatched totals per side.
+        """
+
+        statement = load_frame(statement, self._REQ_COLS)
+        ledger = load_frame(ledger, self._REQ_COLS | {"debit", "credit"})
+        ensure_columns(statement, self._REQ_COLS)
+        ensure_columns(ledger, self._REQ_COLS)
+
+        left = self._keys(statement, pd.to_numeric(statement["amount"], errors="coerce"))
+        if {"debit", "credit"} <= set(ledger.columns):
+            debit_amt, credit_amt = _side_amounts(ledger)
+            ledger_amount = pd.Series(debit_amt - credit_amt, index=ledger.index)
+        else:
+            ledger_amount = pd.to_numeric(ledger["amount"], errors="coerce")
+        right = self._keys(ledger, ledger_amount)
+
+        found: List[pd.DataFrame] = []
+
+        # 1. exact: same cents, same day, n‑th occurrence ↔ n‑th occurrence
+        exact = left.merge(right, on=["cents", "day", "rank"], suffixes=("_s", "_l"))
+        found.append(self._pairs(exact, "exact"))
+        left, right = self._remaining(left, right, found[-1])
+
+        # 2. nearest date within tolerance, conflicting picks retried
+        for _ in range(self.max_rounds):
+            if left.empty or right.empty:
+                break
+            pairs = self._asof(left, right)
+            if pairs.empty:
+                break
+            found.append(self._pairs(pairs, "as-of"))
+            left, right = self._remaining(left, right, found[-1])
+
+        # 3. one line ↔ same‑day sum of several lines on the other side
+        if self.one_to_many:
+            for match_type, many_ledger in (("many-ledger", True), ("many-statement", False)):
+                if left.empty or right.empty:
+                    break
+                for matcher in (self._group_match, self._subset_match):
+                    if left.empty or right.empty:
+                        break
+                    grouped = matcher(left, right, many_ledger=many_ledger)
+                    if not grouped.empty:
+                        found.append(self._pairs(grouped, match_type))
+                        left, right = self._remaining(left, right, found[-1])
+
+        pairs = pd.concat(found, ignore_index=True)
+        pos_s, pos_l = pairs["pos_s"].to_numpy(), pairs["pos_l"].to_numpy()
+        statement_left = np.ones(len(statement), dtype=bool)
+        statement_left[pos_s] = False
+        ledger_left = np.ones(len(ledger), dtype=bool)
+        ledger_left[pos_l] = False
+
+        matches = pd.DataFrame(
+            {
+                "statement_row": statement.index[pos_s],
+                "ledger_row": ledger.index[pos_l],
+                "match_type": pairs["match_type"].to_numpy(),
+                "amount": pairs["amount"].to_numpy(),
+                "days_apart": pairs["days_apart"].to_numpy(),
+            }
+        )
+        unmatched_statement = statement[statement_left]
+        unmatched_ledger = ledger[ledger_left]
+
+        self.summary = {
+            "statement_lines": len(statement),
+            "ledger_entries": len(ledger),
+            "matched_statement_lines": int(len(statement) - statement_left.sum()),
+            "matched_ledger_entries": int(len(ledger) - ledger_left.sum()),
+            "by_match_type": {k: int(v) for k, v in matches["match_type"].value_counts().items()},
+            "unmatched_statement_lines": int(statement_left.sum()),
+            "unmatched_statement_total": float(pd.to_numeric(unmatched_statement["amount"], errors="coerce").sum()),
+            "unmatched_ledger_entries": int(ledger_left.sum()),
+            "unmatched_ledger_total": float(ledger_amount[ledger_left].sum()),
+        }
+        return {
+            "matches": matches,
+            "unmatched_statement": unmatched_statement,
+            "unmatched_ledger": unmatched_ledger,
+            "summary": self.summary,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals – every frame below carries positional ``pos`` columns
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _keys(df: pd.DataFrame, amount: pd.Series) -> pd.DataFrame:
+        """Matching keys per usable line, sorted by date: pos, date, day, cents, rank."""
+
+        dates = pd.to_datetime(df["date"], errors="coerce")
+        amount = amount.to_numpy(dtype="float64")
+        usable = dates.notna().to_numpy() & ~np.isnan(amount)
+        keys = pd.DataFrame(
+            {
+                "pos": np.flatnonzero(usable),
+                "date": dates.to_numpy()[usable].astype("datetime64[ns]"),
+                "cents": np.round(amount[usable] * 100).astype(np.int64),
+            }
+        ).sort_values("date", kind="stable")
+        keys["day"] = keys["date"].dt.normalize()
+        keys["rank"] = keys.groupby(["cents", "day"], sort=False).cumcount()
+        return keys
+
+    @staticmethod
+    def _remaining(left: pd.DataFrame, right: pd.DataFrame, pairs: pd.DataFrame) -> tuple:
+        return (
+            left[~left["pos"].isin(pairs["pos_s"])],
+            right[~right["pos"].isin(pairs["pos_l"])],
+        )
+
+    @staticmethod
+    def _pairs(merged: pd.DataFrame, match_type: str) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "pos_s": merged["pos_s"].to_numpy(dtype=np.int64),
+                "pos_l": merged["pos_l"].to_numpy(dtype=np.int64),
+                "match_type": match_type,
+                "amount": merged["cents"].to_numpy() / 100,
+                "days_apart": (merged["date_l"] - merged["date_s"]).abs().to_numpy() / pd.Timedelta("1D"),
+            }
+        )
+
+    def _nearest(self, single: pd.DataFrame, targets: pd.DataFrame, target_id: str) -> pd.DataFrame:
+        """As‑of join *single* → nearest same‑cents *targets* row; one winner per target."""
+
+        merged = pd.merge_asof(
+            single,
+            targets.assign(_target_date=targets["date"]),
+            on="date",
+            by="cents",
+            direction="nearest",
+            tolerance=self.date_tolerance,
+        ).dropna(subset=[target_id])
+        gap = (merged["date"] - merged["_target_date"]).abs()
+        merged = merged.iloc[np.argsort(gap.to_numpy(), kind="stable")].drop_duplicates(target_id)
+        return merged.astype({target_id: np.int64})
+
+    def _asof(self, left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+        merged = self._nearest(
+            left[["pos", "date", "cents"]].rename(columns={"pos": "pos_s"}),
+            right[["pos", "date", "cents"]].rename(columns={"pos": "pos_l"}),
+            "pos_l",
+        )
+        return merged.rename(columns={"date": "date_s", "_target_date": "date_l"})
+
+    def _group_match(self, left: pd.DataFrame, right: pd.DataFrame, *, many_ledger: bool) -> pd.DataFrame:
+        """Single lines of one side ↔ same‑day sums (2+ lines) of the other."""
+
+        single, many = (left, right) if many_ledger else (right, left)
+        sums = many.groupby("day", sort=True).agg(cents=("cents", "sum"), lines=("cents", "size"))
+        sums = sums[sums["lines"] >= 2].reset_index().rename(columns={"day": "date"})
+        if sums.empty:
+            return pd.DataFrame(columns=["pos_s", "pos_l", "cents", "date_s", "date_l"])
+
+        sums["_day_id"] = np.arange(len(sums))
+        merged = self._nearest(single[["pos", "date", "cents"]], sums[["date", "cents", "_day_id"]], "_day_id")
+        # Expand each matched day back to its individual lines
+        days = sums.set_index("_day_id")["date"]
+        merged["day"] = days.loc[merged["_day_id"].to_numpy()].to_numpy()
+        expanded = merged[["pos", "date", "day"]].merge(
+            many[["pos", "date", "cents", "day"]], on="day", suffixes=("_single", "_many")
+        )
+        return self._sides(expanded, many_ledger)
+
+    def _subset_match(self, left: pd.DataFrame, right: pd.DataFrame, *, many_ledger: bool) -> pd.DataFrame:
+        """Single lines ↔ a subset (2 … ``max_group_size`` lines) of one nearby day of the other side.
+
+        Runs on the lines left after the vectorised passes, one single line
+        at a time in date order; lines used by a match are not offered again.
+        """
+
+        single, many = (left, right) if many_ledger else (right, left)
+        by_day = {day: lines for day, lines in many.groupby("day", sort=True)}
+        days = np.array(list(by_day), dtype="datetime64[ns]")
+        tolerance = self.date_tolerance.to_timedelta64()
+        used: set = set()
+        found: List[pd.DataFrame] = []
+
+        for pos, date, cents in single[["pos", "date", "cents"]].itertuples(index=False):
+            if cents == 0:
+                continue
+            gap = np.abs(days - np.datetime64(date, "ns"))
+            for day in days[np.argsort(gap, kind="stable")][: int((gap <= tolerance).sum())]:
+                lines = by_day[pd.Timestamp(day)]
+                values = lines["cents"].to_numpy()
+                candidates = (~lines["pos"].isin(used).to_numpy()) & (np.sign(values) == np.sign(cents)) & (np.abs(values) < abs(cents))
+                if not 2 <= candidates.sum() <= self.max_group_candidates:
+                    continue
+                subset = _subset_with_sum(values[candidates], cents, self.max_group_size)
+                if subset is None:
+                    continue
+                chosen = lines[candidates].iloc[subset]
+                used.update(chosen["pos"].tolist())
+                found.append(
+                    pd.DataFrame(
+                        {
+                            "pos_single": pos,
+                            "date_single": date,
+                            "pos_many": chosen["pos"].to_numpy(),
+                            "date_many": chosen["date"].to_numpy(),
+                            "cents": chosen["cents"].to_numpy(),
+                        }
+                    )
+                )
+                break
+
+        if not found:
+            return pd.DataFrame(columns=["pos_s", "pos_l", "cents", "date_s", "date_l"])
+        return self._sides(pd.concat(found, ignore_index=True), many_ledger)
+
+    @staticmethod
+    def _sides(expanded: pd.DataFrame, many_ledger: bool) -> pd.DataFrame:
+        """Rename ``*_single`` / ``*_many`` columns to statement (``_s``) / ledger (``_l``)."""
+
+        single_cols = {"pos_single": "pos_s", "date_single": "date_s", "pos_many": "pos_l", "date_many": "date_l"}
+        if not many_ledger:
+            single_cols = {"pos_single": "pos_l", "date_single": "date_l", "pos_many": "pos_s", "date_many": "date_s"}
+        return expanded.rename(columns=single_cols)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<BankReconciler date_tolerance={self.date_tolerance} one_to_many={self.one_to_many}>"
+
+
+@lru_cache(maxsize=None)
+def _combinations(n: int, k: int) -> np.ndarray:
+    """All *k*‑subsets of ``range(n)`` as rows of an index array."""
+
+    return np.array(list(itertools.combinations(range(n), k)), dtype=np.intp).reshape(-1, k)
+
+
+def _subset_with_sum(values: np.ndarray, target: int, max_size: int) -> Optional[np.ndarray]:
+    """Positions of the smallest subset (2 … *max_size* items) of *values* summing to *target*."""
+
+    for k in range(2, min(max_size, len(values)) + 1):
+        combos = _combinations(len(values), k)
+        hit = np.flatnonzero(values[combos].sum(axis=1) == target)
+        if len(hit):
+            return combos[hit[0]]
+    return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tool #7 – Monetary‑unit and stratified sampling
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _poisson_upper_limit(errors: np.ndarray, confidence: float) -> np.ndarray:
+    """Poisson upper limit λ with P(X ≤ k | λ) = 1 − confidence, for each k in *errors*.
+
+    Solved by bisection on all *k* at once (the classic MUS reliability
+    factors: 3.00, 4.75, 6.30 … at 95 %).
+    """
+
+    k = np.asarray(errors, dtype=np.int64)
+    lo = np.zeros(len(k))
+    hi = np.full(len(k), 10.0 + 3.0 * k.max(initial=0))
+    terms = np.arange(k.max(initial=0) + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, len(terms))))])
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        # P(X ≤ k) = Σ_{i≤k} e^{-λ} λ^i / i!
+        logp = -mid[:, None] + terms[None, :] * np.log(mid[:, None]) - log_fact[None, :]
+        cdf = np.where(terms[None, :] <= k[:, None], np.exp(logp), 0.0).sum(axis=1)
+        too_small = cdf > 1 - confidence
+        lo = np.where(too_small, mid, lo)
+        hi = np.where(too_small, hi, mid)
+    return (lo + hi) / 2
+
+
+class MonetaryUnitSampler:
+    """Monetary‑unit (MUS) and stratified sampling over the ``amount`` column.
+
+    Every currency unit of the population is a sampling unit, so an item's
+    chance of selection is proportional to its absolute book value.
+    Selection is a cumulative sum plus one ``searchsorted`` for all the
+    selection points; items at least one interval large are hit by several
+    points and form the *top stratum*.  The generator is seeded (a seed is
+    drawn and recorded when none is given) so every sample is reproducible.
+
+    Sample size follows the Poisson model:
+    ``n = ceil(BV · RF / (TM − EM · expansion))`` with the reliability factor
+    ``RF`` for zero errors at *confidence*.
+    """
+
+    _REQ_COLS = {"amount"}
+
+    # AICPA expansion factors for expected misstatement
+    _EXPANSION = {0.99: 1.9, 0.95: 1.6, 0.90: 1.5, 0.85: 1.4, 0.80: 1.3, 0.75: 1.25}
+
+    def __init__(
+        self,
+        *,
+        confidence: float = 0.95,
+        tolerable_misstatement: Optional[float] = None,
+        expected_misstatement: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        self.confidence = confidence
+        self.tolerable_misstatement = tolerable_misstatement
+        self.expected_misstatement = expected_misstatement
+        self.seed = int(np.random.SeedSequence().entropy % 2**32) if seed is None else seed
+        self.result: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------
+    @property
+    def reliability_factor(self) -> float:
+        return float(_poisson_upper_limit(np.array([0]), self.confidence)[0])
+
+    def sample_size(self, population_value: float) -> int:
+        """Planned MUS sample size for a population of *population_value*."""
+
+        if not self.tolerable_misstatement:
+            raise ValueError("tolerable_misstatement is required to plan the sample size")
+        expansion = self._EXPANSION.get(round(self.confidence, 2), 1.6)
+        room = self.tolerable_misstatement - self.expected_misstatement * expansion
+        if room <= 0:
+            raise ValueError("expected misstatement is too large for the tolerable misstatement")
+        return max(1, int(np.ceil(population_value * self.reliability_factor / room)))
+
+    def select(self, df: TableSource, *, sample_size: Optional[int] = None, method: str = "systematic") -> Dict[str, Any]:
+        """Draw a monetary‑unit sample.
+
+        *method* ``"systematic"`` uses one random start and fixed steps of
+        one interval; ``"cell"`` draws one random point inside every
+        interval.  Returns a dict with ``sample`` (selected rows plus
+        ``hits`` and ``book_value``), ``sample_size``, ``interval``,
+        ``population_value``, ``reliability_factor``, ``basic_precision``,
+        ``top_stratum`` (items ≥ interval: count and value) and ``seed`` –
+        everything :meth:`evaluate` needs later.
+        """
+
+        df = load_frame(df, self._REQ_COLS)
+        ensure_columns(df, self._REQ_COLS)
+        if method not in ("systematic", "cell"):
+            raise ValueError("method must be 'systematic' or 'cell'")
+
+        book = np.abs(pd.to_numeric(df["amount"], errors="coerce").fillna(0).to_numpy(dtype="float64"))
+        cumulative = np.cumsum(book)
+        population = float(cumulative[-1]) if len(cumulative) else 0.0
+        if population <= 0:
+            raise ValueError("population has no monetary value to sample")
+
+        n = sample_size or self.sample_size(population)
+        interval = population / n
+        rng = np.random.default_rng(self.seed)
+        if method == "systematic":
+            points = rng.uniform(0, interval) + interval * np.arange(n)
+        else:
+            points = interval * (np.arange(n) + rng.uniform(0, 1, n))
+
+        # Point p falls in item i when cumulative[i-1] ≤ p < cumulative[i]
+        positions = np.searchsorted(cumulative, points, side="right")
+        positions = positions[positions < len(df)]
+        selected, hits = np.unique(positions, return_counts=True)
+
+        sample = df.iloc[selected].assign(hits=hits, book_value=book[selected])
+        top = book >= interval
+        self.result = {
+            "sample": sample,
+            "sample_size": int(n),
+            "selected_items": int(len(selected)),
+            "interval": interval,
+            "population_value": population,
+            "reliability_factor": self.reliability_factor,
+            "basic_precision": self.reliability_factor * interval,
+            "top_stratum": {"items": int(top.sum()), "value": float(book[top].sum())},
+            "method": method,
+            "seed": self.seed,
+        }
+        return self.result
+
+    def stratified(
+        self,
+        df: TableSource,
+        *,
+        sample_size: int,
+        strata: int | List[float] = 4,
+        allocation: str = "value",
+    ) -> Dict[str, Any]:
+        """Stratified random sample by absolute amount.
+
+        *strata* is either the number of strata (equal‑count quantile bands)
+        or explicit upper bounds.  *sample_size* is split across strata in
+        proportion to their value (``allocation="value"``) or item count
+        (``"count"``); within each stratum items are drawn without
+        replacement by sorting random keys – no per‑row Python loop.
+        Returns ``sample`` (rows + ``stratum``) and the per‑stratum
+        ``strata`` frame (items, value, allocated, mean, std) used to project
+        misstatement.
+        """
+
+        df = load_frame(df, self._REQ_COLS)
+        ensure_columns(df, self._REQ_COLS)
+        if allocation not in ("value", "count"):
+            raise ValueError("allocation must be 'value' or 'count'")
+
+        book = np.abs(pd.to_numeric(df["amount"], errors="coerce").fillna(0).to_numpy(dtype="float64"))
+        if isinstance(strata, int):
+            bounds = np.unique(np.quantile(book, np.linspace(0, 1, strata + 1)[1:-1])) if len(book) else np.array([])
+        else:
+            bounds = np.sort(np.asarray(strata, dtype="float64"))
+        stratum = np.searchsorted(bounds, book, side="left")
+        k = len(bounds) + 1
+
+        items = np.bincount(stratum, minlength=k)
+        value = np.bincount(stratum, weights=book, minlength=k)
+        weight = value if allocation == "value" else items.astype("float64")
+        share = weight / weight.sum() if weight.sum() else np.zeros(k)
+        allocated = np.minimum(np.floor(share * sample_size).astype(np.int64), items)
+        # Hand out the units lost to rounding by largest remainder
+        short = min(sample_size, int(items.sum())) - int(allocated.sum())
+        if short > 0:
+            remainder = np.where(allocated < items, share * sample_size - allocated, -np.inf)
+            for idx in np.argsort(-remainder, kind="stable")[:short]:
+                if allocated[idx] < items[idx]:
+                    allocated[idx] += 1
+
+        rng = np.random.default_rng(self.seed)
+        # stratum + U[0,1) orders by stratum, randomly within it, in one sort
+        order = np.argsort(stratum + rng.random(len(book)))
+        rank = np.arange(len(order)) - np.searchsorted(stratum[order], stratum[order], side="left")
+        chosen = np.sort(order[rank < allocated[stratum[order]]])
+
+        sums = np.bincount(stratum, weights=book**2, minlength=k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = value / items
+            std = np.sqrt(np.maximum(sums / items - mean**2, 0))
+        upper = np.append(bounds, np.inf)
+        summary = pd.DataFrame(
+            {"upper_bound": upper, "items": items, "value": value, "allocated": allocated, "mean": mean, "std": std},
+            index=pd.RangeIndex(k, name="stratum"),
+        )
+
+        self.result = {
+            "sample": df.iloc[chosen].assign(stratum=stratum[chosen], book_value=book[chosen]),
+            "strata": summary,
+            "sample_size": int(allocated.sum()),
+            "seed": self.seed,
+        }
+        return self.result
+
+    def evaluate(self, sample: pd.DataFrame, *, audited_col: str = "audited_value", interval: Optional[float] = None) -> Dict[str, Any]:
+        """Project misstatement from an audited MUS sample (Stringer bound).
+
+        *sample* is ``select()["sample"]`` with an *audited_col* filled in.
+        Items at least one interval large contribute their actual
+        misstatement; the others their tainting × interval, ranked largest
+        first against the incremental Poisson factors.
+        """
+
+        interval = interval or (self.result or {}).get("interval")
+        if not interval:
+            raise ValueError("interval is required (run select() first or pass it)")
+        ensure_columns(sample, {"book_value", audited_col})
+
+        book = sample["book_value"].to_numpy(dtype="float64")
+        audited = pd.to_numeric(sample[audited_col], errors="coerce").to_numpy(dtype="float64")
+        misstatement = book - audited
+        top = book >= interval
+
+        top_misstatement = float(np.nansum(misstatement[top]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tainting = np.where(book > 0, misstatement / book, 0.0)[~top]
+        tainting = np.sort(np.clip(tainting[tainting > 0], 0, 1))[::-1]
+
+        factors = _poisson_upper_limit(np.arange(len(tainting) + 1), self.confidence)
+        increments = np.diff(factors)
+        basic = factors[0] * interval
+        projected = float(tainting.sum() * interval)
+        upper_limit = basic + float((increments * tainting).sum() * interval) + top_misstatement
+
+        return {
+            "errors": int(len(tainting)),
+            "projected_misstatement": projected + top_misstatement,
+            "basic_precision": float(basic),
+            "upper_misstatement_limit": float(upper_limit),
+            "exceeds_tolerable": (
+                None if self.tolerable_misstatement is None else bool(upper_limit > self.tolerable_misstatement)
+            ),
+        }
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<MonetaryUnitSampler confidence={self.confidence} seed={self.seed}>"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tool #8 – Multi‑period roll‑forward & flux analysis
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class FluxAnalyzer:
+    """Period‑over‑period variance (flux) analysis of trial balances.
+
+    Input is long format – one row per (``account``, ``period``) with the
+    closing ``amount`` – covering any number of periods (optionally an
+    ``entity`` column, analysed as part of the account key).  The data is
+    pivoted **once** into a dense accounts × periods matrix with a
+    ``bincount``; deltas, percentage changes and threshold tests are then
+    whole‑matrix NumPy operations, so all accounts and periods are
+    evaluated together.
+
+    A movement is *significant* when its absolute change is at least
+    ``abs_threshold`` **and** (or, with ``require="either"``, **or**) its
+    relative change is at least ``pct_threshold``.  Accounts appearing or
+    disappearing have an infinite relative change.
+
+    With an ``activity`` column (the period's movements), each period is
+    also rolled forward – opening + activity must equal closing – and
+    breaks larger than ``rollforward_tolerance`` are reported.
+    """
+
+    _REQ_COLS = {"account", "period", "amount"}
+
+    def __init__(
+        self,
+        *,
+        abs_threshold: float = 0.0,
+        pct_threshold: float = 0.10,
+        require: str = "both",
+        rollforward_tolerance: float = 0.01,
+    ):
+        if require not in ("both", "either"):
+            raise ValueError("require must be 'both' or 'either'")
+        self.abs_threshold = abs_threshold
+        self.pct_threshold = pct_threshold
+        self.require = require
+        self.rollforward_tolerance = rollforward_tolerance
+        self.movements: Optional[pd.DataFrame] = None
+
+    # ------------------------------------------------------------------
+    def pivot(self, df: TableSource, *, value: str = "amount") -> pd.DataFrame:
+        """Accounts × periods matrix of *value* (periods in sorted order)."""
+
+        df = load_frame(df, self._REQ_COLS | {"entity", value})
+        ensure_columns(df, self._REQ_COLS | {value})
+        matrix, accounts, periods = self._matrix(df, value)
+        return pd.DataFrame(matrix, index=accounts, columns=periods)
+
+    def analyze(self, df: TableSource, *, lag: int = 1) -> pd.DataFrame:
+        """Return the significant movements, largest absolute change first.
+
+        *lag* is the number of periods compared against – 1 for
+        month‑on‑month, 12 for the same month last year with monthly data.
+        Columns: the account key, ``period``, ``compared_to``, ``previous``,
+        ``current``, ``delta``, ``pct_change``, ``abs_breach``,
+        ``pct_breach`` and, with activity data, ``rollforward_difference``
+        and ``rollforward_break``.
+        """
+
+        df = load_frame(df, self._REQ_COLS | {"entity", "activity"})
+        ensure_columns(df, self._REQ_COLS)
+        if lag < 1:
+            raise ValueError("lag must be at least 1")
+
+        closing, accounts, periods = self._matrix(df, "amount")
+        if len(periods) <= lag:
+            self.movements = pd.DataFrame()
+            return self.movements
+
+        previous, current = closing[:, :-lag], closing[:, lag:]
+        delta = current - previous
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(previous != 0, delta / np.abs(previous), np.where(delta != 0, np.inf, 0.0))
+
+        abs_breach = np.abs(delta) >= self.abs_threshold
+        pct_breach = np.abs(pct) >= self.pct_threshold
+        significant = (abs_breach & pct_breach) if self.require == "both" else (abs_breach | pct_breach)
+        significant &= delta != 0
+
+        columns: Dict[str, np.ndarray] = {}
+        if "activity" in df.columns:
+            activity, _, _ = self._matrix(df, "activity")
+            # Roll‑forward needs consecutive periods: opening = previous closing
+            rf_diff = closing[:, 1:] - (closing[:, :-1] + activity[:, 1:])
+            rf_break = np.abs(rf_diff) > self.rollforward_tolerance
+            if lag == 1:
+                significant |= rf_break
+                columns["rollforward_difference"] = rf_diff
+                columns["rollforward_break"] = rf_break
+
+        acc_idx, per_idx = np.nonzero(significant)
+        key = accounts.to_frame(index=False).iloc[acc_idx].reset_index(drop=True)
+        out = key.assign(
+            period=np.asarray(periods)[per_idx + lag],
+            compared_to=np.asarray(periods)[per_idx],
+            previous=previous[acc_idx, per_idx],
+            current=current[acc_idx, per_idx],
+            delta=delta[acc_idx, per_idx],
+            pct_change=pct[acc_idx, per_idx],
+            abs_breach=abs_breach[acc_idx, per_idx],
+            pct_breach=pct_breach[acc_idx, per_idx],
+            **{name: values[acc_idx, per_idx] for name, values in columns.items()},
+        )
+        order = np.argsort(-np.abs(out["delta"].to_numpy()), kind="stable")
+        self.movements = out.iloc[order].reset_index(drop=True)
+        return self.movements
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _matrix(df: pd.DataFrame, value: str) -> tuple:
+        """Dense accounts × periods sum of *value* → ``(matrix, accounts, periods)``."""
+
+        key_cols = [c for c in ("entity", "account") if c in df.columns]
+        if len(key_cols) == 1:
+            acc_codes, uniques = pd.factorize(df["account"], use_na_sentinel=True)
+            accounts = pd.Index(uniques, name="account")
+        else:
+            accounts_mi = pd.MultiIndex.from_frame(df[key_cols])
+            acc_codes, uniques = pd.factorize(accounts_mi, use_na_sentinel=True)
+            accounts = pd.MultiIndex.from_tuples(uniques, names=key_cols) if len(uniques) else pd.MultiIndex.from_arrays([[]] * len(key_cols), names=key_cols)
+        periods = df["period"]
+        if isinstance(periods.dtype, pd.CategoricalDtype):
+            # factorize(sort=True) follows category order, which need not be value order
+            try:
+                periods = periods.cat.reorder_categories(periods.cat.categories.sort_values())
+            except TypeError:
+                periods = periods.astype(object)
+        per_codes, per_uniques = pd.factorize(periods, sort=True, use_na_sentinel=True)
+
+        values = pd.to_numeric(df[value], errors="coerce").fillna(0).to_numpy(dtype="float64")
+        ok = (acc_codes >= 0) & (per_codes >= 0)
+        n_acc, n_per = len(accounts), len(per_uniques)
+        flat = np.bincount(
+            acc_codes[ok].astype(np.int64) * n_per + per_codes[ok], weights=values[ok], minlength=n_acc * n_per
+        )
+        return flat.reshape(n_acc, n_per), accounts, pd.Index(per_uniques, name="period")
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<FluxAnalyzer abs≥{self.abs_threshold} pct≥{self.pct_threshold:.0%} ({self.require})>"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tool #9 – Chart‑of‑accounts hierarchy & rollup
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class AccountHierarchy:
+    """Chart of accounts derived from coded labels such as ``"1000 - Caja"``.
+
+    The numeric code's prefixes define the hierarchy (``1`` → ``11`` →
+    ``110`` → ``1105`` …).  Labels are parsed once per distinct account and
+    broadcast back to the rows through the factorised codes.
+
+    Classification uses configurable code ranges instead of keyword
+    searches.  A range ``(lo, hi)`` matches a code when the code, cut or
+    right‑padded with zeros to ``len(lo)`` digits, lies between them – so
+    ``("1000", "1499")`` covers ``11`` (a header), ``1105`` and ``110501``.
+
+    * ``type_ranges`` – account type → list of ranges (default: 1 asset,
+      2 liability, 3 equity, 4 income, 5–9 expense);
+    * ``current_ranges`` – ranges of current assets and liabilities
+      (default 1000–1499 and 2000–2499).
+    """
+
+    _CODE_PATTERN = r"^\s*(\d[\d.]*)\s*(?:[-–—:]\s*(.*))?$"
+
+    DEFAULT_TYPE_RANGES: Dict[str, List[tuple]] = {
+        "asset": [("1", "1")],
+        "liability": [("2", "2")],
+        "equity": [("3", "3")],
+        "income": [("4", "4")],
+        "expense": [("5", "9")],
+    }
+    DEFAULT_CURRENT_RANGES: List[tuple] = [("1000", "1499"), ("2000", "2499")]
+
+    def __init__(
+        self,
+        *,
+        type_ranges: Optional[Dict[str, List[tuple]]] = None,
+        current_ranges: Optional[List[tuple]] = None,
+    ):
+        self.type_ranges = type_ranges or self.DEFAULT_TYPE_RANGES
+        self.current_ranges = self.DEFAULT_CURRENT_RANGES if current_ranges is None else current_ranges
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _in_ranges(codes: List[str], ranges: List[tuple]) -> np.ndarray:
+        """True where every account under a code falls inside one of *ranges*."""
+
+        hit = np.zeros(len(codes), dtype=bool)
+        for lo, hi in ranges:
+            lo, hi = str(lo), str(hi)
+            width = len(lo)
+            hi = hi.ljust(width, "9")[:width]
+            # A code spans [code000…, code999…] at the range's width
+            first = np.array([(c + "0" * width)[:width] for c in codes], dtype=object)
+            last = np.array([(c + "9" * width)[:width] for c in codes], dtype=object)
+            coded = np.array([c != "" for c in codes], dtype=bool)
+            hit |= coded & (first >= lo) & (last <= hi)
+        return hit
+
+    def _kinds(self, codes: List[str]) -> np.ndarray:
+        """Account type of each code – the first matching entry of ``type_ranges``."""
+
+        kind = np.full(len(codes), None, dtype=object)
+        for kind_name, ranges in self.type_ranges.items():
+            kind[self._in_ranges(codes, ranges) & pd.isna(kind)] = kind_name
+        return kind
+
+    def parse(self, accounts: pd.Series) -> tuple:
+        """Split labels into codes and names, once per distinct label.
+
+        Returns ``(row_codes, uniques)`` where *row_codes* indexes into the
+        *uniques* frame (``label``, ``code``, ``name``, ``kind``,
+        ``current``); ``-1`` marks missing labels.  Labels without a leading
+        numeric code get an empty ``code`` and no kind.
+        """
+
+        row_codes, labels = pd.factorize(accounts, use_na_sentinel=True)
+        parts = pd.Series(pd.Index(labels).astype(str), dtype=object).str.extract(self._CODE_PATTERN)
+        codes = parts[0].fillna("").str.replace(".", "", regex=False).tolist()
+        names = parts[1].fillna("").str.strip()
+
+        uniques = pd.DataFrame(
+            {
+                "label": np.asarray(labels, dtype=object),
+                "code": codes,
+                "name": names.where(names != "", pd.Series(np.asarray(labels, dtype=object)).astype(str)).to_numpy(),
+                "kind": self._kinds(codes),
+                "current": self._in_ranges(codes, self.current_ranges),
+            }
+        )
+        return row_codes, uniques
+
+    def classify(self, accounts: pd.Series) -> pd.DataFrame:
+        """Per‑row ``code``, ``kind`` and ``current`` for *accounts* (index preserved)."""
+
+        row_codes, uniques = self.parse(accounts)
+        take = np.where(row_codes >= 0, row_codes, 0)
+        missing = row_codes < 0
+        out = uniques.iloc[take][["code", "kind", "current"]].set_axis(accounts.index)
+        if missing.any():
+            out.loc[missing, ["code", "kind"]] = None
+            out.loc[missing, "current"] = False
+        return out
+
+    def rollup(self, df: TableSource, *, value: str = "amount", max_level: Optional[int] = None) -> pd.DataFrame:
+        """Balances at every level of the code hierarchy.
+
+        Rows are summed per account with one ``bincount``; every prefix
+        level is then aggregated over the (few) distinct accounts.  Result
+        columns: ``level`` (prefix length), ``code``, ``name`` (when an
+        account has exactly that code), ``kind``, ``current``, ``balance``
+        and ``accounts`` (number of coded accounts beneath).  Accounts
+        without a numeric code are left out.
+        """
+
+        df = load_frame(df, {"account", value})
+        ensure_columns(df, {"account", value})
+
+        row_codes, uniques = self.parse(df["account"])
+        values = pd.to_numeric(df[value], errors="coerce").fillna(0).to_numpy(dtype="float64")
+        keep = row_codes >= 0
+        totals = np.bincount(row_codes[keep], weights=values[keep], minlength=len(uniques))
+
+        coded = uniques.assign(balance=totals)
+        coded = coded[coded["code"] != ""]
+        if coded.empty:
+            return pd.DataFrame(columns=["level", "code", "name", "kind", "current", "balance", "accounts"])
+
+        names = coded.groupby("code", sort=False)["name"].first()
+        depth = int(coded["code"].str.len().max())
+        levels = []
+        for level in range(1, min(depth, max_level or depth) + 1):
+            at_level = coded[coded["code"].str.len() >= level]
+            prefix = at_level["code"].str[:level]
+            grouped = at_level["balance"].groupby(prefix, sort=True).agg(["sum", "size"])
+            levels.append(
+                pd.DataFrame(
+                    {
+                        "level": level,
+                        "code": grouped.index,
+                        "name": names.reindex(grouped.index).to_numpy(),
+                        "balance": grouped["sum"].to_numpy(),
+                        "accounts": grouped["size"].to_numpy(),
+                    }
+                )
+            )
+        out = pd.concat(levels, ignore_index=True)
+        codes = out["code"].tolist()
+        out.insert(3, "kind", self._kinds(codes))
+        out.insert(4, "current", self._in_ranges(codes, self.current_ranges))
+        return out
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<AccountHierarchy types={list(self.type_ranges)} current_ranges={self.current_ranges}>"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tool #10 – Robust per‑account outlier scoring
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class OutlierScorer:
+    """Score unusual amounts against each account's own typical amount.
+
+    The score is the robust (modified) z‑score of Iglewicz & Hoaglin:
+    ``0.6745 · (x − median) / MAD`` per account, falling back to
+    ``(x − median) / (1.2533 · mean absolute deviation)`` when the MAD is
+    zero.  Medians and deviations come from grouped ``transform`` calls (or
+    a grouped time‑based ``rolling`` window), which pandas evaluates for all
+    accounts in compiled code – there is no Python loop over accounts.
+
+    With ``rolling="90D"`` each line is compared with the *preceding*
+    90 days of its account only (the line itself excluded), so the baseline
+    follows trends and seasonality.  Accounts (or windows) with fewer than
+    ``min_count`` lines get no score.
+    """
+
+    _REQ_COLS = {"account", "amount"}
+
+    def __init__(self, *, threshold: float = 3.5, min_count: int = 10, use_absolute: bool = True):
+        self.threshold = threshold
+        self.min_count = min_count
+        self.use_absolute = use_absolute
+        self.scores: Optional[pd.DataFrame] = None
+
+    def score(
+        self,
+        df: TableSource,
+        *,
+        group: str = "account",
+        rolling: Optional[str | pd.Timedelta] = None,
+        date_col: str = "date",
+    ) -> pd.DataFrame:
+        """Return the lines scoring at least ``threshold``, most extreme first.
+
+        Adds ``baseline_median``, ``baseline_mad``, ``robust_z`` and
+        ``ratio_to_median`` to the original columns; the index is preserved.
+        """
+
+        required = {group, "amount"} | ({date_col} if rolling else set())
+        df = load_frame(df, required)
+        ensure_columns(df, required)
+
+        values = pd.to_numeric(df["amount"], errors="coerce")
+        if self.use_absolute:
+            values = values.abs()
+        # Positional index from here on, so duplicate labels in *df* are harmless
+        work = pd.DataFrame(
+            {"g": pd.factorize(df[group], use_na_sentinel=True)[0], "x": values.to_numpy(dtype="float64")}
+        )
+        work = work[(work["g"] >= 0) & work["x"].notna()]
+
+        if rolling:
+            dates = pd.Series(pd.to_datetime(df[date_col], errors="coerce").to_numpy())
+            median, mad, mean_ad, count = self._rolling_baseline(work, dates, rolling)
+        else:
+            grouped = work.groupby("g", sort=False)["x"]
+            median = grouped.transform("median")
+            deviation = (work["x"] - median).abs().groupby(work["g"], sort=False)
+            mad = deviation.transform("median")
+            mean_ad = deviation.transform("mean")
+            count = grouped.transform("size")
+
+        x = work["x"].to_numpy(dtype="float64")
+        median, mad, mean_ad = (np.asarray(v, dtype="float64") for v in (median, mad, mean_ad))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(mad > 0, 0.6745 * (x - median) / mad, (x - median) / (1.2533 * mean_ad))
+            ratio = x / median
+        z = np.where(np.asarray(count, dtype="float64") >= self.min_count, z, np.nan)
+
+        flagged = np.abs(z) >= self.threshold
+        order = np.argsort(-np.abs(z[flagged]), kind="stable")
+        rows = work.index.to_numpy()[flagged][order]
+        self.scores = df.iloc[rows].assign(
+            baseline_median=median[flagged][order],
+            baseline_mad=mad[flagged][order],
+            robust_z=z[flagged][order],
+            ratio_to_median=ratio[flagged][order],
+        )
+        return self.scores
+
+    def _rolling_baseline(self, work: pd.DataFrame, dates: pd.Series, window: str | pd.Timedelta) -> tuple:
+        """Median, MAD, mean abs. deviation and count over each line's preceding *window*."""
+
+        positions = work.index
+        ordered = work.assign(date=dates.loc[positions]).dropna(subset=["date"]).sort_values(["g", "date"], kind="stable")
+        # Results come back in ``ordered``'s row order (groups are contiguous)
+        def rolled(frame: pd.DataFrame, how: str) -> pd.Series:
+            window_stat = getattr(
+                frame.groupby("g", sort=False).rolling(window, on="date", closed="left", min_periods=1)["x"], how
+            )()
+            return pd.Series(window_stat.to_numpy(), index=frame.index)
+
+        median = rolled(ordered, "median")
+        count = rolled(ordered, "count")
+        deviation = ordered.assign(x=(ordered["x"] - median).abs())
+        mad = rolled(deviation, "median")
+        mean_ad = rolled(deviation, "mean")
+
+        # Rows without a usable date keep NaN baselines (never flagged)
+        return tuple(s.reindex(positions) for s in (median, mad, mean_ad, count))
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<OutlierScorer threshold={self.threshold} min_count={self.min_count}>"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tool #11 – Group consolidation & intercompany eliminations
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class GroupConsolidator:
+    """Consolidate subsidiary trial balances into one group trial balance.
+
+    *trial_balances* is one long frame for the whole group with ``entity``,
+    ``account`` and ``amount`` (debit positive, credit negative) plus
+    optionally
+
+    * ``currency`` – functional currency of the line (default: the group
+      currency);
+    * ``date`` – balance date used for the rate look‑up (or pass *as_of*);
+    * ``counterparty`` – the group entity on the other side of an
+      intercompany balance.
+
+    Steps, all as merges and grouped sums (no loop over entities):
+
+    1. **chart alignment** – a *mapping* (``account`` → ``group_account``,
+       optionally per ``entity``) puts every entity on the common chart;
+       entity‑specific rows win over generic ones, unmapped accounts keep
+       their own label and are reported;
+    2. **FX translation** – rates (units of group currency per unit of
+       ``currency``) are joined as of the balance date with
+       ``pandas.merge_asof`` by currency, once per distinct
+       (currency, date, rate type).  With a ``rate_type`` column in *rates*,
+       income/expense accounts use ``average``, equity ``historical`` and
+       the rest ``closing`` (missing types fall back to ``closing``); the
+       difference that leaves each translated entity unbalanced is posted to
+       *cta_account* (cumulative translation adjustment);
+    3. **intercompany eliminations** – lines whose counterparty is a group
+       entity are keyed by the *unordered* entity pair plus statement side
+       (balance sheet / P&L), so A's receivable from B and B's payable to A
+       share one key.  Every keyed line is reversed; what the two sides fail
+       to net is posted to *ic_difference_account* and flagged above
+       *ic_tolerance*.  Keys with only one side are reported as
+       ``one-sided``.
+    """
+
+    _REQ_COLS = {"entity", "account", "amount"}
+    _RATE_COLS = {"currency", "date", "rate"}
+
+    def __init__(
+        self,
+        *,
+        group_currency: str = "USD",
+        ic_tolerance: float = 1.0,
+        cta_account: str = "Cumulative translation adjustment",
+        ic_difference_account: str = "Intercompany differences",
+        hierarchy: Optional[AccountHierarchy] = None,
+    ):
+        self.group_currency = group_currency
+        self.ic_tolerance = ic_tolerance
+        self.cta_account = cta_account
+        self.ic_difference_account = ic_difference_account
+        self.hierarchy = hierarchy or AccountHierarchy()
+        self.summary: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------
+    def consolidate(
+        self,
+        trial_balances: TableSource,
+        *,
+        rates: Optional[TableSource] = None,
+        mapping: Optional[TableSource] = None,
+        as_of: Optional[str | pd.Timestamp] = None,
+    ) -> Dict[str, Any]:
+        """Align, translate, eliminate and total the group.
+
+        Returns a dict with
+
+        * ``consolidated`` – per ``group_account``: ``aggregate`` (sum of
+          translated entity balances incl. CTA), ``eliminations`` and
+          ``consolidated``;
+        * ``entity_balances`` – translated lines per entity and group
+          account, incl. the CTA lines;
+        * ``eliminations`` – the audit trail: one row per eliminated line
+          (``elimination_id``, ``entity``, ``counterparty``,
+          ``group_account``, ``amount``, ``elimination``) plus one
+          difference row per key, with the key's ``status``;
+        * ``translation`` – per entity and currency: rate(s) used, local
+          and translated totals and the CTA;
+        * ``unmapped`` / ``missing_rates`` – accounts without a mapping and
+          (currency, date) pairs without a rate (those lines are left out);
+        * ``summary`` – counts and totals.
+        """
+
+        optional = {"currency", "date", "counterparty"}
+        tb = load_frame(trial_balances, self._REQ_COLS | optional)
+        ensure_columns(tb, self._REQ_COLS)
+
+        lines = pd.DataFrame(
+            {
+                "entity": tb["entity"].astype(str).to_numpy(),
+                "account": tb["account"].to_numpy(),
+                "amount": pd.to_numeric(tb["amount"], errors="coerce").fillna(0).to_numpy(dtype="float64"),
+                "currency": (
+                    tb["currency"].fillna(self.group_currency).astype(str).to_numpy()
+                    if "currency" in tb.columns
+                    else self.group_currency
+                ),
+            }
+        )
+        if "date" in tb.columns:
+            lines["date"] = pd.to_datetime(tb["date"], errors="coerce").to_numpy()
+        elif as_of is not None:
+            lines["date"] = pd.Timestamp(as_of)
+        else:
+            lines["date"] = pd.NaT
+        if as_of is not None:
+            lines["date"] = lines["date"].fillna(pd.Timestamp(as_of))
+        counterparty = tb["counterparty"] if "counterparty" in tb.columns else pd.Series(None, index=tb.index, dtype=object)
+        lines["counterparty"] = counterparty.astype(str).where(counterparty.notna(), None).to_numpy(dtype=object)
+
+        # 1. common chart of accounts
+        lines["group_account"], unmapped = self._map_accounts(lines, mapping)
+        lines["kind"] = self.hierarchy.classify(lines["group_account"])["kind"].to_numpy()
+
+        # 2. FX translation, looked up once per distinct (currency, date, rate type)
+        lines["rate_type"] = np.select(
+            [lines["kind"].isin(["income", "expense"]), lines["kind"] == "equity"], ["average", "historical"], "closing"
+        )
+        lines["rate"], missing_rates = self._rates(lines, rates)
+        lines["translated"] = lines["amount"] * lines["rate"]
+        lines = lines[lines["rate"].notna()]
+
+        translation, cta = self._translation_adjustments(lines)
+
+        entity_balances = (
+            pd.concat([lines[["entity", "group_account", "translated"]], cta], ignore_index=True)
+            .groupby(["entity", "group_account"], sort=True, observed=True)["translated"]
+            .sum()
+            .rename("amount")
+            .reset_index()
+        )
+
+        # 3. intercompany eliminations
+        eliminations = self._eliminations(lines)
+
+        aggregate = entity_balances.groupby("group_account", sort=True)["amount"].sum()
+        eliminated = eliminations.groupby("group_account", sort=True)["elimination"].sum()
+        consolidated = pd.concat([aggregate.rename("aggregate"), eliminated.rename("eliminations")], axis=1).fillna(0.0)
+        consolidated["consolidated"] = consolidated["aggregate"] + consolidated["eliminations"]
+        consolidated = consolidated.rename_axis("group_account").reset_index()
+
+        keys = eliminations.drop_duplicates("elimination_id")
+        self.summary = {
+            "entities": int(lines["entity"].nunique()),
+            "lines": int(len(lines)),
+            "group_accounts": int(len(consolidated)),
+            "unmapped_accounts": int(len(unmapped)),
+            "missing_rates": int(len(missing_rates)),
+            "translation_adjustment": float(cta["translated"].sum()),
+            "elimination_keys": int(len(keys)),
+            "eliminated_lines": int((eliminations["line"] == "elimination").sum()),
+            "keys_by_status": {k: int(v) for k, v in keys["status"].value_counts().items()},
+            "ic_difference": float(eliminations.loc[eliminations["line"] == "difference", "elimination"].sum()),
+            "consolidated_total": float(consolidated["consolidated"].sum()),
+        }
+        return {
+            "consolidated": consolidated,
+            "entity_balances": entity_balances,
+            "eliminations": eliminations,
+            "translation": translation,
+            "unmapped": unmapped,
+            "missing_rates": missing_rates,
+            "summary": self.summary,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _map_accounts(self, lines: pd.DataFrame, mapping: Optional[TableSource]) -> tuple:
+        """``group_account`` per line and the distinct unmapped (entity, account) pairs."""
+
+        accounts = lines["account"].astype(str).to_numpy()
+        if mapping is None:
+            return accounts, pd.DataFrame(columns=["entity", "account", "lines"])
+
+        mapping = load_frame(mapping, {"entity", "account", "group_account"})
+        ensure_columns(mapping, {"account", "group_account"})
+        mapping = mapping.assign(account=mapping["account"].astype(str), group_account=mapping["group_account"].astype(str))
+
+        keys = pd.DataFrame({"entity": lines["entity"].to_numpy(), "account": accounts})
+        group_account = pd.Series(np.nan, index=keys.index, dtype=object)
+        if "entity" in mapping.columns:
+            specific = mapping[mapping["entity"].notna()].assign(entity=lambda m: m["entity"].astype(str))
+            specific = specific.drop_duplicates(["entity", "account"], keep="last")
+            hit = keys.merge(specific[["entity", "account", "group_account"]], on=["entity", "account"], how="left")
+            group_account = hit["group_account"]
+            generic = mapping[mapping["entity"].isna()]
+        else:
+            generic = mapping
+        generic = generic.drop_duplicates("account", keep="last").set_index("account")["group_account"]
+        group_account = group_account.fillna(keys["account"].map(generic))
+
+        missing = group_account.isna().to_numpy()
+        unmapped = (
+            keys[missing].groupby(["entity", "account"], sort=True).size().rename("lines").reset_index()
+        )
+        return np.where(missing, accounts, group_account.to_numpy(dtype=object)), unmapped
+
+    def _rates(self, lines: pd.DataFrame, rates: Optional[TableSource]) -> tuple:
+        """Rate per line (NaN when none) and the missing (currency, date) pairs."""
+
+        foreign = lines["currency"].to_numpy() != self.group_currency
+        rate = np.where(foreign, np.nan, 1.0)
+        no_rate = pd.DataFrame(columns=["currency", "date", "rate_type", "lines"])
+        if not foreign.any():
+            return rate, no_rate
+
+        wanted = lines.loc[foreign, ["currency", "date", "rate_type"]]
+        if rates is not None:
+            table = load_frame(rates, self._RATE_COLS | {"rate_type"})
+            ensure_columns(table, self._RATE_COLS)
+            table = pd.DataFrame(
+                {
+                    "currency": table["currency"].astype(str).to_numpy(),
+                    "date": pd.to_datetime(table["date"], errors="coerce").to_numpy(),
+                    "rate": pd.to_numeric(table["rate"], errors="coerce").to_numpy(dtype="float64"),
+                    "rate_type": table["rate_type"].astype(str).str.lower().to_numpy() if "rate_type" in table.columns else "closing",
+                }
+            ).dropna(subset=["date", "rate"]).sort_values("date", kind="stable")
+
+            combos = wanted.drop_duplicates().dropna(subset=["date"])
+            looked_up = combos.assign(rate=np.nan)
+            # Requested type first, then closing as the fallback
+            for rate_type in ("requested", "closing"):
+                pending = looked_up["rate"].isna()
+                if not pending.any():
+                    break
+                left = looked_up[pending].assign(
+                    _type=looked_up.loc[pending, "rate_type"] if rate_type == "requested" else "closing"
+                )
+                found = pd.merge_asof(
+                    left.drop(columns="rate").reset_index().sort_values("date", kind="stable"),
+                    table.rename(columns={"rate_type": "_type"}),
+                    on="date",
+                    by=["currency", "_type"],
+                    direction="backward",
+                ).set_index("index")["rate"]
+                looked_up.loc[found.index, "rate"] = looked_up.loc[found.index, "rate"].fillna(found)
+            rate[foreign] = wanted.merge(looked_up, on=["currency", "date", "rate_type"], how="left")["rate"].to_numpy()
+
+        missing = np.isnan(rate)
+        if missing.any():
+            no_rate = (
+                lines.loc[missing, ["currency", "date", "rate_type"]]
+                .groupby(["currency", "date", "rate_type"], sort=True, dropna=False)
+                .size()
+                .rename("lines")
+                .reset_index()
+            )
+        return rate, no_rate
+
+    def _translation_adjustments(self, lines: pd.DataFrame) -> tuple:
+        """Per‑entity translation summary and the CTA lines that rebalance each entity."""
+
+        per_entity = lines.groupby(["entity", "currency"], sort=True).agg(
+            local_total=("amount", "sum"),
+            translated_total=("translated", "sum"),
+            min_rate=("rate", "min"),
+            max_rate=("rate", "max"),
+            lines=("amount", "size"),
+        )
+        per_entity["cta"] = -per_entity["translated_total"]
+        per_entity.loc[per_entity.index.get_level_values("currency") == self.group_currency, "cta"] = 0.0
+        translation = per_entity.reset_index()
+
+        posted = translation[translation["cta"].abs() > 1e-9]
+        cta = pd.DataFrame(
+            {"entity": posted["entity"].to_numpy(), "group_account": self.cta_account, "translated": posted["cta"].to_numpy()}
+        )
+        return translation, cta
+
+    def _eliminations(self, lines: pd.DataFrame) -> pd.DataFrame:
+        """Elimination audit trail keyed by the unordered entity pair and statement side."""
+
+        columns = ["elimination_id", "line", "entity", "counterparty", "group_account", "amount", "elimination", "status"]
+        entities = pd.Index(lines["entity"].unique())
+        cp_codes = entities.get_indexer(lines["counterparty"].fillna(""))
+        own_codes = entities.get_indexer(lines["entity"])
+        ic = (cp_codes >= 0) & (cp_codes != own_codes)
+        if not ic.any():
+            return pd.DataFrame(columns=columns)
+
+        ic_lines = lines[ic]
+        lo = np.minimum(own_codes[ic], cp_codes[ic])
+        hi = np.maximum(own_codes[ic], cp_codes[ic])
+        side = np.where(ic_lines["kind"].isin(["income", "expense"]).to_numpy(), 1, 0)
+        # One integer key per (entity pair, statement side)
+        n = len(entities)
+        key = (lo.astype(np.int64) * n + hi) * 2 + side
+
+        trail = pd.DataFrame(
+            {
+                "key": key,
+                "line": "elimination",
+                "entity": ic_lines["entity"].to_numpy(),
+                "counterparty": ic_lines["counterparty"].to_numpy(),
+                "group_account": ic_lines["group_account"].to_numpy(),
+                "amount": ic_lines["translated"].to_numpy(),
+                "elimination": -ic_lines["translated"].to_numpy(),
+            }
+        )
+        per_key = trail.groupby("key", sort=True).agg(
+            net=("amount", "sum"), sides=("entity", "nunique"), first=("entity", "first")
+        )
+        per_key["status"] = np.where(
+            per_key["sides"] < 2,
+            "one-sided",
+            np.where(per_key["net"].abs() > self.ic_tolerance, "mismatch", "matched"),
+        )
+        per_key["elimination_id"] = np.arange(1, len(per_key) + 1)
+
+        differences = per_key[per_key["net"].abs() > 1e-9]
+        pair_lo, pair_hi = entities[(differences.index // 2) // n], entities[(differences.index // 2) % n]
+        diff_rows = pd.DataFrame(
+            {
+                "key": differences.index,
+                "line": "difference",
+                "entity": np.asarray(pair_lo, dtype=object),
+                "counterparty": np.asarray(pair_hi, dtype=object),
+                "group_account": self.ic_difference_account,
+                "amount": 0.0,
+                "elimination": differences["net"].to_numpy(),
+            }
+        )
+        # Each key's lines in input order, its difference row last
+        trail = pd.concat([trail, diff_rows], ignore_index=True).sort_values("key", kind="stable")
+        trail = trail.join(per_key[["elimination_id", "status"]], on="key")
+        return trail[columns].reset_index(drop=True)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<GroupConsolidator currency={self.group_currency} ic_tolerance={self.ic_tolerance}>"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tool #12 – Document numbering integrity (gaps, duplicates, dates)
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class SequenceGapAnalyzer:
+    """Completeness tests on invoice, cheque or journal numbering.
+
+    Document numbers may be integers or labels with a trailing number
+    (``"FAC-000123"``); the text before the number becomes part of the
+    series, together with the optional *series_col*.  Labels are parsed once
+    per distinct value, then every series is sorted **once** by number and
+    checked with vectorised diffs of neighbouring numbers:
+
+    * **gaps** – consecutive numbers more than 1 apart, returned as compact
+      ranges (``first_missing``–``last_missing``), never as exploded lists;
+      ranges longer than ``max_gap`` are marked ``jump`` (a likely new
+      numbering block rather than missing documents);
+    * **duplicates** – numbers used more than once, one row per number;
+    * **out‑of‑order dates** – documents dated earlier than a lower number
+      of the same series (the running maximum date so far).
+    """
+
+    _NUMBER_PATTERN = r"^\s*(?P<prefix>.*?)(?P<digits>\d+)\s*$"
+
+    def __init__(self, *, max_gap: Optional[int] = None):
+        self.max_gap = max_gap
+        self.summary: Optional[pd.DataFrame] = None
+
+    # ------------------------------------------------------------------
+    def analyze(
+        self,
+        df: TableSource,
+        *,
+        number_col: str = "entry_id",
+        series_col: Optional[str] = None,
+        date_col: Optional[str] = "date",
+    ) -> Dict[str, Any]:
+        """Check the numbering of *df*.
+
+        Returns a dict with
+
+        * ``series`` – per series: ``first``, ``last``, ``documents``,
+          ``distinct``, ``expected`` (last − first + 1), ``missing``,
+          ``gaps``, ``duplicated_numbers``, ``out_of_order`` and
+          ``completeness`` (distinct / expected);
+        * ``gaps`` – ``series``, ``first_missing``, ``last_missing``,
+          ``missing``, ``kind`` (``gap`` or ``jump``);
+        * ``duplicates`` – ``series``, ``number``, ``occurrences``,
+          ``first_row`` (index label of the first occurrence);
+        * ``out_of_order`` – ``series``, ``number``, ``row``, ``date`` and
+          ``latest_prior_date`` (latest date among lower numbers);
+        * ``unparsed`` – number of rows without a usable document number.
+        """
+
+        required = {number_col} | ({series_col} if series_col else set())
+        df = load_frame(df, required | ({date_col} if date_col else set()))
+        ensure_columns(df, required)
+
+        numbers, prefixes = self._parse(df[number_col])
+        series_label = prefixes
+        if series_col:
+            series_label = df[series_col].astype(str).str.strip().to_numpy(dtype=object)
+            series_label = np.where(prefixes != "", series_label + " " + prefixes, series_label)
+        series_codes, series_names = pd.factorize(pd.Series(series_label, dtype=object), use_na_sentinel=True)
+        series_names = np.asarray(series_names, dtype=object)
+        usable = (numbers >= 0) & (series_codes >= 0)
+
+        # One sort: numbers, then series (stable) → series blocks in number order
+        rows = np.flatnonzero(usable)
+        rows = rows[np.argsort(numbers[rows], kind="stable")]
+        rows = rows[np.argsort(series_codes[rows], kind="stable")]
+        code, num = series_codes[rows], numbers[rows]
+
+        same = code[1:] == code[:-1]
+        step = np.diff(num)
+
+        gaps = self._gaps(series_names, code, num, same, step)
+        duplicates = self._duplicates(df.index, series_names, code, num, rows, same, step)
+        if date_col and date_col in df.columns:
+            dates = pd.to_datetime(df[date_col], errors="coerce").to_numpy(dtype="datetime64[ns]")[rows]
+        else:
+            dates = np.full(len(rows), np.datetime64("NaT"), dtype="datetime64[ns]")
+        out_of_order = self._out_of_order(df.index, series_names, code, num, rows, dates)
+
+        self.summary = self._series_summary(series_names, code, num, same, step, gaps, duplicates, out_of_order)
+        return {
+            "series": self.summary,
+            "gaps": gaps,
+            "duplicates": duplicates,
+            "out_of_order": out_of_order,
+            "unparsed": int((~usable).sum()),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _parse(self, values: pd.Series) -> tuple:
+        """``(numbers, prefixes)`` per row; number −1 where none can be read."""
+
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+            integral = np.isfinite(numeric) & (numeric >= 0) & (np.floor(numeric) == numeric)
+            numbers = np.where(integral, numeric, -1).astype(np.int64)
+            return numbers, np.full(len(values), "", dtype=object)
+
+        # Labels: parsed once per distinct value, broadcast through the codes
+        row_codes, labels = pd.factorize(values, use_na_sentinel=True)
+        labels = pd.Index(labels).astype(str)
+        if pc is not None:
+            # Arrow's regex kernel is several times faster than ``str.extract``
+            parts = pc.extract_regex(pa.array(labels, type=pa.string()), self._NUMBER_PATTERN)
+            prefix, digits = parts.flatten()  # flatten() carries non-matches as nulls
+            # More than 18 digits cannot be held in int64 → unparsed
+            digits = pc.if_else(pc.less_equal(pc.utf8_length(digits), 18), digits, None)
+            label_numbers = pc.fill_null(pc.cast(digits, pa.int64()), -1).to_numpy(zero_copy_only=False)
+            label_prefixes = pc.fill_null(pc.utf8_trim_whitespace(prefix), "").to_numpy(zero_copy_only=False)
+        else:
+            parts = pd.Series(labels, dtype=object).str.extract(self._NUMBER_PATTERN)
+            digits = parts["digits"].where(parts["digits"].str.len() <= 18)
+            label_numbers = pd.to_numeric(digits, errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+            label_prefixes = parts["prefix"].fillna("").str.strip().to_numpy(dtype=object)
+        label_numbers = np.append(label_numbers.astype(np.int64), -1)
+        label_prefixes = np.append(label_prefixes.astype(object), "")
+        return label_numbers[row_codes], label_prefixes[row_codes]
+
+    def _gaps(self, names, code, num, same, step) -> pd.DataFrame:
+        hole = same & (step > 1)
+        missing = step[hole] - 1
+        jump = missing > self.max_gap if self.max_gap is not None else np.zeros(len(missing), dtype=bool)
+        kind = pd.Categorical.from_codes(jump.astype(np.int8), ["gap", "jump"])
+        return pd.DataFrame(
+            {
+                "series": pd.Categorical.from_codes(code[1:][hole], names),
+                "first_missing": num[:-1][hole] + 1,
+                "last_missing": num[1:][hole] - 1,
+                "missing": missing,
+                "kind": kind,
+            }
+        )
+
+    @staticmethod
+    def _duplicates(index, names, code, num, rows, same, step) -> pd.DataFrame:
+        # Runs of equal (series, number) in sorted order
+        starts = np.flatnonzero(np.concatenate([[True], ~(same & (step == 0))])) if len(num) else np.array([], dtype=np.int64)
+        counts = np.diff(np.append(starts, len(num)))
+        repeated = starts[counts > 1]
+        return pd.DataFrame(
+            {
+                "series": pd.Categorical.from_codes(code[repeated], names),
+                "number": num[repeated],
+                "occurrences": counts[counts > 1],
+                "first_row": index[rows[repeated]],
+            }
+        )
+
+    @staticmethod
+    def _out_of_order(index, names, code, num, rows, dates) -> pd.DataFrame:
+        ticks = dates.view("i8")
+        valid = ~np.isnat(dates)
+        # Latest date among the lower numbers of the same series
+        running = pd.Series(np.where(valid, ticks, np.iinfo(np.int64).min)).groupby(code).cummax().to_numpy()
+        prior = np.concatenate([[np.iinfo(np.int64).min], running[:-1]])
+        prior[np.concatenate([[True], code[1:] != code[:-1]])] = np.iinfo(np.int64).min
+        late = valid & (prior != np.iinfo(np.int64).min) & (ticks < prior)
+        return pd.DataFrame(
+            {
+                "series": pd.Categorical.from_codes(code[late], names),
+                "number": num[late],
+                "row": index[rows[late]],
+                "date": dates[late],
+                "latest_prior_date": prior[late].astype("datetime64[ns]"),
+            }
+        )
+
+    @staticmethod
+    def _series_summary(names, code, num, same, step, gaps, duplicates, out_of_order) -> pd.DataFrame:
+        columns = ["series", "first", "last", "documents", "distinct", "expected", "missing",
+                   "gaps", "duplicated_numbers", "out_of_order", "completeness"]
+        if not len(num):
+            return pd.DataFrame(columns=columns)
+        block_start = np.flatnonzero(np.concatenate([[True], ~same]))
+        block_stop = np.append(block_start[1:], len(num))
+        new_number = np.concatenate([[True], ~(same & (step == 0))])
+        first, last = num[block_start], num[block_stop - 1]
+        out = pd.DataFrame(
+            {
+                "series": pd.Categorical.from_codes(code[block_start], names),
+                "first": first,
+                "last": last,
+                "documents": block_stop - block_start,
+                "distinct": np.add.reduceat(new_number.astype(np.int64), block_start),
+                "expected": last - first + 1,
+            }
+        )
+        out["missing"] = out["expected"] - out["distinct"]
+        for column, found in (("gaps", gaps), ("duplicated_numbers", duplicates), ("out_of_order", out_of_order)):
+            out[column] = np.bincount(found["series"].cat.codes, minlength=len(names))[code[block_start]]
+        out["completeness"] = out["distinct"] / out["expected"]
+        return out[columns]
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<SequenceGapAnalyzer max_gap={self.max_gap}>"
@@ -0,0 +1,567 @@
+"""
+Pluggable execution engines for the heavy scans of the audit tools.
+
+By default every tool in :mod:`backend.tools.audit_tools` runs its own
+eager pandas code: the upload is materialised, normalised and every
+intermediate is a full‑size frame.  For large ledgers the *reductions*
+those tools need – grouped totals for :class:`BalanceSheetAuditor`, the
+duplicate/unbalanced flags of :class:`TransactionVerifier` and the rule
+masks of :class:`~backend.tools.rules_engine.RulesEngine` – can instead be
+pushed down to an in‑process, multi‑threaded columnar engine:
+
+``pandas``  eager default; the tools use their built‑in code paths.
+``polars``  lazy ``scan_ipc`` over the memory‑mapped columnar copy.
+``duckdb``  SQL over the memory‑mapped Arrow table of the columnar copy.
+
+Lazy engines read only the columns a check needs (projection pushdown),
+evaluate the filters inside the scan (predicate pushdown) and hand back
+just the small result – grouped totals or the flagged rows – as pandas,
+so the tools' outputs are the same whichever engine ran.  Rule types an
+engine cannot translate (``expression``) fall back to pandas.
+
+``"auto"`` picks the first installed lazy engine once the ledger has at
+least :data:`LAZY_ENGINE_MIN_ROWS` rows and pandas below that; run
+``python backend/bench_engines.py`` to find the crossover on your hardware.
+
+Dependencies
+------------
+* polars ≥ 1.0 (optional) – ``pip install polars``
+* duckdb ≥ 1.0 (optional) – ``pip install duckdb``
+
+Example
+-------
+```python
+from backend.tools.audit_tools import TransactionVerifier
+
+issues = TransactionVerifier(engine="polars").verify("uploads/acme/1a2b3c4d.csv")
+```
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = feather = None
+
+from backend.tools.ledger_frame import CATEGORICAL_COLUMNS, LedgerFrame
+from backend.tools.shared_frames import SharedFrameHandle, read_frame
+from backend.tools.tabular_tools import columnar_path, columnar_schema, convert_to_columnar
+
+__all__ = [
+    "AuditEngine",
+    "PandasEngine",
+    "PolarsEngine",
+    "DuckDBEngine",
+    "ENGINES",
+    "LAZY_ENGINE_MIN_ROWS",
+    "available_engines",
+    "get_engine",
+]
+
+# Below this many rows the eager pandas paths win (see bench_engines.py)
+LAZY_ENGINE_MIN_ROWS = 1_000_000
+
+Source = Union[pd.DataFrame, LedgerFrame, SharedFrameHandle, str, Path]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Base class
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class AuditEngine:
+    """Interface the audit tools call when an engine is *lazy*.
+
+    Every method takes the same sources as the tools (DataFrame,
+    :class:`LedgerFrame`, :class:`SharedFrameHandle` or upload path) and returns pandas objects whose
+    row labels are those of the source (positions for uploads).
+    """
+
+    name = "base"
+    lazy = True
+    requires: Optional[str] = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+
+    def columns(self, source: Source) -> List[str]:
+        """Column names of *source* without loading rows."""
+
+        frame = _frame(source)
+        if frame is not None:
+            return [str(c) for c in frame.columns]
+        if isinstance(source, SharedFrameHandle):
+            return list(source.columns)
+        return list(columnar_schema(source))
+
+    def group_sum(self, source: Source, by: List[str], value: str) -> pd.DataFrame:
+        """``by`` columns plus the summed *value* per distinct group (missing keys kept)."""
+
+        raise NotImplementedError
+
+    def transaction_flags(self, source: Source, columns: List[str], window_ns: int) -> pd.DataFrame:
+        """Rows that are potential duplicates or unbalanced.
+
+        A row is a duplicate when another row with the same ``account`` and
+        ``amount`` is less than *window_ns* nanoseconds apart – the rule of
+        ``audit_tools._duplicate_mask``.  Returns the *columns* of the flagged
+        rows plus boolean ``_dup`` and ``_unbalanced``, in row order.
+        """
+
+        raise NotImplementedError
+
+    def translates(self, rule: Dict[str, Any]) -> bool:
+        """Whether *rule* can be evaluated inside the engine's scan."""
+
+        return False
+
+    def rule_hits(
+        self,
+        source: Source,
+        rules: List[Dict[str, Any]],
+        columns: List[str],
+        masks: Optional[Dict[str, np.ndarray]] = None,
+    ) -> pd.DataFrame:
+        """Evaluate the (translatable) *rules* inside one scan.
+
+        *masks* are row masks computed elsewhere – for rules the engine does
+        not translate – and are joined into the same scan.  Returns the
+        ``_row`` position and *columns* of every row where anything fired,
+        plus one boolean column per rule/mask name, in row order.
+        """
+
+        raise NotImplementedError
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def label_rows(source: Source, result: pd.DataFrame) -> pd.DataFrame:
+        """Replace the ``_row`` positions of *result* by the source's row labels."""
+
+        positions = result.pop("_row").to_numpy(dtype=np.int64)
+        frame = _frame(source)
+        if frame is None and isinstance(source, SharedFrameHandle):
+            frame = read_frame(source, columns=[])  # index only
+        index = frame.index[positions] if frame is not None else pd.Index(positions)
+        result.index = index
+        return result
+
+    @staticmethod
+    def match_dtypes(source: Source, result: pd.DataFrame) -> pd.DataFrame:
+        """Cast non‑categorical columns of *result* to the dtypes *source* loads with.
+
+        Arrow results lose the pandas metadata of the source (e.g. the
+        ``string`` dtype of text columns); this restores it, so lazy and
+        pandas outputs have the same dtypes before normalisation.
+        """
+
+        frame = _frame(source)
+        if frame is not None:
+            reference = frame.dtypes
+        else:
+            with pa.memory_map(str(_sidecar(source)), "r") as handle:
+                reference = pa.ipc.open_file(handle).schema.empty_table().to_pandas().dtypes
+        for col in result.columns:
+            dtype = reference.get(col)
+            if dtype is None or isinstance(dtype, pd.CategoricalDtype) or isinstance(result[col].dtype, pd.CategoricalDtype):
+                continue
+            if result[col].dtype != dtype:
+                result[col] = result[col].astype(dtype)
+        return result
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<{type(self).__name__} lazy={self.lazy}>"
+
+
+def _frame(source: Source) -> Optional[pd.DataFrame]:
+    if isinstance(source, LedgerFrame):
+        return source.df
+    if isinstance(source, pd.DataFrame):
+        return source
+    return None
+
+
+def _sidecar(source: Union[SharedFrameHandle, str, Path]) -> Path:
+    """Path of the columnar copy of an upload, created on first use.
+
+    A :class:`SharedFrameHandle` already points at an Arrow IPC file.
+    """
+
+    if isinstance(source, SharedFrameHandle):
+        return Path(source.path)
+    sidecar = columnar_path(source)
+    if not sidecar.exists():
+        convert_to_columnar(source)
+    if not sidecar.exists():
+        raise ValueError(f"{source}: no columnar copy available for lazy engines (is pyarrow installed?)")
+    return sidecar
+
+
+def _missing(available: Iterable[str], required: Iterable[str]) -> None:
+    missing = set(required) - set(available)
+    if missing:
+        raise ValueError(f"DataFrame is missing required columns: {', '.join(sorted(missing))}")
+
+
+def _to_pandas(table: "pa.Table") -> pd.DataFrame:
+    """Arrow result → pandas, label columns dictionary‑encoded to categoricals.
+
+    Accounts, types, … would otherwise each become a Python string object;
+    the columns are those :func:`normalize_audit_frame` makes categorical.
+    """
+
+    for i, field in enumerate(table.schema):
+        if field.name in CATEGORICAL_COLUMNS and _is_text(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.large_string()).dictionary_encode())
+    df = table.to_pandas()
+    # Dictionaries follow first appearance; sort them like normalize_audit_frame
+    # so sort_index / groupby order matches the pandas engine
+    for col in df.columns[[isinstance(dtype, pd.CategoricalDtype) for dtype in df.dtypes]]:
+        try:
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+        except TypeError:
+            pass
+    return df
+
+
+def _is_text(arrow_type: "pa.DataType") -> bool:
+    checks = (pa.types.is_string, pa.types.is_large_string, getattr(pa.types, "is_string_view", None))
+    return any(check is not None and check(arrow_type) for check in checks)
+
+
+def _wanted(rule: Dict[str, Any]) -> List[str]:
+    return sorted({str(v).strip().lower() for v in rule["values"]})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Pandas (eager default)
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class PandasEngine(AuditEngine):
+    """Eager default – tools given this engine run their own pandas code."""
+
+    name = "pandas"
+    lazy = False
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Polars
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class PolarsEngine(AuditEngine):
+    """Lazy Polars queries over ``scan_ipc`` of the upload's columnar copy."""
+
+    name = "polars"
+    requires = "polars"
+
+    @classmethod
+    def available(cls) -> bool:
+        return pl is not None
+
+    def _scan(self, source: Source, columns: Iterable[str]) -> "pl.LazyFrame":
+        columns = list(dict.fromkeys(columns))
+        frame = _frame(source)
+        if frame is not None:
+            _missing(frame.columns, columns)
+            lf = pl.from_pandas(frame[columns].reset_index(drop=True)).lazy()
+        else:
+            lf = pl.scan_ipc(_sidecar(source))
+            _missing(lf.collect_schema().names(), columns)
+        lf = lf.with_row_index("_row")
+        schema = lf.collect_schema()
+
+        # Same coercions as normalize_audit_frame, applied inside the scan
+        casts = []
+        for col in columns:
+            dtype = schema[col]
+            if col == "date" and not dtype.is_temporal():
+                casts.append(pl.col(col).cast(pl.Utf8).str.to_datetime(strict=False))
+            elif col in ("amount", "debit", "credit") and not dtype.is_float():
+                casts.append(pl.col(col).cast(pl.Float64, strict=False))
+        return lf.with_columns(casts).select(["_row", *columns])
+
+    def group_sum(self, source: Source, by: List[str], value: str) -> pd.DataFrame:
+        lf = self._scan(source, [*by, value])
+        out = lf.group_by(by).agg(pl.col(value).sum()).collect()
+        return _to_pandas(out.to_arrow())
+
+    def transaction_flags(self, source: Source, columns: List[str], window_ns: int) -> pd.DataFrame:
+        window = pl.duration(microseconds=window_ns // 1_000)
+        # Sorted by (account, amount, date) the time neighbours of a row are
+        # the adjacent rows; missing values compare as null → never a pair
+        pair = (
+            (pl.col("account") == pl.col("account").shift(1))
+            & (pl.col("amount") == pl.col("amount").shift(1))
+            & (pl.col("date") - pl.col("date").shift(1) < window)
+        ).fill_null(False)
+        unbalanced = ((pl.col("debit") == 1) & (pl.col("credit") == 1)) | ((pl.col("debit") == 0) & (pl.col("credit") == 0))
+
+        out = (
+            self._scan(source, columns)
+            .sort(["account", "amount", "date"], nulls_last=True)
+            .with_columns(_pair=pair)
+            .with_columns(
+                _dup=pl.col("_pair") | pl.col("_pair").shift(-1, fill_value=False),
+                _unbalanced=unbalanced.fill_null(False),
+            )
+            .filter(pl.col("_dup") | pl.col("_unbalanced"))
+            .drop("_pair")
+            .sort("_row")
+            .collect()
+        )
+        return self.label_rows(source, _to_pandas(out.to_arrow()))
+
+    def translates(self, rule: Dict[str, Any]) -> bool:
+        return self._rule_expr(rule) is not None
+
+    def rule_hits(self, source, rules, columns, masks=None) -> pd.DataFrame:
+        flags = {rule["name"]: self._rule_expr(rule).fill_null(False) for rule in rules}
+        flags.update({name: pl.Series(name, mask, dtype=pl.Boolean) for name, mask in (masks or {}).items()})
+        out = (
+            self._scan(source, columns)
+            .with_columns(**flags)
+            .filter(pl.any_horizontal(list(flags)) if flags else pl.lit(False))
+            .collect()
+        )
+        return _to_pandas(out.to_arrow())
+
+    @staticmethod
+    def _rule_expr(rule: Dict[str, Any]) -> Optional["pl.Expr"]:
+        kind = rule["type"]
+        if kind == "round_amount":
+            value = pl.col(rule.get("column", "amount")).cast(pl.Float64, strict=False)
+            return (value != 0) & (value % float(rule.get("multiple", 1000)) == 0)
+        if kind == "weekend":
+            return pl.col(rule.get("column", "date")).dt.weekday() >= 6
+        if kind == "threshold":
+            value = pl.col(rule.get("column", "amount")).cast(pl.Float64, strict=False)
+            if rule.get("absolute", True):
+                value = value.abs()
+            hit = pl.lit(False)
+            if rule.get("above") is not None:
+                hit = hit | (value > float(rule["above"]))
+            if rule.get("below") is not None:
+                hit = hit | (value < float(rule["below"]))
+            return hit
+        if kind in ("in_list", "not_in_list"):
+            col = pl.col(rule.get("column", "account"))
+            listed = col.cast(pl.Utf8).str.strip_chars().str.to_lowercase().is_in(_wanted(rule))
+            return listed if kind == "in_list" else ~listed & col.is_not_null()
+        if kind == "pattern":
+            flags = "" if rule.get("case_sensitive", False) else "(?i)"
+            return pl.col(rule.get("column", "description")).cast(pl.Utf8).str.contains(flags + rule["pattern"])
+        return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DuckDB
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class DuckDBEngine(AuditEngine):
+    """SQL over the upload's memory‑mapped Arrow table in an in‑process DuckDB."""
+
+    name = "duckdb"
+    requires = "duckdb"
+
+    def __init__(self, *, threads: Optional[int] = None):
+        self.threads = threads
+
+    @classmethod
+    def available(cls) -> bool:
+        return duckdb is not None and pa is not None
+
+    def _query(self, source: Source, columns: Iterable[str], sql: str, extra: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+        """Run *sql* against a view ``ledger`` holding ``_row``, *columns* and the *extra* arrays."""
+
+        columns = list(dict.fromkeys(columns))
+        frame = _frame(source)
+        if frame is not None:
+            _missing(frame.columns, columns)
+            table = pa.Table.from_pandas(frame[columns].reset_index(drop=True), preserve_index=False)
+        else:
+            sidecar = _sidecar(source)
+            _missing(columnar_schema(sidecar), columns)
+            table = feather.read_table(sidecar, columns=columns, memory_map=True)
+        table = table.append_column("_row", pa.array(np.arange(table.num_rows, dtype=np.int64)))
+        for name, values in (extra or {}).items():
+            table = table.append_column(name, pa.array(np.asarray(values, dtype=bool)))
+
+        con = duckdb.connect()
+        try:
+            if self.threads:
+                con.execute(f"SET threads = {int(self.threads)}")
+            con.register("_arrow", table)
+            select = ["_row", *(self._cast(c, table.schema.field(c).type) for c in columns), *map(self._ident, extra or {})]
+            con.execute(f"CREATE VIEW ledger AS SELECT {', '.join(select)} FROM _arrow")
+            return _to_pandas(con.execute(sql).fetch_arrow_table())
+        finally:
+            con.close()
+
+    @staticmethod
+    def _ident(col: str) -> str:
+        return '"' + str(col).replace('"', '""') + '"'
+
+    @classmethod
+    def _cast(cls, col: str, arrow_type: "pa.DataType") -> str:
+        """Same coercions as normalize_audit_frame, as a SELECT item."""
+
+        ident = cls._ident(col)
+        if col == "date" and not pa.types.is_timestamp(arrow_type) and not pa.types.is_date(arrow_type):
+            return f"TRY_CAST({ident} AS TIMESTAMP) AS {ident}"
+        if col in ("amount", "debit", "credit") and not pa.types.is_floating(arrow_type):
+            return f"TRY_CAST({ident} AS DOUBLE) AS {ident}"
+        return ident
+
+    @staticmethod
+    def _literal(value: Any) -> str:
+        return "'" + str(value).replace("'", "''") + "'"
+
+    def group_sum(self, source: Source, by: List[str], value: str) -> pd.DataFrame:
+        keys = ", ".join(self._ident(c) for c in by)
+        sql = f"SELECT {keys}, SUM({self._ident(value)}) AS {self._ident(value)} FROM ledger GROUP BY {keys}"
+        return self._query(source, [*by, value], sql)
+
+    def transaction_flags(self, source: Source, columns: List[str], window_ns: int) -> pd.DataFrame:
+        select = ", ".join(["_row", *(self._ident(c) for c in columns)])
+        sql = f"""
+            SELECT {select}, _dup, _unbalanced FROM (
+                SELECT *,
+                    account IS NOT NULL AND amount IS NOT NULL AND date IS NOT NULL AND (
+                        COALESCE(epoch_ns(date) - epoch_ns(LAG(date) OVER w) < {int(window_ns)}, FALSE)
+                        OR COALESCE(epoch_ns(LEAD(date) OVER w) - epoch_ns(date) < {int(window_ns)}, FALSE)
+                    ) AS _dup,
+                    COALESCE((debit = 1 AND credit = 1) OR (debit = 0 AND credit = 0), FALSE) AS _unbalanced
+                FROM ledger
+                WINDOW w AS (PARTITION BY account, amount ORDER BY date NULLS LAST)
+            )
+            WHERE _dup OR _unbalanced
+            ORDER BY _row
+        """
+        return self.label_rows(source, self._query(source, columns, sql))
+
+    def translates(self, rule: Dict[str, Any]) -> bool:
+        return self._rule_sql(rule) is not None
+
+    def rule_hits(self, source, rules, columns, masks=None) -> pd.DataFrame:
+        masks = masks or {}
+        flags = [f"COALESCE({self._rule_sql(rule)}, FALSE) AS {self._ident(rule['name'])}" for rule in rules]
+        flags += [self._ident(name) for name in masks]
+        names = [rule["name"] for rule in rules] + list(masks)
+        select = ", ".join(["_row", *(self._ident(c) for c in columns), *flags])
+        any_hit = " OR ".join(self._ident(name) for name in names) or "FALSE"
+        sql = f"SELECT * FROM (SELECT {select} FROM ledger) WHERE {any_hit} ORDER BY _row"
+        return self._query(source, columns, sql, extra=masks)
+
+    @classmethod
+    def _rule_sql(cls, rule: Dict[str, Any]) -> Optional[str]:
+        kind = rule["type"]
+        if kind == "round_amount":
+            value = f"TRY_CAST({cls._ident(rule.get('column', 'amount'))} AS DOUBLE)"
+            return f"({value} <> 0 AND fmod({value}, {float(rule.get('multiple', 1000))}) = 0)"
+        if kind == "weekend":
+            return f"(isodow(TRY_CAST({cls._ident(rule.get('column', 'date'))} AS TIMESTAMP)) >= 6)"
+        if kind == "threshold":
+            value = f"TRY_CAST({cls._ident(rule.get('column', 'amount'))} AS DOUBLE)"
+            if rule.get("absolute", True):
+                value = f"abs({value})"
+            parts = []
+            if rule.get("above") is not None:
+                parts.append(f"{value} > {float(rule['above'])}")
+            if rule.get("below") is not None:
+                parts.append(f"{value} < {float(rule['below'])}")
+            return "(" + " OR ".join(parts) + ")"
+        if kind in ("in_list", "not_in_list"):
+            col = cls._ident(rule.get("column", "account"))
+            values = ", ".join(cls._literal(v) for v in _wanted(rule)) or "NULL"
+            listed = f"(lower(trim(CAST({col} AS VARCHAR))) IN ({values}))"
+            return listed if kind == "in_list" else f"(NOT {listed} AND {col} IS NOT NULL)"
+        if kind == "pattern":
+            flags = "" if rule.get("case_sensitive", False) else "i"
+            col = cls._ident(rule.get("column", "description"))
+            return f"regexp_matches(CAST({col} AS VARCHAR), {cls._literal(rule['pattern'])}, '{flags}')"
+        return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Registry
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+ENGINES: Dict[str, type] = {
+    "pandas": PandasEngine,
+    "polars": PolarsEngine,
+    "duckdb": DuckDBEngine,
+}
+
+
+def available_engines() -> List[str]:
+    """Names of the engines whose dependencies are installed."""
+
+    return [name for name, cls in ENGINES.items() if cls.available()]
+
+
+def _row_count(source: Source) -> int:
+    frame = _frame(source)
+    if frame is not None:
+        return len(frame)
+    if isinstance(source, SharedFrameHandle):
+        return source.num_rows
+    sidecar = columnar_path(source)
+    if pa is None or not sidecar.exists():
+        return 0
+    with pa.memory_map(str(sidecar), "r") as handle:
+        reader = pa.ipc.open_file(handle)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def get_engine(engine: Union[None, str, AuditEngine] = None, *, source: Optional[Source] = None) -> AuditEngine:
+    """Resolve an engine name (or instance) to an :class:`AuditEngine`.
+
+    ``None`` means pandas.  ``"auto"`` picks the first installed lazy engine
+    when *source* has at least :data:`LAZY_ENGINE_MIN_ROWS` rows, pandas
+    otherwise.  Unknown names raise ``ValueError``; a known engine whose
+    package is missing raises ``ImportError``.
+    """
+
+    if isinstance(engine, AuditEngine):
+        return engine
+    name = (engine or "pandas").lower()
+    if name == "auto":
+        lazy = [n for n in available_engines() if ENGINES[n].lazy]
+        if lazy and source is not None and _row_count(source) >= LAZY_ENGINE_MIN_ROWS:
+            return ENGINES[lazy[0]]()
+        return PandasEngine()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {sorted(ENGINES)} or 'auto'")
+    cls = ENGINES[name]
+    if not cls.available():
+        raise ImportError(f"The {name} engine requires {cls.requires} (pip install {cls.requires})")
+    return cls()
@@ -0,0 +1,237 @@
+"""
+Ledger preprocessed once and shared by every audit tool.
+
+Each audit tool used to validate, normalise, parse dates and sort the same
+upload again.  A :class:`LedgerFrame` does that work **once**:
+
+* dtypes are compacted with :func:`normalize_audit_frame` (categorical
+  accounts, ``int8`` flags, parsed dates, ``float64`` amounts);
+* rows are sorted by (``account``, ``date``) and the start of every
+  account's block is indexed, so per‑account slices are two array lookups;
+* derived arrays (factorised codes, date ticks, cents, …) are computed on
+  first use and cached on the instance.
+
+Every tool in :mod:`backend.tools.audit_tools` (and the rules engine)
+accepts a ``LedgerFrame`` wherever it accepts a DataFrame or upload path,
+and skips its own preprocessing when given one.  Results keep the original
+row labels, so they can be matched back to the upload.
+
+Example
+-------
+```python
+from backend.tools.ledger_frame import LedgerFrame
+from backend.tools.audit_tools import TransactionVerifier, BenfordAnalyzer
+
+ledger = LedgerFrame.from_upload("uploads/acme/1a2b3c4d.csv")
+issues = TransactionVerifier().verify(ledger)
+digits = BenfordAnalyzer().analyze(ledger)
+```
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.tools.tabular_tools import read_columnar
+
+__all__ = ["LedgerFrame", "normalize_audit_frame", "memory_report", "CATEGORICAL_COLUMNS"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Dtype normalisation
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+# Label columns stored as categoricals when repetitive enough to pay off
+CATEGORICAL_COLUMNS = ("account", "type", "entity", "period", "currency")
+_FLAG_COLS = ("debit", "credit")
+_DATE_COLS = ("date",)
+
+
+def normalize_audit_frame(df: pd.DataFrame, *, max_category_ratio: float = 0.5) -> pd.DataFrame:
+    """Return *df* with compact, analysis‑ready dtypes.
+
+    * label columns (``account``, ``type``, ``entity``, ``period``,
+      ``currency``) become categoricals when they have at most
+      *max_category_ratio* distinct values per row – the factorisation used
+      to decide is reused to build the categorical;
+    * ``debit``/``credit`` holding only 0/1 flags become ``int8``;
+    * other integer columns are downcast to the smallest integer type;
+    * ``date`` is parsed to ``datetime64`` once, unparseable values → NaT;
+    * ``amount`` is coerced to numeric but stays ``float64`` – money is
+      never downcast.
+
+    Columns already in the target dtype are left untouched and *df* itself
+    is not modified.  Use :func:`memory_report` to compare footprints.
+    """
+
+    converted: Dict[str, Any] = {}
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORICAL_COLUMNS:
+            if isinstance(values.dtype, pd.CategoricalDtype) or len(values) == 0:
+                continue
+            try:
+                # Sorted categories keep value order (periods, codes) for sorts and groupbys
+                codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=True)
+            except TypeError:
+                codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            if len(uniques) <= max_category_ratio * len(values):
+                converted[col] = pd.Categorical.from_codes(codes, categories=uniques)
+        elif col in _FLAG_COLS:
+            if values.dtype == np.int8:
+                continue
+            numeric = pd.to_numeric(values, errors="coerce")
+            if numeric.notna().all() and numeric.isin((0, 1)).all():
+                converted[col] = numeric.astype(np.int8)
+            elif numeric.dtype != values.dtype:
+                converted[col] = numeric
+        elif col in _DATE_COLS:
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                converted[col] = pd.to_datetime(values, errors="coerce")
+        elif col == "amount":
+            if not pd.api.types.is_float_dtype(values):
+                converted[col] = pd.to_numeric(values, errors="coerce").astype("float64")
+        elif pd.api.types.is_integer_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype):
+            downcast = pd.to_numeric(values, downcast="integer")
+            if downcast.dtype != values.dtype:
+                converted[col] = downcast
+
+    return df.assign(**converted) if converted else df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> Dict[str, Any]:
+    """Deep memory usage of two versions of a frame, in bytes, per column and total."""
+
+    mem_before = before.memory_usage(deep=True, index=False)
+    mem_after = after.memory_usage(deep=True, index=False)
+    columns = {
+        col: {
+            "before": int(mem_before.get(col, 0)),
+            "after": int(mem_after.get(col, 0)),
+            "dtype": str(after[col].dtype),
+        }
+        for col in after.columns
+    }
+    total_before, total_after = int(mem_before.sum()), int(mem_after.sum())
+    return {
+        "before_bytes": total_before,
+        "after_bytes": total_after,
+        "saved_ratio": 1 - total_after / total_before if total_before else 0.0,
+        "columns": columns,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LedgerFrame
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class LedgerFrame:
+    """A normalised, (account, date)‑sorted ledger with cached derived arrays.
+
+    Build it with :meth:`from_upload` (reads the columnar copy of an upload)
+    or directly from a DataFrame.  ``df`` is the preprocessed frame; the
+    original row labels are kept as its index.
+    """
+
+    def __init__(self, df: pd.DataFrame, *, source: Optional[Union[str, Path]] = None, sort: bool = True):
+        self.source = source
+        self.memory = None
+        normalized = normalize_audit_frame(df)
+
+        sort_cols = [c for c in ("account", "date") if c in normalized.columns]
+        if sort and sort_cols:
+            # Two stable argsorts (date, then account) beat a multi‑key sort
+            order = np.arange(len(normalized))
+            if "date" in sort_cols:
+                order = np.argsort(normalized["date"].to_numpy(), kind="stable")
+            if "account" in sort_cols:
+                acc = pd.factorize(normalized["account"], sort=True, use_na_sentinel=True)[0]
+                acc = np.where(acc >= 0, acc, np.iinfo(np.int64).max)
+                order = order[np.argsort(acc[order], kind="stable")]
+            normalized = normalized.iloc[order]
+
+        self.df = normalized
+        self.sorted_by = sort_cols if sort else []
+        self._cache: Dict[str, Any] = {}
+
+    @classmethod
+    def from_upload(cls, path: Union[str, Path], columns: Optional[Iterable[str]] = None, **kwargs) -> "LedgerFrame":
+        """Read an upload (via its columnar copy) and preprocess it."""
+
+        columns = sorted(columns) if columns is not None else None
+        raw = read_columnar(path, columns=columns)
+        ledger = cls(raw, source=path, **kwargs)
+        ledger.memory = memory_report(raw, ledger.df)
+        return ledger
+
+    # ------------------------------------------------------------------
+    @property
+    def columns(self) -> pd.Index:
+        return self.df.columns
+
+    def has(self, *columns: str) -> bool:
+        return set(columns) <= set(self.df.columns)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def cached(self, name: str, compute: Callable[[pd.DataFrame], Any]) -> Any:
+        """Return derived value *name*, computing it from ``df`` on first use."""
+
+        if name not in self._cache:
+            self._cache[name] = compute(self.df)
+        return self._cache[name]
+
+    # ------------------------------------------------------------------
+    # Common derived arrays
+    # ------------------------------------------------------------------
+
+    def account_codes(self) -> tuple:
+        """``(codes, accounts)`` – factorised ``account`` in row order (−1 = missing)."""
+
+        return self.cached("account_codes", lambda df: pd.factorize(df["account"], use_na_sentinel=True))
+
+    def amounts(self) -> np.ndarray:
+        return self.cached("amounts", lambda df: pd.to_numeric(df["amount"], errors="coerce").to_numpy(dtype="float64"))
+
+    def ticks(self) -> np.ndarray:
+        """``date`` as int64 nanoseconds (NaT → int64 min)."""
+
+        return self.cached("ticks", lambda df: df["date"].to_numpy(dtype="datetime64[ns]").view("i8"))
+
+    def account_bounds(self) -> pd.Series:
+        """Start/stop row positions of each account's block (requires account sorting)."""
+
+        def bounds(df: pd.DataFrame) -> pd.DataFrame:
+            if "account" not in self.sorted_by:
+                raise ValueError("LedgerFrame was not sorted by account")
+            codes, accounts = self.account_codes()
+            change = np.flatnonzero(np.diff(codes)) + 1
+            starts = np.concatenate([[0], change]) if len(codes) else np.array([], dtype=np.int64)
+            stops = np.concatenate([change, [len(codes)]]) if len(codes) else np.array([], dtype=np.int64)
+            block_codes = codes[starts]
+            keep = block_codes >= 0
+            return pd.DataFrame(
+                {"start": starts[keep], "stop": stops[keep]},
+                index=pd.Index(np.asarray(accounts)[block_codes[keep]], name="account"),
+            )
+
+        return self.cached("account_bounds", bounds)
+
+    def account(self, account: Any) -> pd.DataFrame:
+        """Rows of one *account* (date‑sorted), without scanning the ledger."""
+
+        bounds = self.account_bounds()
+        if account not in bounds.index:
+            return self.df.iloc[0:0]
+        start, stop = bounds.loc[account, ["start", "stop"]]
+        return self.df.iloc[int(start):int(stop)]
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<LedgerFrame rows={len(self.df)} columns={list(self.df.columns)} cached={sorted(self._cache)}>"
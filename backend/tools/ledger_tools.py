@@ -0,0 +1,688 @@
+from google.adk.tools.tool_context import ToolContext
+from typing import Dict, List, Any, Callable, Optional, Tuple
+import json
+import os
+import time
+
+import pandas as pd
+
+from backend.config import AUDIT_RULES_FILE, AUDIT_STATE_DIR
+from backend.tools.tabular_tools import columnar_schema, is_large_csv, is_tabular
+from backend.tools.audit_tools import (
+    AccountHierarchy,
+    BankReconciler,
+    BenfordAnalyzer,
+    ContinuousTransactionVerifier,
+    FluxAnalyzer,
+    GroupConsolidator,
+    MonetaryUnitSampler,
+    OutlierScorer,
+    SequenceGapAnalyzer,
+    TransactionVerifier,
+)
+from backend.tools.ledger_frame import LedgerFrame
+from backend.tools.rules_engine import RulesEngine
+
+# Herramientas analíticas sobre planillas cargadas por el cliente.
+# Cada herramienta lee la copia columnar del archivo (solo las columnas que
+# necesita) y devuelve un resumen compacto apto para el agente.
+
+MAX_ROWS_IN_RESULT = 10
+
+# Un único verificador continuo por proceso (serializa las corridas de cada cliente)
+_continuous_verifier = ContinuousTransactionVerifier(AUDIT_STATE_DIR)
+
+
+def _log_tool_use(tool_context: ToolContext, operation: str, file_path: str) -> None:
+    """Registra el uso de una herramienta analítica en el estado de la sesión."""
+    if not tool_context:
+        return
+    client_id = tool_context.state.get("client_id", "unknown")
+    tool_context.state["ledger_tool_log"] = tool_context.state.get("ledger_tool_log", [])
+    tool_context.state["ledger_tool_log"].append({
+        "timestamp": tool_context.state.get("current_timestamp", 0),
+        "operation": operation,
+        "file_path": file_path,
+        "client_id": client_id
+    })
+
+
+def _check_upload(file_path: str) -> Optional[Dict[str, Any]]:
+    """Devuelve un dict de error si el archivo no es una planilla válida."""
+    if not os.path.exists(file_path) or not is_tabular(file_path):
+        return {
+            "status": "error",
+            "error_message": f"Archivo tabular no encontrado: {file_path}"
+        }
+    return None
+
+
+def _records(df: Optional[pd.DataFrame], limit: int = MAX_ROWS_IN_RESULT) -> List[Dict[str, Any]]:
+    """Primeras filas de un DataFrame como lista de dicts serializables."""
+    if df is None or df.empty:
+        return []
+    head = df.head(limit)
+    if head.index.name is not None:
+        head = head.reset_index()
+    return json.loads(head.to_json(orient="records", date_format="iso"))
+
+
+def run_benford_test(
+    file_path: str,
+    digits: int = 1,
+    by_account: bool = True,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Aplica la prueba de Benford (primer dígito o dos primeros dígitos) a los importes.
+
+    Args:
+        file_path: Ruta local de la planilla cargada (debe tener columna 'amount').
+        digits: 1 para primer dígito, 2 para los dos primeros dígitos.
+        by_account: Si también se evalúa cada cuenta por separado.
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, conformidad global (chi-cuadrado y MAD) y las cuentas menos conformes.
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    try:
+        analyzer = BenfordAnalyzer(digits=digits)
+        result = analyzer.analyze(file_path, by="account" if by_account else None)
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "benford_test", file_path)
+
+    by_group = result["by_group"]
+    if by_group is not None:
+        by_group = by_group[by_group["conformity"].isin(["marginal", "nonconformity"])]
+
+    return {
+        "status": "success",
+        "digits": digits,
+        "overall": {k: (v.item() if hasattr(v, "item") else v) for k, v in result["overall"].items()},
+        "nonconforming_accounts": _records(by_group)
+    }
+
+
+def find_near_duplicate_transactions(
+    file_path: str,
+    amount_tolerance: float = 1.0,
+    date_window_days: int = 3,
+    min_description_similarity: float = 0.6,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Busca transacciones casi duplicadas (importes parecidos, dígitos transpuestos, fechas cercanas).
+
+    Args:
+        file_path: Ruta local de la planilla cargada (columnas 'date', 'account', 'amount').
+        amount_tolerance: Diferencia máxima de importe para considerar dos líneas iguales.
+        date_window_days: Días máximos entre las fechas de ambas líneas.
+        min_description_similarity: Similitud mínima (0-1) de la descripción, si existe.
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, cantidad de pares por tipo de coincidencia y ejemplos.
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    try:
+        pairs = TransactionVerifier().find_near_duplicates(
+            file_path,
+            amount_tolerance=amount_tolerance,
+            date_window=pd.Timedelta(days=date_window_days),
+            min_description_similarity=min_description_similarity,
+        )
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "near_duplicates", file_path)
+
+    return {
+        "status": "success",
+        "pairs_found": int(len(pairs)),
+        "by_match": {k: int(v) for k, v in pairs["match"].value_counts().items()},
+        "examples": _records(pairs)
+    }
+
+
+def verify_ledger_delta(
+    file_path: str,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Auditoría continua: verifica solo las transacciones nuevas del cliente.
+
+    El archivo debe contener únicamente las transacciones agregadas desde la
+    última corrida (p. ej. el movimiento del día). Se comparan con la ventana
+    reciente guardada para el cliente, sin volver a leer el historial.
+
+    Args:
+        file_path: Ruta local de la planilla con las transacciones nuevas.
+        tool_context: Contexto de la herramienta (debe incluir 'client_id').
+
+    Returns:
+        dict: Status, anomalías por tipo, ejemplos, filas acumuladas del cliente y si el
+            delta ya se había aplicado (un reintento no se vuelve a verificar).
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    client_id = tool_context.state.get("client_id") if tool_context else None
+    if not client_id:
+        return {
+            "status": "error",
+            "error_message": "Se requiere el client_id en el contexto para la auditoría continua"
+        }
+
+    try:
+        anomalies = _continuous_verifier.verify_delta(client_id, file_path)
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "verify_ledger_delta", file_path)
+
+    counts = anomalies["issue"].value_counts().to_dict() if not anomalies.empty else {}
+    return {
+        "status": "success",
+        "anomalies": {k: int(v) for k, v in counts.items()},
+        "examples": _records(anomalies.rename_axis("row")),
+        "ledger_rows": anomalies.attrs["rows_seen"],
+        "already_applied": anomalies.attrs["already_applied"]
+    }
+
+
+def run_audit_rules(
+    file_path: str,
+    rules_path: str = "",
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Evalúa las reglas declarativas de auditoría (YAML/JSON) sobre una planilla.
+
+    Args:
+        file_path: Ruta local de la planilla cargada.
+        rules_path: Archivo de reglas; por defecto el configurado en AUDIT_RULES_FILE.
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, coincidencias y tiempo por regla, reglas omitidas y ejemplos.
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    rules_path = rules_path or AUDIT_RULES_FILE
+    if not os.path.exists(rules_path):
+        return {
+            "status": "error",
+            "error_message": f"Archivo de reglas no encontrado: {rules_path}"
+        }
+
+    try:
+        engine = RulesEngine.from_file(rules_path)
+        anomalies = engine.evaluate(file_path)
+    except (ValueError, ImportError) as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "audit_rules", file_path)
+
+    return {
+        "status": "success",
+        "rules": engine.summary(anomalies),
+        "skipped_rules": engine.skipped,
+        "examples": _records(anomalies.rename_axis("row"))
+    }
+
+
+def reconcile_bank_statement(
+    statement_path: str,
+    ledger_path: str,
+    date_tolerance_days: int = 3,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Concilia un extracto bancario contra el mayor de caja/bancos.
+
+    Empareja por importe exacto y fecha más cercana dentro de la tolerancia,
+    e incluye coincidencias uno-a-varios (un depósito que cubre varios cobros
+    del mismo día). Ambas planillas necesitan columnas 'date' y 'amount'.
+
+    Args:
+        statement_path: Ruta local del extracto bancario cargado.
+        ledger_path: Ruta local del mayor contable cargado.
+        date_tolerance_days: Días máximos de diferencia entre ambas fechas.
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, resumen de la conciliación y partidas pendientes de cada lado.
+    """
+    for path in (statement_path, ledger_path):
+        error = _check_upload(path)
+        if error:
+            return error
+
+    try:
+        reconciler = BankReconciler(date_tolerance=pd.Timedelta(days=date_tolerance_days))
+        result = reconciler.reconcile(statement_path, ledger_path)
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "bank_reconciliation", statement_path)
+
+    return {
+        "status": "success",
+        "summary": result["summary"],
+        "unmatched_statement": _records(result["unmatched_statement"].rename_axis("row")),
+        "unmatched_ledger": _records(result["unmatched_ledger"].rename_axis("row"))
+    }
+
+
+def draw_audit_sample(
+    file_path: str,
+    tolerable_misstatement: float = 0.0,
+    confidence: float = 0.95,
+    sample_size: int = 0,
+    stratified: bool = False,
+    seed: int = -1,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Selecciona una muestra estadística de transacciones (MUS o estratificada).
+
+    Args:
+        file_path: Ruta local de la planilla cargada (columna 'amount').
+        tolerable_misstatement: Error tolerable; define el tamaño de muestra MUS si sample_size es 0.
+        confidence: Nivel de confianza (p. ej. 0.95).
+        sample_size: Tamaño de muestra fijo (obligatorio para la muestra estratificada).
+        stratified: True para muestreo estratificado por importe en lugar de MUS.
+        seed: Semilla para reproducir la muestra; -1 genera una nueva (se devuelve).
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, parámetros de la muestra (intervalo, factor de confiabilidad, semilla)
+        y las filas seleccionadas.
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    try:
+        sampler = MonetaryUnitSampler(
+            confidence=confidence,
+            tolerable_misstatement=tolerable_misstatement or None,
+            seed=None if seed < 0 else seed,
+        )
+        if stratified:
+            if sample_size <= 0:
+                raise ValueError("El muestreo estratificado requiere sample_size")
+            result = sampler.stratified(file_path, sample_size=sample_size)
+        else:
+            result = sampler.select(file_path, sample_size=sample_size or None)
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "audit_sample", file_path)
+
+    parameters = {k: v for k, v in result.items() if k not in ("sample", "strata")}
+    if "strata" in result:
+        parameters["strata"] = _records(result["strata"], limit=len(result["strata"]))
+    return {
+        "status": "success",
+        "parameters": parameters,
+        "sample": _records(result["sample"].rename_axis("row"), limit=200)
+    }
+
+
+def run_flux_analysis(
+    file_path: str,
+    abs_threshold: float = 0.0,
+    pct_threshold: float = 0.10,
+    lag: int = 1,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Análisis de variaciones (flux) entre períodos de balances de comprobación.
+
+    La planilla debe estar en formato largo: columnas 'account', 'period',
+    'amount' (saldo de cierre) y opcionalmente 'entity' y 'activity'.
+
+    Args:
+        file_path: Ruta local de la planilla cargada.
+        abs_threshold: Variación absoluta mínima para considerar un movimiento significativo.
+        pct_threshold: Variación relativa mínima (0.10 = 10%).
+        lag: Períodos hacia atrás contra los que se compara (1 = período anterior, 12 = interanual mensual).
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, cantidad de movimientos significativos y los mayores de ellos.
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    try:
+        analyzer = FluxAnalyzer(abs_threshold=abs_threshold, pct_threshold=pct_threshold)
+        movements = analyzer.analyze(file_path, lag=lag)
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "flux_analysis", file_path)
+
+    return {
+        "status": "success",
+        "significant_movements": int(len(movements)),
+        "largest_movements": _records(movements, limit=25)
+    }
+
+
+def rollup_chart_of_accounts(
+    file_path: str,
+    max_level: int = 0,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Agrega saldos en todos los niveles del plan de cuentas ("1105 - Caja" → 1, 11, 110, 1105).
+
+    Args:
+        file_path: Ruta local de la planilla cargada (columnas 'account' con código y 'amount').
+        max_level: Cantidad máxima de dígitos del código a mostrar; 0 muestra todos los niveles.
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status y saldos por nivel con tipo de cuenta y clasificación corriente/no corriente.
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    try:
+        rollup = AccountHierarchy().rollup(file_path, max_level=max_level or None)
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "coa_rollup", file_path)
+
+    return {
+        "status": "success",
+        "levels": int(rollup["level"].max()) if not rollup.empty else 0,
+        "rollup": _records(rollup, limit=200)
+    }
+
+
+def score_amount_outliers(
+    file_path: str,
+    threshold: float = 3.5,
+    rolling_days: int = 0,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Detecta importes inusuales para cada cuenta (z-score robusto con mediana y MAD).
+
+    Args:
+        file_path: Ruta local de la planilla cargada (columnas 'account', 'amount' y, con ventana, 'date').
+        threshold: Z-score robusto mínimo para reportar una línea (3.5 es el valor habitual).
+        rolling_days: Si es mayor que 0, compara cada línea solo con los N días previos de su cuenta.
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, cantidad de líneas inusuales y las más extremas.
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    try:
+        outliers = OutlierScorer(threshold=threshold).score(
+            file_path, rolling=pd.Timedelta(days=rolling_days) if rolling_days > 0 else None
+        )
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "amount_outliers", file_path)
+
+    return {
+        "status": "success",
+        "outliers_found": int(len(outliers)),
+        "top_outliers": _records(outliers.rename_axis("row"), limit=25)
+    }
+
+
+def consolidate_group(
+    file_path: str,
+    rates_path: str = "",
+    mapping_path: str = "",
+    group_currency: str = "USD",
+    as_of: str = "",
+    ic_tolerance: float = 1.0,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Consolida los balances de comprobación de las subsidiarias de un grupo.
+
+    Homologa las cuentas al plan de cuentas del grupo, convierte cada entidad
+    a la moneda del grupo con la tasa vigente a la fecha del balance (cierre
+    para balance, promedio para resultados, histórica para patrimonio) y
+    elimina los saldos intercompañía, dejando el rastro de cada eliminación.
+
+    Args:
+        file_path: Planilla con columnas 'entity', 'account', 'amount' y opcionalmente
+            'currency', 'date' y 'counterparty' (entidad del grupo contraparte).
+        rates_path: Planilla de tasas ('currency', 'date', 'rate' y opcional 'rate_type':
+            closing/average/historical). Vacío si todo está en la moneda del grupo.
+        mapping_path: Planilla de homologación ('account', 'group_account' y opcional 'entity').
+        group_currency: Moneda de presentación del grupo.
+        as_of: Fecha del balance (AAAA-MM-DD) si la planilla no trae columna 'date'.
+        ic_tolerance: Diferencia máxima aceptada entre ambos lados de un saldo intercompañía.
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, resumen, cuentas consolidadas con mayor saldo y eliminaciones con diferencias.
+    """
+    for path in filter(None, (file_path, rates_path, mapping_path)):
+        error = _check_upload(path)
+        if error:
+            return error
+
+    try:
+        consolidator = GroupConsolidator(group_currency=group_currency, ic_tolerance=ic_tolerance)
+        result = consolidator.consolidate(
+            file_path,
+            rates=rates_path or None,
+            mapping=mapping_path or None,
+            as_of=as_of or None,
+        )
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "group_consolidation", file_path)
+
+    consolidated = result["consolidated"]
+    eliminations = result["eliminations"]
+    issues = eliminations[(eliminations["status"] != "matched") & (eliminations["line"] == "difference")]
+    return {
+        "status": "success",
+        "summary": result["summary"],
+        "largest_balances": _records(
+            consolidated.reindex(consolidated["consolidated"].abs().sort_values(ascending=False).index), limit=25
+        ),
+        "intercompany_issues": _records(issues, limit=25),
+        "translation": _records(result["translation"], limit=25),
+        "unmapped_accounts": _records(result["unmapped"]),
+        "missing_rates": _records(result["missing_rates"])
+    }
+
+
+def check_document_numbering(
+    file_path: str,
+    number_col: str = "entry_id",
+    series_col: str = "",
+    date_col: str = "date",
+    max_gap: int = 0,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Prueba de integridad de la numeración de facturas, cheques o asientos.
+
+    Ordena los números de cada serie una sola vez y detecta saltos (como
+    rangos compactos de números faltantes), números duplicados y documentos
+    con fecha anterior a la de un número menor de la misma serie.
+
+    Args:
+        file_path: Ruta de la planilla cargada.
+        number_col: Columna con el número de documento (entero o texto como 'FAC-000123';
+            el prefijo de texto se toma como parte de la serie).
+        series_col: Columna opcional con la serie o talonario (vacío si no hay).
+        date_col: Columna de fecha para detectar documentos fuera de orden (vacío para omitir).
+        max_gap: Saltos con más faltantes que este valor se marcan como 'jump'
+            (probable nuevo rango de numeración). 0 para no distinguirlos.
+        tool_context: Contexto de la herramienta.
+
+    Returns:
+        dict: Status, resumen por serie, mayores saltos, duplicados y documentos fuera de orden.
+    """
+    error = _check_upload(file_path)
+    if error:
+        return error
+
+    try:
+        analyzer = SequenceGapAnalyzer(max_gap=max_gap or None)
+        result = analyzer.analyze(
+            file_path,
+            number_col=number_col,
+            series_col=series_col or None,
+            date_col=date_col or None,
+        )
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
+        }
+
+    _log_tool_use(tool_context, "numbering_integrity", file_path)
+
+    gaps = result["gaps"]
+    return {
+        "status": "success",
+        "unparsed_numbers": result["unparsed"],
+        "series": _records(result["series"], limit=25),
+        "total_gaps": int(len(gaps)),
+        "total_missing": int(gaps["missing"].sum()),
+        "largest_gaps": _records(gaps.sort_values("missing", ascending=False, kind="stable"), limit=25),
+        "total_duplicated_numbers": int(len(result["duplicates"])),
+        "duplicates": _records(result["duplicates"], limit=25),
+        "total_out_of_order": int(len(result["out_of_order"])),
+        "out_of_order": _records(result["out_of_order"], limit=25)
+    }
+
+
+# ─────────────────────────── Controles previos (preflight) ───────────────────────────
+
+# Cada control: (nombre, columnas requeridas, función que recibe el LedgerFrame)
+PreflightCheck = Tuple[str, set, Callable[[LedgerFrame], Dict[str, Any]]]
+
+
+def _preflight_transactions(ledger: LedgerFrame) -> Dict[str, Any]:
+    anomalies = TransactionVerifier().verify(ledger)
+    counts = anomalies["issue"].value_counts().to_dict() if not anomalies.empty else {}
+    return {"anomalies": {k: int(v) for k, v in counts.items()}}
+
+
+def _preflight_entries(ledger: LedgerFrame) -> Dict[str, Any]:
+    unbalanced = TransactionVerifier().verify_entries(ledger)
+    return {"unbalanced_entries": int(len(unbalanced)), "examples": _records(unbalanced, 5)}
+
+
+def _preflight_benford(ledger: LedgerFrame) -> Dict[str, Any]:
+    result = BenfordAnalyzer().analyze(ledger, by="account" if ledger.has("account") else None)
+    overall = result["overall"]
+    return {
+        "count": int(overall["count"]),
+        "mad": round(float(overall["mad"]), 5),
+        "conformity": overall["conformity"]
+    }
+
+
+PREFLIGHT_CHECKS: List[PreflightCheck] = [
+    ("transacciones", {"date", "account", "debit", "credit", "amount"}, _preflight_transactions),
+    ("asientos", {"entry_id", "debit", "credit", "amount"}, _preflight_entries),
+    ("benford", {"amount"}, _preflight_benford),
+]
+
+
+def run_ledger_preflight(file_path: str) -> Dict[str, Any]:
+    """Ejecuta los controles deterministas aplicables a una planilla cargada.
+
+    Se llama al cargar el archivo, antes de invocar al agente. Solo corre los
+    controles cuyas columnas existen y lee únicamente esas columnas. Los CSV
+    grandes (ver ``is_large_csv``) se omiten: no se cargan en memoria y su
+    resumen por bloques ya incluye los controles de débito/crédito.
+
+    Args:
+        file_path: Ruta local de la planilla cargada.
+
+    Returns:
+        dict: Resultado de cada control (o su error) y su duración en segundos.
+    """
+    if is_large_csv(file_path):
+        return {"status": "skipped", "reason": "large_csv", "checks": {}}
+
+    schema = set(columnar_schema(file_path))
+    applicable = [check for check in PREFLIGHT_CHECKS if check[1] <= schema]
+    if not applicable:
+        return {"status": "skipped", "checks": {}}
+
+    needed = set().union(*(cols for _, cols, _ in applicable))
+    # Se lee, tipa y ordena una sola vez; los controles comparten el mismo LedgerFrame
+    ledger = LedgerFrame.from_upload(file_path, columns=sorted(needed))
+
+    checks: Dict[str, Any] = {}
+    for name, cols, func in applicable:
+        start = time.perf_counter()
+        try:
+            checks[name] = func(ledger)
+        except Exception as e:
+            checks[name] = {"error": str(e)}
+        checks[name]["seconds"] = round(time.perf_counter() - start, 3)
+
+    return {"status": "success", "checks": checks}
+
+
+def format_preflight(result: Dict[str, Any]) -> str:
+    """Texto breve con el resultado del preflight para incluir en el mensaje al agente."""
+    if result.get("status") != "success" or not result["checks"]:
+        return ""
+    lines = ["Controles automáticos previos:"]
+    for name, values in result["checks"].items():
+        details = ", ".join(
+            f"{k}={v}" for k, v in values.items() if k not in ("seconds", "examples")
+        )
+        lines.append(f"  - {name}: {details}")
+    return "\n".join(lines)
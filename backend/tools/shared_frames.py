@@ -0,0 +1,239 @@
+# backend/tools/shared_frames.py
+"""
+Registro de DataFrames compartidos entre procesos sin copias.
+
+Pasar un DataFrame a un ``ProcessPoolExecutor`` lo serializa con *pickle*
+y lo copia entero en cada proceso de trabajo.  Aquí, en cambio, cada tabla
+se escribe **una vez** en formato Arrow IPC (sin compresión) dentro de un
+archivo en memoria compartida (``/dev/shm`` cuando existe) y lo que viaja
+entre procesos es un :class:`SharedFrameHandle`: unos pocos bytes con la
+ruta, el número de filas y las columnas.  Quien lo recibe mapea el archivo
+en memoria (``mmap``) y obtiene una ``pyarrow.Table`` cuyas columnas
+apuntan directamente a esas páginas.
+
+* ``put`` registra un DataFrame o tabla Arrow y devuelve su *handle*;
+* ``put_file`` registra un archivo Arrow IPC ya existente (p. ej. la copia
+  columnar ``.arrow`` de una planilla cargada) sin copiarlo;
+* :func:`attach_table` / :func:`read_frame` abren un *handle* en cualquier
+  proceso, leyendo solo las columnas pedidas;
+* ``release`` / ``close`` borran los archivos propios del registro (también
+  al salir del proceso).
+
+Las herramientas de ``backend.tools.audit_tools`` aceptan un
+``SharedFrameHandle`` donde aceptan un DataFrame o la ruta de una carga.
+
+Uso
+---
+```python
+with SharedFrameRegistry() as registry:
+    handle = registry.put(df)
+    with ProcessPoolExecutor() as pool:
+        results = list(pool.map(worker, [handle] * 4))
+
+def worker(handle):
+    table = attach_table(handle, columns=["account", "amount"])
+    ...
+```
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import uuid
+import weakref
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Sin dependencias de backend.utils: las herramientas de auditoría deben poder
+# importarse solas (sin ADK, Supabase ni configuración)
+log = logging.getLogger(__name__)
+
+_SHM_DIR = Path("/dev/shm")
+_PREFIX = "sharedframe-"
+
+
+def _default_directory() -> Path:
+    """``/dev/shm`` (RAM) si está disponible; si no, el directorio temporal."""
+    if _SHM_DIR.is_dir() and os.access(_SHM_DIR, os.W_OK):
+        return _SHM_DIR
+    return Path(tempfile.gettempdir())
+
+
+class SharedFrameHandle:
+    """Referencia liviana y serializable a una tabla compartida."""
+
+    __slots__ = ("key", "path", "num_rows", "columns", "nbytes", "owned")
+
+    def __init__(self, key: str, path: Union[str, Path], num_rows: int, columns: List[str], nbytes: int, owned: bool):
+        self.key = key
+        self.path = str(path)
+        self.num_rows = num_rows
+        self.columns = list(columns)
+        self.nbytes = nbytes
+        self.owned = owned
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<SharedFrameHandle {self.key} rows={self.num_rows} bytes={self.nbytes}>"
+
+
+class SharedFrameRegistry:
+    """Tablas Arrow escritas una vez en memoria compartida y referenciadas por *handle*."""
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None):
+        if pa is None:
+            raise ImportError("SharedFrameRegistry requiere pyarrow (pip install pyarrow)")
+        self.directory = Path(directory) if directory is not None else _default_directory()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._handles: Dict[str, SharedFrameHandle] = {}
+        self._lock = threading.Lock()
+        # Borra los archivos propios si el registro se recolecta o el proceso termina
+        self._finalizer = weakref.finalize(self, _unlink_owned, self._handles)
+
+    # ──────────────────────────── API pública ────────────────────────────
+
+    def put(self, data: Union[pd.DataFrame, "pa.Table"], *, key: Optional[str] = None) -> SharedFrameHandle:
+        """Escribe *data* como Arrow IPC en memoria compartida y devuelve su *handle*.
+
+        Los DataFrames conservan tipos (categorías, fechas) e índice.  Si
+        *key* ya existe, la tabla anterior se libera.
+        """
+        table = pa.Table.from_pandas(data) if isinstance(data, pd.DataFrame) else data
+        key = key or uuid.uuid4().hex
+        path = self.directory / f"{_PREFIX}{os.getpid()}-{uuid.uuid4().hex}.arrow"
+
+        # Un solo lote: cada columna queda contigua y se lee sin copia
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+
+        handle = SharedFrameHandle(key, path, table.num_rows, table.column_names, path.stat().st_size, owned=True)
+        self._register(handle)
+        return handle
+
+    def put_file(self, path: Union[str, Path], *, key: Optional[str] = None) -> SharedFrameHandle:
+        """Registra un archivo Arrow IPC existente sin copiarlo (no se borra al liberar)."""
+        path = Path(path)
+        with pa.memory_map(str(path), "r") as source:
+            reader = pa.ipc.open_file(source)
+            num_rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+            columns = reader.schema.names
+        handle = SharedFrameHandle(key or uuid.uuid4().hex, path, num_rows, columns, path.stat().st_size, owned=False)
+        self._register(handle)
+        return handle
+
+    def get(self, key: str) -> SharedFrameHandle:
+        with self._lock:
+            return self._handles[key]
+
+    def release(self, handle: Union[str, SharedFrameHandle]) -> None:
+        """Olvida el *handle* y borra su archivo si lo creó este registro.
+
+        Los procesos que aún lo tengan mapeado conservan el acceso hasta
+        cerrarlo (semántica de ``unlink`` en POSIX).
+        """
+        key = handle if isinstance(handle, str) else handle.key
+        with self._lock:
+            handle = self._handles.pop(key, None)
+        if handle is not None and handle.owned:
+            try:
+                os.unlink(handle.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.warning(f"No se pudo borrar la tabla compartida {handle.path}: {e}")
+
+    def close(self) -> None:
+        """Libera todas las tablas del registro."""
+        with self._lock:
+            keys = list(self._handles)
+        for key in keys:
+            self.release(key)
+
+    def nbytes(self) -> int:
+        """Bytes ocupados por las tablas propias del registro."""
+        with self._lock:
+            return sum(h.nbytes for h in self._handles.values() if h.owned)
+
+    # ──────────────────────────── Internos ────────────────────────────
+
+    def _register(self, handle: SharedFrameHandle) -> None:
+        with self._lock:
+            previous = self._handles.get(handle.key)
+        if previous is not None:
+            self.release(previous)
+        with self._lock:
+            self._handles[handle.key] = handle
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._handles
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __enter__(self) -> "SharedFrameRegistry":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<SharedFrameRegistry dir={self.directory} tables={len(self)} bytes={self.nbytes()}>"
+
+
+def _unlink_owned(handles: Dict[str, SharedFrameHandle]) -> None:
+    for handle in list(handles.values()):
+        if handle.owned:
+            try:
+                os.unlink(handle.path)
+            except OSError:
+                pass
+    handles.clear()
+
+
+# ──────────────────────────── Lectura (cualquier proceso) ────────────────────────────
+
+
+def attach_table(handle: SharedFrameHandle, columns: Optional[Iterable[str]] = None) -> "pa.Table":
+    """Mapea la tabla de *handle* sin copiarla, opcionalmente solo *columns*.
+
+    Las columnas pedidas que la tabla no tiene se ignoran. El descriptor se
+    cierra al volver; el mapeo sigue vivo mientras la tabla lo referencie.
+    """
+    if pa is None:
+        raise ImportError("attach_table requiere pyarrow (pip install pyarrow)")
+    with pa.memory_map(str(handle.path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        wanted = set(columns)
+        table = table.select([c for c in table.column_names if c in wanted or c in _index_columns(table)])
+    return table
+
+
+def read_frame(handle: SharedFrameHandle, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """DataFrame de *handle* (solo *columns*), con tipos e índice originales."""
+    return attach_table(handle, columns).to_pandas()
+
+
+def _index_columns(table: "pa.Table") -> List[str]:
+    """Columnas que guardan el índice de pandas (se conservan al proyectar)."""
+    meta = table.schema.pandas_metadata or {}
+    return [c for c in meta.get("index_columns", []) if isinstance(c, str)]
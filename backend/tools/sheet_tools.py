@@ -1,7 +1,10 @@
 from google.adk.tools.tool_context import ToolContext
 from typing import Dict, List, Any, Optional
+import os
 import re
 
+from backend.tools.tabular_tools import is_tabular, read_columnar
+
 # En un entorno real, estas herramientas usarían la API de Google Sheets
 # Para este ejemplo, simulamos el comportamiento con datos de muestra
 
@@ -75,6 +78,64 @@ def get_sheet_data(
         "data": mock_data
     }
 
+def get_uploaded_table_data(
+    file_path: str,
+    columns: Optional[List[str]] = None,
+    max_rows: int = 200,
+    tool_context: ToolContext = None
+) -> Dict[str, Any]:
+    """Obtiene datos de una planilla cargada por el cliente (.csv, .xlsx, .xls).
+    
+    Lee la copia columnar generada al momento de la carga, por lo que solo se
+    materializan las columnas solicitadas.
+    
+    Args:
+        file_path: Ruta local del archivo cargado.
+        columns: Columnas a obtener (None para todas).
+        max_rows: Número máximo de filas a devolver.
+        tool_context: Contexto de la herramienta.
+        
+    Returns:
+        dict: Status y datos de la planilla con el mismo formato que get_sheet_data.
+    """
+    if not os.path.exists(file_path) or not is_tabular(file_path):
+        return {
+            "status": "error",
+            "error_message": f"Archivo tabular no encontrado: {file_path}"
+        }
+    
+    try:
+        df = read_columnar(file_path, columns=columns)
+    except Exception as e:
+        return {
+            "status": "error",
+            "error_message": f"No se pudo leer el archivo: {str(e)}"
+        }
+    
+    # Log de la operación para trazabilidad
+    if tool_context:
+        client_id = tool_context.state.get("client_id", "unknown")
+        tool_context.state["sheet_access_log"] = tool_context.state.get("sheet_access_log", [])
+        tool_context.state["sheet_access_log"].append({
+            "timestamp": tool_context.state.get("current_timestamp", 0),
+            "operation": "read_upload",
+            "file_path": file_path,
+            "columns": list(df.columns),
+            "client_id": client_id
+        })
+    
+    rows = df.head(max_rows).astype(str).values.tolist()
+    
+    return {
+        "status": "success",
+        "file_path": file_path,
+        "total_rows": len(df),
+        "data": {
+            "header": [str(c) for c in df.columns],
+            "rows": rows
+        }
+    }
+
 def verify_sheet_totals(
     sheet_url: str,
     column_indices: List[int],
@@ -0,0 +1,644 @@
+"""
+Helpers for tabular uploads (``.csv``, ``.xlsx``, ``.xls``).
+
+Spreadsheets are parsed **once** at upload time: column types are inferred
+(numeric, datetime, string) and the typed table is written next to the
+upload as an uncompressed Arrow IPC file (``<upload>.arrow``).  Every later
+consumer – audit tools, sheet tools, report generation – reads that sidecar
+through a memory map and only materialises the columns it asks for, so there
+is no re‑parsing of the original file.
+
+Very large CSV exports (general ledgers with millions of rows) are never
+loaded whole: :func:`iter_csv_chunks` walks them in bounded‑size chunks and
+:class:`ChunkedLedgerSummary` folds each chunk into running statistics, so
+peak memory depends on the chunk size, not on the file size.
+
+What reaches the agents is never a raw dump of rows: :func:`profile_table`
+condenses a table into a fixed‑size profile (types, null rates, ranges,
+top accounts, period coverage, outliers) whatever its row count, and
+:func:`describe_table_upload` picks the profile or the chunked summary
+depending on the file size.
+
+Dependencies
+------------
+* pandas ≥ 2.0
+* pyarrow (optional) – without it every read falls back to pandas on the
+  original upload.
+
+Example
+-------
+```python
+from backend.tools.tabular_tools import convert_to_columnar, read_columnar
+
+convert_to_columnar("uploads/acme/1a2b3c4d.xlsx")
+df = read_columnar("uploads/acme/1a2b3c4d.xlsx", columns=["account", "amount"])
+```
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import json
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+    feather = None
+
+__all__ = [
+    "TABULAR_EXTENSIONS",
+    "COLUMNAR_SUFFIX",
+    "is_tabular",
+    "columnar_path",
+    "read_tabular",
+    "convert_to_columnar",
+    "read_columnar",
+    "columnar_schema",
+    "CHUNKED_INGEST_THRESHOLD_BYTES",
+    "is_large_csv",
+    "iter_csv_chunks",
+    "ChunkedLedgerSummary",
+    "summarize_csv",
+    "profile_table",
+    "format_profile",
+    "describe_table_upload",
+]
+
+PathLike = Union[str, Path]
+
+TABULAR_EXTENSIONS = (".csv", ".xlsx", ".xls")
+COLUMNAR_SUFFIX = ".arrow"
+
+# CSVs above this size are ingested chunk by chunk instead of in one read
+CHUNKED_INGEST_THRESHOLD_BYTES = 50 * 1024 * 1024
+DEFAULT_CHUNKSIZE = 100_000
+
+# Column names that hint at a date column (English / Spanish ledgers)
+_DATE_HINTS = ("date", "fecha", "period", "periodo")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def is_tabular(file_path: PathLike) -> bool:
+    """Return ``True`` for uploads that can be converted to a columnar table."""
+
+    return Path(file_path).suffix.lower() in TABULAR_EXTENSIONS
+
+
+def is_large_csv(file_path: PathLike) -> bool:
+    """Return ``True`` for CSVs that must go through the chunked path."""
+
+    file_path = Path(file_path)
+    return (
+        file_path.suffix.lower() == ".csv"
+        and file_path.exists()
+        and file_path.stat().st_size > CHUNKED_INGEST_THRESHOLD_BYTES
+    )
+
+
+def columnar_path(file_path: PathLike) -> Path:
+    """Return the sidecar path (``<upload>.arrow``) for *file_path*."""
+
+    file_path = Path(file_path)
+    if file_path.suffix == COLUMNAR_SUFFIX:
+        return file_path
+    return file_path.with_name(file_path.name + COLUMNAR_SUFFIX)
+
+
+def _source_path(file_path: PathLike) -> Path:
+    """Inverse of :func:`columnar_path` – the original upload."""
+
+    file_path = Path(file_path)
+    if file_path.suffix == COLUMNAR_SUFFIX:
+        return file_path.with_name(file_path.name[: -len(COLUMNAR_SUFFIX)])
+    return file_path
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Parsing & type inference
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def read_tabular(file_path: PathLike, *, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Parse the original upload with pandas (no type inference)."""
+
+    file_path = Path(file_path)
+    usecols = list(columns) if columns is not None else None
+    if file_path.suffix.lower() in (".xlsx", ".xls"):
+        df = pd.read_excel(file_path)
+        return df[[c for c in usecols if c in df.columns]] if usecols is not None else df
+    if usecols is not None:
+        # Only parse the requested columns, ignoring the ones the file lacks
+        wanted = set(usecols)
+        return pd.read_csv(file_path, usecols=lambda c: c in wanted)
+    return pd.read_csv(file_path)
+
+
+def _infer_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert text columns to numeric / datetime where *every* value parses."""
+
+    df.columns = [str(c).strip() for c in df.columns]
+    for col in df.columns:
+        s = df[col]
+        if not (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)):
+            continue
+
+        non_null = int(s.notna().sum())
+        if non_null == 0:
+            continue
+
+        numeric = pd.to_numeric(s, errors="coerce")
+        if int(numeric.notna().sum()) == non_null:
+            df[col] = numeric
+            continue
+
+        if any(hint in col.lower() for hint in _DATE_HINTS):
+            dates = pd.to_datetime(s, errors="coerce")
+            if int(dates.notna().sum()) == non_null:
+                df[col] = dates
+                continue
+
+        # Mixed objects (e.g. numbers + text) are not representable in Arrow
+        df[col] = s.astype("string")
+    return df
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Columnar sidecar
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def convert_to_columnar(file_path: PathLike) -> Optional[Path]:
+    """Parse *file_path* once and store it as ``<upload>.arrow``.
+
+    Returns the sidecar path, or ``None`` when the file is not tabular or
+    pyarrow is not installed.  The sidecar is written **uncompressed** so it
+    can be memory‑mapped without a decode step.
+    """
+
+    file_path = Path(file_path)
+    if feather is None or not is_tabular(file_path):
+        return None
+
+    target = columnar_path(file_path)
+    if is_large_csv(file_path):
+        return _convert_csv_chunked(file_path, target)
+
+    df = _infer_types(read_tabular(file_path))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, target, compression="uncompressed")
+    return target
+
+
+def _convert_csv_chunked(file_path: Path, target: Path) -> Optional[Path]:
+    """Stream a large CSV into the sidecar one record batch at a time.
+
+    Types are inferred per chunk, so a column can be all‑null in one chunk
+    and text in the next, or numeric first and mixed later.  The running
+    schema is promoted as chunks arrive (see :func:`_promote_type`); each
+    schema gets its own part file and, if the schema changed along the way,
+    the parts are cast to the final schema and concatenated batch by batch.
+    Memory stays bounded by the chunk size either way.  Returns ``None``
+    (and leaves no sidecar behind) only if the CSV cannot be parsed.
+    """
+
+    parts: List[Path] = []
+    writer = None
+    schema = None
+    try:
+        for chunk in iter_csv_chunks(file_path):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if schema is not None:
+                promoted = _promote_schema(schema, table.schema)
+                if not promoted.equals(schema):
+                    # pandas metadata of the first chunk no longer matches the types
+                    schema = promoted.remove_metadata()
+                    writer.close()
+                    writer = None
+                table = table.cast(schema)
+            else:
+                schema = table.schema
+            if writer is None:
+                parts.append(target.with_name(f"{target.name}.part{len(parts)}"))
+                writer = pa.ipc.new_file(str(parts[-1]), schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+            writer = None
+
+        if not parts:
+            return None
+        if len(parts) == 1:
+            parts.pop().replace(target)
+        else:
+            _merge_parts(parts, schema, target)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError):
+        target.unlink(missing_ok=True)
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+        for part in parts:
+            part.unlink(missing_ok=True)
+    return target
+
+
+def _promote_type(a: "pa.DataType", b: "pa.DataType") -> "pa.DataType":
+    """Smallest common type of two per‑chunk inferences of one column.
+
+    null → the other type; integers → ``int64``; integers/floats →
+    ``float64``; timestamps of one time zone → ``timestamp[ns]``; anything
+    else → string (every Arrow scalar type casts to string).
+    """
+
+    if a.equals(b):
+        return a
+    if pa.types.is_null(a):
+        return b
+    if pa.types.is_null(b):
+        return a
+    if pa.types.is_integer(a) and pa.types.is_integer(b):
+        return pa.int64()
+    if (pa.types.is_integer(a) or pa.types.is_floating(a)) and (pa.types.is_integer(b) or pa.types.is_floating(b)):
+        return pa.float64()
+    if pa.types.is_timestamp(a) and pa.types.is_timestamp(b) and a.tz == b.tz:
+        return pa.timestamp("ns", tz=a.tz)
+    if pa.types.is_large_string(a) or pa.types.is_large_string(b):
+        return pa.large_string()
+    return pa.string()
+
+
+def _promote_schema(schema: "pa.Schema", other: "pa.Schema") -> "pa.Schema":
+    if schema.names != other.names:
+        raise ValueError(f"CSV chunks disagree on columns: {schema.names} vs {other.names}")
+    fields = [field.with_type(_promote_type(field.type, other.field(i).type)) for i, field in enumerate(schema)]
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def _merge_parts(parts: List[Path], schema: "pa.Schema", target: Path) -> None:
+    """Concatenate part files into *target*, casting each batch to *schema*."""
+
+    with pa.ipc.new_file(str(target), schema) as writer:
+        for part in parts:
+            with pa.memory_map(str(part), "r") as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    writer.write_table(pa.Table.from_batches([reader.get_batch(i)]).cast(schema))
+
+
+def read_columnar(file_path: PathLike, *, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Load a tabular upload, materialising only *columns*.
+
+    *file_path* may point at the original upload or at its sidecar.  If the
+    sidecar does not exist yet it is created on the fly.  Requested columns
+    that the table lacks are silently skipped – callers validate the schema
+    themselves (see ``audit_tools.ensure_columns``).
+    """
+
+    sidecar = columnar_path(file_path)
+    source = _source_path(file_path)
+
+    if feather is not None:
+        if not sidecar.exists() and source.exists():
+            convert_to_columnar(source)
+        if sidecar.exists():
+            if columns is not None:
+                available = columnar_schema(sidecar)
+                columns = [c for c in columns if c in available]
+            table = feather.read_table(sidecar, columns=columns, memory_map=True)
+            return table.to_pandas()
+
+    if is_large_csv(source):
+        # Never parse a large CSV whole; chunked consumers use iter_csv_chunks
+        raise ValueError(f"{source.name}: no columnar copy of this large CSV (is pyarrow installed?)")
+    return _infer_types(read_tabular(source, columns=columns))
+
+
+def columnar_schema(file_path: PathLike) -> Dict[str, str]:
+    """Return ``{column: dtype}`` for a tabular upload without loading rows."""
+
+    sidecar = columnar_path(file_path)
+    if pa is not None and sidecar.exists():
+        with pa.memory_map(str(sidecar), "r") as source:
+            schema = pa.ipc.open_file(source).schema
+        return {field.name: str(field.type) for field in schema}
+
+    if is_large_csv(_source_path(file_path)):
+        # Types as inferred on the first chunk
+        df = next(iter_csv_chunks(_source_path(file_path)), pd.DataFrame())
+        return {col: str(dtype) for col, dtype in df.dtypes.items()}
+    df = read_columnar(file_path)
+    return {col: str(dtype) for col, dtype in df.dtypes.items()}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Chunked (out‑of‑core) ingestion
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def iter_csv_chunks(
+    file_path: PathLike,
+    *,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[Iterable[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield type‑inferred chunks of at most *chunksize* rows."""
+
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda c: c in wanted  # noqa: E731
+    with pd.read_csv(file_path, chunksize=chunksize, usecols=usecols) as reader:
+        for chunk in reader:
+            yield _infer_types(chunk)
+
+
+class ChunkedLedgerSummary:
+    """Running statistics and ledger checks folded in chunk by chunk.
+
+    State is bounded by the number of columns and distinct accounts, never by
+    the number of rows.  When the usual ledger columns are present
+    (``account``, ``amount``, ``debit``, ``credit``) the summary also tracks
+    per‑account totals, debit/credit totals and unbalanced‑flag rows – the
+    same test :class:`~backend.tools.audit_tools.TransactionVerifier` applies.
+    """
+
+    def __init__(self, *, top_k: int = 10):
+        self.top_k = top_k
+        self.rows = 0
+        self.chunks = 0
+        self.columns: Dict[str, Dict[str, Any]] = {}
+        self.account_totals: Optional[pd.Series] = None
+        self.account_counts: Optional[pd.Series] = None
+        self.checks: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    def update(self, chunk: pd.DataFrame) -> "ChunkedLedgerSummary":
+        """Fold *chunk* into the running state."""
+
+        self.rows += len(chunk)
+        self.chunks += 1
+
+        nulls = chunk.isna().sum()
+        for col in chunk.columns:
+            s = chunk[col]
+            stats = self.columns.setdefault(col, {"dtype": str(s.dtype), "nulls": 0})
+            stats["nulls"] += int(nulls[col])
+
+            if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+                values = s.dropna().astype("float64")
+                if values.empty:
+                    continue
+                stats["count"] = stats.get("count", 0) + len(values)
+                stats["sum"] = stats.get("sum", 0.0) + float(values.sum())
+                stats["sum_sq"] = stats.get("sum_sq", 0.0) + float((values * values).sum())
+                stats["min"] = min(stats.get("min", float("inf")), float(values.min()))
+                stats["max"] = max(stats.get("max", float("-inf")), float(values.max()))
+            elif pd.api.types.is_datetime64_any_dtype(s):
+                values = s.dropna()
+                if values.empty:
+                    continue
+                stats["min"] = min(stats["min"], values.min()) if "min" in stats else values.min()
+                stats["max"] = max(stats["max"], values.max()) if "max" in stats else values.max()
+
+        self._update_checks(chunk)
+        return self
+
+    def _update_checks(self, chunk: pd.DataFrame) -> None:
+        cols = set(chunk.columns)
+        if {"account", "amount"} <= cols:
+            grouped = chunk.groupby("account", observed=True)["amount"]
+            totals, counts = grouped.sum(), grouped.size()
+            self.account_totals = totals if self.account_totals is None else self.account_totals.add(totals, fill_value=0)
+            self.account_counts = counts if self.account_counts is None else self.account_counts.add(counts, fill_value=0)
+
+        if "amount" in cols:
+            amount = pd.to_numeric(chunk["amount"], errors="coerce")
+            self._add("negative_amounts", int((amount < 0).sum()))
+            self._add("zero_amounts", int((amount == 0).sum()))
+
+        if {"debit", "credit"} <= cols:
+            debit, credit = chunk["debit"], chunk["credit"]
+            unbalanced = ((debit == 1) & (credit == 1)) | ((debit == 0) & (credit == 0))
+            self._add("unbalanced_entries", int(unbalanced.sum()))
+            if "amount" in cols:
+                self._add("debit_total", float(chunk.loc[debit == 1, "amount"].sum()))
+                self._add("credit_total", float(chunk.loc[credit == 1, "amount"].sum()))
+
+    def _add(self, key: str, value: float) -> None:
+        self.checks[key] = self.checks.get(key, 0) + value
+
+    # ------------------------------------------------------------------
+    def result(self) -> Dict[str, Any]:
+        """Return the compact summary as plain Python objects."""
+
+        columns: Dict[str, Dict[str, Any]] = {}
+        for col, stats in self.columns.items():
+            out = {"dtype": stats["dtype"], "null_rate": stats["nulls"] / self.rows if self.rows else 0.0}
+            if "count" in stats:
+                n = stats["count"]
+                mean = stats["sum"] / n
+                var = max(stats["sum_sq"] / n - mean * mean, 0.0)
+                out.update(min=stats["min"], max=stats["max"], sum=stats["sum"], mean=mean, std=var ** 0.5)
+            elif "min" in stats:
+                out.update(min=str(stats["min"]), max=str(stats["max"]))
+            columns[col] = out
+
+        top_accounts: List[Dict[str, Any]] = []
+        if self.account_totals is not None:
+            top = self.account_totals.abs().nlargest(self.top_k).index
+            top_accounts = [
+                {
+                    "account": str(acc),
+                    "total": float(self.account_totals[acc]),
+                    "rows": int(self.account_counts[acc]),
+                }
+                for acc in top
+            ]
+
+        return {
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "columns": columns,
+            "distinct_accounts": 0 if self.account_totals is None else int(len(self.account_totals)),
+            "top_accounts": top_accounts,
+            "checks": dict(self.checks),
+        }
+
+    def to_text(self) -> str:
+        """Return the summary as a short plaintext block for LLM prompts."""
+
+        res = self.result()
+        lines = [f"Filas: {res['rows']:,} (procesadas en {res['chunks']} bloques)", "Columnas:"]
+        for col, stats in res["columns"].items():
+            line = f"  - {col} [{stats['dtype']}] nulos={stats['null_rate']:.1%}"
+            if "sum" in stats:
+                line += f" min={stats['min']:,.2f} max={stats['max']:,.2f} suma={stats['sum']:,.2f}"
+            elif "min" in stats:
+                line += f" desde={stats['min']} hasta={stats['max']}"
+            lines.append(line)
+        if res["top_accounts"]:
+            lines.append(f"Cuentas distintas: {res['distinct_accounts']:,}. Principales por importe:")
+            for acc in res["top_accounts"]:
+                lines.append(f"  - {acc['account']}: {acc['total']:,.2f} ({acc['rows']:,} filas)")
+        if res["checks"]:
+            lines.append("Controles:")
+            for key, value in res["checks"].items():
+                lines.append(f"  - {key}: {value:,.2f}" if isinstance(value, float) else f"  - {key}: {value:,}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<ChunkedLedgerSummary rows={self.rows} chunks={self.chunks}>"
+
+
+def summarize_csv(file_path: PathLike, *, chunksize: int = DEFAULT_CHUNKSIZE, top_k: int = 10) -> ChunkedLedgerSummary:
+    """Stream *file_path* through a :class:`ChunkedLedgerSummary`."""
+
+    summary = ChunkedLedgerSummary(top_k=top_k)
+    for chunk in iter_csv_chunks(file_path, chunksize=chunksize):
+        summary.update(chunk)
+    return summary
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Fixed‑size profile for LLM prompts
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def profile_table(
+    df: pd.DataFrame,
+    *,
+    top_k: int = 10,
+    max_columns: int = 40,
+    sample_rows: int = 5,
+    outlier_iqr: float = 1.5,
+) -> Dict[str, Any]:
+    """Condense *df* into a profile whose size does not depend on row count.
+
+    Every statistic is computed column‑wise in one vectorised pass:
+
+    * per column – dtype and null rate; numeric columns add min/max/sum and
+      the number of IQR outliers (beyond ``outlier_iqr`` × IQR);
+    * ``top_accounts`` – the *top_k* accounts by absolute ``amount``;
+    * ``period`` – first/last date and monthly coverage of the first
+      datetime column (``date``/``fecha`` preferred);
+    * ``sample`` – the first *sample_rows* rows, for orientation only.
+    """
+
+    columns = list(df.columns[:max_columns])
+    view = df[columns]
+
+    null_rates = view.isna().mean()
+    numeric = view.select_dtypes(include="number").select_dtypes(exclude="bool")
+    profile_cols: Dict[str, Dict[str, Any]] = {
+        col: {"dtype": str(view[col].dtype), "null_rate": round(float(null_rates[col]), 4)} for col in columns
+    }
+
+    if not numeric.empty:
+        agg = numeric.agg(["min", "max", "sum"])
+        q1, q3 = numeric.quantile(0.25), numeric.quantile(0.75)
+        iqr = q3 - q1
+        outliers = ((numeric < q1 - outlier_iqr * iqr) | (numeric > q3 + outlier_iqr * iqr)).sum()
+        for col in numeric.columns:
+            profile_cols[col].update(
+                min=_plain(agg.at["min", col]),
+                max=_plain(agg.at["max", col]),
+                sum=_plain(agg.at["sum", col]),
+                outliers=int(outliers[col]),
+            )
+
+    top_accounts: List[Dict[str, Any]] = []
+    if {"account", "amount"} <= set(df.columns) and pd.api.types.is_numeric_dtype(df["amount"]):
+        totals = df.groupby("account", observed=True)["amount"].agg(["sum", "size"])
+        top = totals.loc[totals["sum"].abs().nlargest(top_k).index]
+        top_accounts = [
+            {"account": str(acc), "total": float(row["sum"]), "rows": int(row["size"])}
+            for acc, row in top.iterrows()
+        ]
+
+    period: Optional[Dict[str, Any]] = None
+    date_cols = list(df.select_dtypes(include="datetime").columns)
+    if date_cols:
+        date_col = next((c for c in date_cols if c.lower() in ("date", "fecha")), date_cols[0])
+        dates = df[date_col].dropna()
+        if not dates.empty:
+            months = dates.dt.to_period("M").unique()
+            expected = pd.period_range(months.min(), months.max(), freq="M")
+            missing = expected.difference(months)
+            period = {
+                "column": date_col,
+                "start": str(dates.min().date()),
+                "end": str(dates.max().date()),
+                "months_covered": int(len(months)),
+                "months_missing": [str(m) for m in missing[:12]],
+            }
+
+    return {
+        "rows": int(len(df)),
+        "columns_total": int(df.shape[1]),
+        "columns": profile_cols,
+        "top_accounts": top_accounts,
+        "period": period,
+        "sample": json.loads(view.head(sample_rows).to_json(orient="values", date_format="iso")),
+    }
+
+
+def _plain(value: Any) -> Any:
+    """NumPy scalar → plain Python (JSON‑serialisable)."""
+
+    return value.item() if hasattr(value, "item") else value
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Render a :func:`profile_table` result as a compact plaintext block."""
+
+    lines = [f"Filas: {profile['rows']:,} | Columnas: {profile['columns_total']}", "Columnas:"]
+    for col, stats in profile["columns"].items():
+        line = f"  - {col} [{stats['dtype']}] nulos={stats['null_rate']:.1%}"
+        if "sum" in stats:
+            line += (
+                f" min={stats['min']:,.2f} max={stats['max']:,.2f}"
+                f" suma={stats['sum']:,.2f} atípicos={stats['outliers']:,}"
+            )
+        lines.append(line)
+    if profile["columns_total"] > len(profile["columns"]):
+        lines.append(f"  … ({profile['columns_total'] - len(profile['columns'])} columnas más)")
+
+    if profile["top_accounts"]:
+        lines.append("Principales cuentas por importe:")
+        for acc in profile["top_accounts"]:
+            lines.append(f"  - {acc['account']}: {acc['total']:,.2f} ({acc['rows']:,} filas)")
+
+    period = profile.get("period")
+    if period:
+        line = f"Período ({period['column']}): {period['start']} a {period['end']}, {period['months_covered']} meses con datos"
+        if period["months_missing"]:
+            line += f"; meses sin datos: {', '.join(period['months_missing'])}"
+        lines.append(line)
+
+    if profile["sample"]:
+        lines.append("Muestra:")
+        lines.append(json.dumps(list(profile["columns"]), ensure_ascii=False))
+        lines.extend(json.dumps(row, ensure_ascii=False, default=str) for row in profile["sample"])
+    return "\n".join(lines)
+
+
+def describe_table_upload(file_path: PathLike) -> str:
+    """Return the prompt‑ready description of a tabular upload.
+
+    Large CSVs go through :func:`summarize_csv`; everything else is read from
+    the columnar sidecar and profiled with :func:`profile_table`.
+    """
+
+    if is_large_csv(file_path):
+        return summarize_csv(file_path).to_text()
+    return format_profile(profile_table(read_columnar(file_path)))
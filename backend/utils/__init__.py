@@ -6,16 +6,19 @@ Utilidades y servicios para la plataforma de auditoría.
 try:
     # Importaciones absolutas
     from backend.utils.supabase_session_service import SupabaseSessionService
+    from backend.utils.storage_uploader import StorageUploader
     from backend.utils.helpers import format_timestamp, validate_client_id
     from backend.utils.logger import setup_logger
 except ImportError:
     # Importaciones relativas (útil en tests o ejecución como módulo)
     from .supabase_session_service import SupabaseSessionService
+    from .storage_uploader import StorageUploader
     from .helpers import format_timestamp, validate_client_id
     from .logger import setup_logger
 
 __all__ = [
     "SupabaseSessionService",
+    "StorageUploader",
     "format_timestamp",
     "validate_client_id",
     "setup_logger",
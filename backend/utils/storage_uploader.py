@@ -0,0 +1,179 @@
+# backend/utils/storage_uploader.py
+"""
+Replicación en segundo plano de archivos cargados hacia Supabase Storage.
+
+El endpoint de carga guarda el archivo en disco y responde sin esperar a
+Storage: la subida se encola aquí y la realizan hilos de trabajo que
+
+* reutilizan un único cliente de Supabase para todo el proceso,
+* envían el archivo en *streaming* (nunca se lee entero en memoria),
+* reintentan con *backoff* exponencial ante errores transitorios, y
+* actualizan el registro en ``app_state["uploaded_files"]`` con la URL pública
+  (``file_url``) y el estado (``storage_status``) al terminar.
+
+Uso
+---
+```python
+uploader = StorageUploader(bucket="chat-files")
+uploader.submit(file_path, f"{client_id}/{safe_filename}", record)
+```
+"""
+
+from __future__ import annotations
+
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    from supabase import create_client
+except ImportError:
+    create_client = None
+
+from backend.config import SUPABASE_URL, SUPABASE_SERVICE_KEY, SUPABASE_SCHEMA
+from backend.utils.logger import setup_logger
+
+log = setup_logger(__name__)
+
+_DEFAULT_BUCKET = "chat-files"
+
+
+class StorageUploader:
+    """Cola de subidas a Supabase Storage atendida por hilos en segundo plano."""
+
+    def __init__(
+        self,
+        bucket: str = _DEFAULT_BUCKET,
+        *,
+        workers: int = 2,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+    ):
+        self.bucket_name = bucket
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._client = None
+
+    # ──────────────────────────── API pública ────────────────────────────
+
+    def submit(
+        self,
+        local_path: Union[str, Path],
+        storage_path: str,
+        record: Dict[str, Any],
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        """Encola la subida de *local_path* y vuelve de inmediato.
+
+        *record* es el diccionario del archivo en ``uploaded_files``; se
+        actualiza en el lugar cuando la subida termina (o falla) y, si se
+        indica, se llama ``on_complete(record)`` desde el hilo del uploader.
+        Sin cliente de Supabase no se encola nada ni se llama al callback.
+        """
+        if create_client is None:
+            record["storage_status"] = "unavailable"
+            return
+
+        record["storage_status"] = "pending"
+        self._ensure_started()
+        self._queue.put({
+            "local_path": Path(local_path),
+            "storage_path": storage_path,
+            "record": record,
+            "on_complete": on_complete,
+        })
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Detiene los hilos tras vaciar la cola."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def pending(self) -> int:
+        """Número aproximado de subidas en cola."""
+        return self._queue.qsize()
+
+    # ──────────────────────────── Internos ────────────────────────────
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for idx in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"storage-uploader-{idx}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _bucket(self):
+        """Cliente de Supabase de larga duración (uno por proceso)."""
+        with self._lock:
+            if self._client is None:
+                self._client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY, schema=SUPABASE_SCHEMA)
+            return self._client.storage.from_(self.bucket_name)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._upload(job)
+            finally:
+                self._queue.task_done()
+
+    def _upload(self, job: Dict[str, Any]) -> None:
+        record = job["record"]
+        storage_path = job["storage_path"]
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                bucket = self._bucket()
+                # Se pasa el descriptor abierto: el cliente HTTP lo envía por bloques
+                with job["local_path"].open("rb") as fobj:
+                    resp = bucket.upload(storage_path, fobj, {"upsert": "true"})
+                error = getattr(resp, "error", None)
+                if error:
+                    raise RuntimeError(getattr(error, "message", str(error)))
+
+                public = bucket.get_public_url(storage_path)
+                record["file_url"] = public.get("publicUrl") if isinstance(public, dict) else public
+                record["storage_status"] = "uploaded"
+                break
+            except FileNotFoundError as e:
+                # El archivo local ya no existe: no tiene sentido reintentar
+                record["storage_status"] = "failed"
+                record["storage_error"] = str(e)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    log.error(f"Error subiendo {storage_path} a Supabase tras {attempt + 1} intentos: {e}")
+                    record["storage_status"] = "failed"
+                    record["storage_error"] = str(e)
+                    break
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt) * (0.5 + random.random() / 2)
+                log.warning(f"Reintentando subida de {storage_path} en {delay:.1f}s ({e})")
+                time.sleep(delay)
+
+        if job["on_complete"] is not None:
+            try:
+                job["on_complete"](record)
+            except Exception as e:
+                log.error(f"Error en callback de subida de {storage_path}: {e}")
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<StorageUploader bucket={self.bucket_name} pending={self.pending()}>"